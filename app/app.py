@@ -3,31 +3,53 @@ import sys, os
 ROOT = os.path.dirname(os.path.dirname(__file__))
 if ROOT not in sys.path:
     sys.path.insert(0, ROOT)
-import streamlit as st
-
 
-import plotly.io as pio
-pio.templates.default = "plotly_dark"  # matches dark theme
-pio.templates["plotly_dark"]["layout"]["font"]["family"] = "Inter, system-ui, sans-serif"
-pio.templates["plotly_dark"]["layout"]["paper_bgcolor"] = "#0B0F19"
-pio.templates["plotly_dark"]["layout"]["plot_bgcolor"] = "#0B0F19"
-pio.templates["plotly_dark"]["layout"]["colorway"] = ["#21D4FD","#B721FF","#00E6A8","#F9C80E","#FF3D71"]
+# Startup profiling (no-op unless EVSO_PROFILE_STARTUP is set; see core/startup.py)
+from core import startup
+startup.start()
+import streamlit as st
+startup.mark("streamlit imported")
 
+# Keep this page light: no pandas/plotly here. The Plotly theme is applied by the pages that
+# chart (core.chartdata.apply_plotly_theme) and the logo is served as small cached thumbnails.
 from core.state import init as init_state
 init_state()  # <-- run once at app start
 
 from pathlib import Path
-from PIL import Image
-import streamlit as st
-
-
 
 # Paths
-ROOT = Path(__file__).resolve().parents[1]
-LOGO = ROOT / "assets" / "logo.png"
+LOGO = Path(__file__).resolve().parents[1] / "assets" / "logo.png"
+THUMB_SIZES = (64, 320)  # favicon, header
+
+
+@st.cache_resource(show_spinner=False)
+def logo_thumbnails(mtime: float) -> dict:
+    # {px: PNG bytes} of the logo at THUMB_SIZES. The ~2 MB source is decoded once and the result
+    # kept in data/cache/assets, so later cold starts (and every rerun) skip the decode.
+    from core.cache import DiskCache, content_key
+    store = DiskCache(os.path.join(ROOT, "data", "cache", "assets"), 4 * 1024 * 1024)
+    key = content_key("logo", str(LOGO), mtime, THUMB_SIZES)
+    thumbs = store.get(key)
+    if thumbs is None:
+        import io
+        from PIL import Image
+        thumbs = {}
+        with Image.open(LOGO) as im:
+            im.load()
+            for px in THUMB_SIZES:
+                small = im.copy()
+                small.thumbnail((px, px))
+                buf = io.BytesIO()
+                small.save(buf, format="PNG")
+                thumbs[px] = buf.getvalue()
+        store.put(key, thumbs)
+    return thumbs
+
+
+logo = logo_thumbnails(LOGO.stat().st_mtime) if LOGO.exists() else None
 
 # Use your logo as the favicon if it exists; fallback to emoji
-page_icon = Image.open(LOGO) if LOGO.exists() else "⚡"
+page_icon = logo[64] if logo else "⚡"
 
 st.set_page_config(
     page_title="EV Sales Optimizer",
@@ -35,14 +57,11 @@ st.set_page_config(
     layout="wide",
 )
 
-from pathlib import Path
-
 # --- Top header with logo ---
-LOGO = Path(__file__).resolve().parents[1] / "assets" / "logo.png"
 cols = st.columns([0.1, 0.9])
 with cols[0]:
-    if LOGO.exists():
-        st.image(str(LOGO), use_container_width=True)
+    if logo:
+        st.image(logo[320], use_container_width=True)
 
 with cols[1]:
     st.markdown("<h1 style='margin-bottom:0'>EV Sales Optimizer</h1>", unsafe_allow_html=True)
@@ -150,3 +169,5 @@ try:
     with l5: st.page_link("app/pages/5_Revenue_Simulator.py", label="Revenue", icon="💶")
 except Exception:
     st.write("Use the sidebar to navigate.")
+
+startup.record_first_render("home")
@@ -2,6 +2,10 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 from core.io import load_all_datasets
+from core.chartdata import MAX_CATEGORIES, aggregate, apply_plotly_theme, downsample
+from core.state import paged_dataframe
+
+apply_plotly_theme()
 
 st.title("Overview")
 
@@ -54,7 +58,7 @@ if eri is not None:
     )
     st.plotly_chart(fig, use_container_width=True)
     with st.expander("Data (readiness)", expanded=False):
-        st.dataframe(eri_plot, use_container_width=True)
+        paged_dataframe(eri_plot, "ov_eri")
 else:
     st.info("EV_Readiness_Index not loaded.")
 
@@ -63,12 +67,15 @@ st.subheader("Historical EV Registrations — Trend")
 if hist is not None:
     counties = sorted(hist['county'].unique().tolist())
     csel = st.selectbox("Select county for trend", counties[:1] + counties)
-    h1 = hist[hist['county'] == csel].copy()
-    fig2 = px.line(h1, x='period', y='ev_units', markers=True,
+    h1 = hist[hist['county'] == csel]
+    h1_plot = downsample(h1, 'period', 'ev_units')
+    fig2 = px.line(h1_plot, x='period', y='ev_units', markers=len(h1_plot) <= 120,
                    title=f"Monthly EV registrations in {csel}")
     st.plotly_chart(fig2, use_container_width=True)
+    if h1_plot.attrs["downsampled"]:
+        st.caption(f"{len(h1_plot):,} of {len(h1):,} points shown (LTTB downsampling).")
     with st.expander("Data (historical)", expanded=False):
-        st.dataframe(h1, use_container_width=True)
+        paged_dataframe(h1, "ov_hist")
 else:
     st.info("Historical_Registrations not loaded.")
 
@@ -76,14 +83,21 @@ else:
 st.subheader("Inventory Snapshot")
 if inv is not None and branches is not None:
     invb = inv.merge(branches[['branch_id','branch_name','county']], on='branch_id', how='left')
+    # One bar per branch x model (trims summed); beyond MAX_CATEGORIES branches / 10 models the
+    # smaller ones are folded into "Other"
+    inv_plot = aggregate(invb, ['branch_name', 'model'], sums=['stock_units'],
+                         means={'avg_days_on_lot': 'stock_units', 'msrp': None},
+                         max_categories={'branch_name': MAX_CATEGORIES, 'model': 10})
     fig3 = px.bar(
-        invb, x='branch_name', y='stock_units', color='model', barmode='group',
-        hover_data=['county','avg_days_on_lot','msrp'],
+        inv_plot, x='branch_name', y='stock_units', color='model', barmode='group',
+        hover_data={'avg_days_on_lot': ':.0f', 'msrp': ':,.0f'},
         title="Stock Units by Branch & Model"
     )
     st.plotly_chart(fig3, use_container_width=True)
+    if invb['branch_name'].nunique() > MAX_CATEGORIES or invb['model'].nunique() > 10:
+        st.caption(f"Top {MAX_CATEGORIES} branches and top 10 models by stock; the rest are grouped as “Other”.")
     with st.expander("Data (inventory)", expanded=False):
-        st.dataframe(invb, use_container_width=True)
+        paged_dataframe(invb, "ov_inv")
 else:
     st.info("Inventory/Branches not loaded.")
 
@@ -93,7 +107,7 @@ try:
     from core.geo import COUNTY_CENTROIDS
     if eri is not None:
         dfm = eri.copy()
-        dfm[['lat','lon']] = dfm['county'].map(lambda c: COUNTY_CENTROIDS.get(c, (None, None))).apply(pd.Series)
+        dfm[['lat','lon']] = dfm['county'].astype(object).map(lambda c: COUNTY_CENTROIDS.get(c, (None, None))).apply(pd.Series)
         dfm = dfm.dropna(subset=['lat','lon'])
         size_scalar = st.slider("Bubble size scale", 5, 40, 20)
         map_fig = px.scatter_mapbox(
@@ -115,16 +129,39 @@ except Exception as e:
     st.warning(f"Map could not render: {e}")
 
 from pathlib import Path
-from core.pdf import build_exec_summary
 
+# core.pdf (reportlab) is imported when a report is requested, not on every render of this page
 st.subheader("Export")
-if st.button("Generate 1‑page Exec Summary (PDF)"):
-    out = Path(__file__).resolve().parents[2] / "data" / "outputs" / "Exec_Summary.pdf"
-    logo_path = Path(__file__).resolve().parents[2] / "assets" / "logo.png"
+logo_path = Path(__file__).resolve().parents[2] / "assets" / "logo.png"
+e1, e2 = st.columns(2)
+if e1.button("Generate 1‑page Exec Summary (PDF)"):
     try:
-        pdf_path = build_exec_summary(eri, hist, branches, inv, crm, logo_path, out)
-        with open(pdf_path, "rb") as f:
-            st.download_button("Download PDF", f, file_name="Exec_Summary.pdf", mime="application/pdf")
-        st.success("PDF generated.")
+        from core.pdf import render_exec_summary
+        pdf_bytes = render_exec_summary(eri, hist, branches, inv, crm, logo_path)
+        e1.download_button("Download PDF", pdf_bytes, file_name="Exec_Summary.pdf", mime="application/pdf")
+        e1.success("PDF generated.")
     except Exception as e:
-        st.error(f"PDF generation failed: {e}")
+        e1.error(f"PDF generation failed: {e}")
+# The pack runs as a shared background job (core.jobs), keyed on the dataset versions and the plan
+if e2.button("Generate branch & county reports (ZIP)"):
+    from core.cache import content_key
+    from core.io import dataset_signature
+    plan = st.session_state.get("optimizer_plan")
+    st.session_state.report_pack = (
+        ("report_pack",) + tuple(dataset_signature(n) for n in
+                                 ("EV_Readiness_Index", "Historical_Registrations", "Branches", "Inventory", "CRM"))
+        + (content_key(plan.to_csv(index=False)) if plan is not None else None,), plan)
+if st.session_state.get("report_pack") is not None:
+    from core.pdf import render_report_pack
+    from core.state import job_result
+    key, plan = st.session_state.report_pack
+    # n_jobs=1: no process pool inside the server process until pooled workers are verified in the
+    # frozen build (the CLI, python -m core.pdf, keeps REPORT_WORKERS)
+    with e2:
+        zip_bytes, res = job_result(key, render_report_pack, eri, hist, branches, inv, crm, logo_path, plan=plan,
+                                    n_jobs=1, kind="report pack", label="Rendering reports")
+    e2.download_button("Download ZIP", zip_bytes, file_name="Reports.zip", mime="application/zip")
+    e2.success(f"{res['reports']} reports, {res['pages']} pages in {res['seconds']:.1f}s "
+               f"({res['pages_per_s']} pages/s).")
+    for name, err in res["errors"].items():
+        e2.warning(f"{name}: {err}")
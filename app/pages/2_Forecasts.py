@@ -3,9 +3,12 @@ import pandas as pd
 import numpy as np
 import plotly.express as px
 
-from core.io import load_all_datasets
-from core.forecast import make_county_forecasts
-from core.state import remember_forecast
+from core.io import load_all_datasets, dataset_signature
+from core.forecast import fit_raw_forecasts, forecasts_from_raw, default_engine_hint
+from core.state import remember_forecast, job_result
+from core.chartdata import apply_plotly_theme
+
+apply_plotly_theme()
 
 st.title("Forecasts")
 
@@ -31,7 +34,14 @@ if not sel:
     st.stop()
 
 # --------- BUILD FORECASTS ---------
-fc = make_county_forecasts(hist, eri, sel, alpha, share).copy()
+# Model fits run as a shared background job keyed on the history file and counties (α and share are
+# applied afterwards), so sessions asking for the same counties wait on one fit
+# The engine is resolved inside the job: the hint doesn't import Prophet during the page render
+engine = default_engine_hint()
+raw = job_result(("forecast", dataset_signature("Historical_Registrations"), tuple(sel), engine),
+                 fit_raw_forecasts, hist, list(sel),
+                 kind="forecast", label=f"Fitting {len(sel)} counties")
+fc = forecasts_from_raw(raw, eri, alpha, share).copy()
 if fc.empty:
     st.warning("Not enough history to forecast the selected counties.")
     st.stop()
@@ -67,7 +77,7 @@ st.divider()
 st.subheader("Opportunities: next‑month demand vs local stock (shortfall)")
 if (inv is not None) and (branches is not None):
     invb = inv.merge(branches[["branch_id", "county"]], on="branch_id", how="left")
-    local_stock = invb.groupby("county", as_index=False)["stock_units"].sum().rename(columns={"stock_units": "local_stock"})
+    local_stock = invb.groupby("county", as_index=False, observed=True)["stock_units"].sum().rename(columns={"stock_units": "local_stock"})
 else:
     local_stock = pd.DataFrame({"county": sel, "local_stock": 0})
 
@@ -1,9 +1,11 @@
 import streamlit as st
-import pandas as pd
-import numpy as np
 import plotly.express as px
-from core.io import load_all_datasets
-from core.scoring import score_leads
+from core.io import load_all_datasets, dataset_signature
+from core.scoring import SCORE_WEIGHTS, score_leads_incremental
+from core.leads import lead_index
+from core.chartdata import HIST_BINS, apply_plotly_theme, histogram
+
+apply_plotly_theme()
 
 st.title("Leads")
 eri, hist, branches, inv, crm, webs = load_all_datasets(prefer_real=True)
@@ -12,54 +14,54 @@ if crm is None or eri is None:
     st.error("Missing CRM or EV_Readiness_Index.")
     st.stop()
 
-# Score everything
-scored = score_leads(crm, eri)
-st.caption(f"Leads scored: {len(scored)}")
-
-# ----------- Dynamic filter choices (avoid label mismatch) -----------
-# Clean up strings a bit
-for col in ["current_vehicle_type", "income_band", "county"]:
-    if col in scored.columns:
-        scored[col] = scored[col].astype(str).str.strip()
-
-veh_types = sorted(scored["current_vehicle_type"].dropna().unique().tolist())
-income_opts = sorted(scored["income_band"].dropna().unique().tolist())
+# The scored, sorted and partitioned index is built once per CRM/readiness file version and
+# shared across sessions; filter changes only query it. Scoring itself is incremental.
+with st.expander("Score weights"):
+    wcols = st.columns(len(SCORE_WEIGHTS))
+    weights = {k: wcols[i].number_input(k.replace("_", " ").title(), 0.0, 1.0, v, 0.05, key=f"w_{k}")
+               for i, (k, v) in enumerate(SCORE_WEIGHTS.items())}
+key = (dataset_signature("CRM"), dataset_signature("EV_Readiness_Index"), tuple(weights.values()))
+index = lead_index(key, lambda: score_leads_incremental(crm, eri, weights=weights))
+rescore = index.info
+st.caption(f"Leads scored: {len(index)}"
+           + (f" (rescored {rescore['rescored']}: {rescore['reason']})" if rescore else ""))
 
 # Sensible default threshold = 75th percentile
-thresh_default = int(np.percentile(scored["score"], 75))
+thresh_default = int(index.percentile(75))
 
 c1, c2, c3, c4 = st.columns(4)
 with c1:
     thresh = st.slider("Score ≥", 0, 100, thresh_default, 1)
 with c2:
-    vt = st.multiselect("Vehicle type", veh_types, default=veh_types)
+    vt = st.multiselect("Vehicle type", index.vehicle_types, default=index.vehicle_types)
 with c3:
-    inc = st.multiselect("Income band", income_opts, default=income_opts)
+    inc = st.multiselect("Income band", index.income_bands, default=index.income_bands)
 with c4:
     max_dist = st.number_input("Max distance (km, optional)", min_value=0, value=0, step=5)
 
-# Apply filters
-f = scored[
-    (scored["score"] >= thresh) &
-    (scored["current_vehicle_type"].isin(vt)) &
-    (scored["income_band"].isin(inc))
-].copy()
-if max_dist > 0:
-    f = f[f["distance_km"] <= max_dist]
-
-st.write(f"Showing {len(f)} leads.")
+filters = dict(min_score=thresh, vehicle_types=vt, income_bands=inc, max_distance=max_dist or None)
+total = index.count(**filters)
 
 # ----------- Charts & table -----------
-fig = px.histogram(scored, x="score", nbins=20, title="Score Distribution (all leads)")
+# Binned here: only the 20 bar heights go to the browser, not one value per lead
+bins = histogram(index.scores, bins=HIST_BINS, range=(0, 100))
+fig = px.bar(bins, x="bin_mid", y="count", title="Score Distribution (all leads)", labels={"bin_mid": "score"})
+fig.update_traces(width=100 / HIST_BINS)
+fig.update_layout(bargap=0)
 st.plotly_chart(fig, use_container_width=True)
 
-cols = ["lead_id","first_name","last_name","county","score",
-        "current_vehicle_type","income_band","engagements_90d","distance_km"]
-st.dataframe(
-    f[cols].sort_values(["score","engagements_90d"], ascending=[False, False]),
-    use_container_width=True
-)
+p1, p2 = st.columns(2)
+with p1:
+    page_size = st.selectbox("Rows per page", [25, 50, 100, 250], index=1)
+n_pages = max(1, -(-total // page_size))
+with p2:
+    page_no = st.number_input("Page", min_value=1, max_value=n_pages, value=1, step=1)
+page = index.query(**filters, offset=(page_no - 1) * page_size, limit=page_size)
+first = (page_no - 1) * page_size + 1 if total else 0
+st.write(f"Showing {first}–{first + len(page) - 1 if total else 0} of {total} leads.")
+st.dataframe(page, use_container_width=True, hide_index=True)
 
-# Export CSV
-csv = f[cols].to_csv(index=False).encode("utf-8")
-st.download_button("Download Call List (CSV)", data=csv, file_name="Call_List.csv", mime="text/csv")
+# Export CSV (built on request: the full call list can be large)
+if st.button("Prepare call list CSV"):
+    st.download_button("Download Call List (CSV)", data=index.export_csv(**filters),
+                       file_name="Call_List.csv", mime="text/csv")
@@ -13,8 +13,9 @@ if str(ROOT) not in sys.path:
 from core.state import init as init_state
 init_state()
 
-from core.io import load_all_datasets
-from core.forecast import make_county_forecasts
+from core.io import load_all_datasets, dataset_signature
+from core.forecast import fit_raw_forecasts, forecasts_from_raw, default_engine_hint
+from core.state import job_result
 
 st.title("Inventory Optimizer")
 
@@ -43,7 +44,13 @@ if fc_next is None:
             pass
         st.stop()
 
-    fc_full = make_county_forecasts(hist, eri, sel, alpha, share)
+    # Same shared background job as the Forecasts page
+    # The engine is resolved inside the job: the hint doesn't import Prophet during the page render
+    engine = default_engine_hint()
+    raw = job_result(("forecast", dataset_signature("Historical_Registrations"), tuple(sel), engine),
+                     fit_raw_forecasts, hist, list(sel),
+                     kind="forecast", label=f"Fitting {len(sel)} counties")
+    fc_full = forecasts_from_raw(raw, eri, alpha, share)
     if fc_full.empty:
         st.warning("Not enough history to forecast selected counties.")
         st.stop()
@@ -58,7 +65,7 @@ inv_b = inv.merge(
     branches[["branch_id", "county"]],
     on="branch_id", how="left"
 )
-local_stock = inv_b.groupby("county", as_index=False)["stock_units"].sum().rename(columns={"stock_units": "local_stock"})
+local_stock = inv_b.groupby("county", as_index=False, observed=True)["stock_units"].sum().rename(columns={"stock_units": "local_stock"})
 
 demand = fc_next[["county", "expected_dealer_units"]].merge(local_stock, on="county", how="left")
 demand["local_stock"] = demand["local_stock"].fillna(0).astype(int)
@@ -72,3 +79,33 @@ st.dataframe(
 )
 
 
+# ---- Transfer plan
+# Runs as a shared background job keyed on the inventory/branch versions and the parameters, so
+# the solve (LP up to LP_TIME_LIMIT) neither blocks the page nor restarts on every rerun
+from core.optimize import greedy_reallocate, lp_reallocate
+from core.state import remember_optimizer
+
+st.subheader("Transfer plan")
+o1, o2, o3, o4, o5 = st.columns(5)
+min_safety = o1.number_input("Min safety stock", 0, 100, 8, 1)
+max_distance = o2.number_input("Max distance (km)", 10.0, 1000.0, 250.0, 10.0)
+max_batch = o3.number_input("Max units per transfer", 1, 50, 3, 1)
+cost_unit = o4.number_input("Cost per unit (€)", 0.0, 2000.0, float(st.session_state.get("transfer_cost_per_unit", 150)), 10.0)
+solver = o5.selectbox("Solver", ["greedy", "lp"], format_func={"greedy": "Greedy", "lp": "Min-cost LP"}.get)
+if st.button("Run optimizer"):
+    st.session_state.optimizer_run = (solver, int(min_safety), float(max_distance), int(max_batch), float(cost_unit))
+
+if st.session_state.get("optimizer_run") is not None:
+    solver, *params = st.session_state.optimizer_run
+    plan = job_result(("optimize", dataset_signature("Inventory"), dataset_signature("Branches"), solver, *params),
+                      lp_reallocate if solver == "lp" else greedy_reallocate, inv, branches, *params,
+                      kind="optimizer", label=f"Optimizing transfers ({solver})")
+    remember_optimizer(plan, params[-1])
+    if plan.empty:
+        st.info("No feasible transfers for these settings.")
+    else:
+        t1, t2, t3 = st.columns(3)
+        t1.metric("Transfers", len(plan))
+        t2.metric("Units moved", int(plan["units"].sum()))
+        t3.metric("Transfer cost", f"€{plan['transfer_cost'].sum():,.0f}")
+        st.dataframe(plan, use_container_width=True, hide_index=True)
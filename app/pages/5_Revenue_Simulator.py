@@ -2,7 +2,10 @@ import streamlit as st
 import numpy as np
 import plotly.graph_objects as go
 from core.io import load_all_datasets
-from core.revenue import simulate_uplift
+from core.revenue import simulate_uplift, simulate_uplift_mc, uplift_sensitivity, uplift_breakdown, UPLIFT_DRIVERS
+from core.chartdata import apply_plotly_theme
+
+apply_plotly_theme()
 
 st.title("Revenue Simulator")
 
@@ -60,3 +63,63 @@ if net_uplift >= 0:
     st.success(f"✅ Plan is profitable: **€{net_uplift:,.0f}** net uplift at margin €{margin:,}/unit.")
 else:
     st.warning(f"⚠️ Plan loses **€{-net_uplift:,.0f}**. Reduce transfer distance/cost or increase market share/α.")
+
+# --- Sensitivity: which driver moves net uplift most ---
+st.divider()
+st.subheader("Sensitivity")
+spread = st.slider("Vary each driver by ± (%)", 5, 50, 20, 5)
+base = dict(zip(UPLIFT_DRIVERS, (baseline_conv, available_leads, plan_units_in, margin, transfer_units_in, transfer_cost_in)))
+curves, tornado = uplift_sensitivity(base, spread=spread / 100)
+labels = {"baseline_conversion": "Baseline conversion", "available_leads": "Available leads", "plan_units": "Plan units",
+          "gross_margin_per_unit": "Margin per unit", "transfer_units": "Transfer units",
+          "transfer_cost_per_unit": "Transfer cost per unit"}
+t = tornado.iloc[::-1]
+base_uplift = tornado.attrs["base_uplift"]
+tfig = go.Figure([
+    go.Bar(y=t["driver"].map(labels), x=t["uplift_at_low"] - base_uplift, base=base_uplift, orientation="h",
+           name=f"-{spread}%", marker_color="#E45756"),
+    go.Bar(y=t["driver"].map(labels), x=t["uplift_at_high"] - base_uplift, base=base_uplift, orientation="h",
+           name=f"+{spread}%", marker_color="#54A24B"),
+])
+tfig.add_vline(x=base_uplift, line_dash="dash")
+tfig.update_layout(title="Net uplift tornado", barmode="overlay", xaxis_title="€ uplift")
+st.plotly_chart(tfig, use_container_width=True)
+
+plan_df = st.session_state.get("optimizer_plan")
+if plan_df is not None and not plan_df.empty and inv is not None:
+    st.markdown("**Optimizer plan by receiving branch and model** (inventory margins, net of transfer cost)")
+    st.dataframe(uplift_breakdown(plan_df, inv), use_container_width=True, hide_index=True)
+else:
+    st.caption("Run the Inventory Optimizer to see the plan's uplift per branch and model.")
+
+# --- Monte Carlo: uncertainty around the same plan ---
+st.divider()
+st.subheader("Monte Carlo")
+if st.toggle("Simulate uncertainty", value=False):
+    m1, m2, m3, m4 = st.columns(4)
+    conv_sd   = m1.number_input("Conversion rate sd", 0.0, 0.2, 0.01, 0.005, format="%.3f")
+    plan_err  = m2.slider("Forecast error on plan units (sd, %)", 0, 100, 15, 5)
+    cost_cv   = m3.slider("Transfer cost variation (cv, %)", 0, 100, 20, 5)
+    n_draws   = m4.select_slider("Draws", [10_000, 100_000, 1_000_000], value=1_000_000)
+    use_inv   = st.checkbox("Sample margin per unit from inventory (stock-weighted)",
+                            value=inv is not None and len(inv) > 0,
+                            disabled=inv is None or len(inv) == 0)
+    mc = simulate_uplift_mc(baseline_conv, available_leads, plan_units_in, margin, transfer_units_in, transfer_cost_in,
+                            conversion_sd=conv_sd, plan_error_sd=plan_err / 100, transfer_cost_cv=cost_cv / 100,
+                            margin_samples=inv["gross_margin_per_unit"].to_numpy() if use_inv else None,
+                            margin_weights=inv["stock_units"].to_numpy() if use_inv else None,
+                            n_draws=n_draws)
+    q1, q2, q3, q4 = st.columns(4, gap="medium")
+    q1.metric("€ Uplift P5", f"{mc['p5']:,.0f}")
+    q2.metric("€ Uplift P50", f"{mc['p50']:,.0f}")
+    q3.metric("€ Uplift P95", f"{mc['p95']:,.0f}")
+    q4.metric("Probability of loss", f"{mc['prob_loss']:.1%}")
+    edges = np.asarray(mc["histogram"]["edges"])
+    hfig = go.Figure(go.Bar(x=(edges[:-1] + edges[1:]) / 2, y=mc["histogram"]["counts"],
+                            width=np.diff(edges), marker_color="#4C78A8"))
+    for q in ("p5", "p50", "p95"):
+        hfig.add_vline(x=mc[q], line_dash="dash", annotation_text=q.upper())
+    hfig.update_layout(title=f"Net uplift over {mc['n_draws']:,} draws", xaxis_title="€ uplift",
+                       yaxis_title="Draws", showlegend=False, bargap=0)
+    st.plotly_chart(hfig, use_container_width=True)
+    st.caption(f"{mc['n_draws']:,} draws in {mc['seconds']:.2f}s · mean €{mc['mean']:,.0f}")
@@ -1,16 +1,57 @@
 import streamlit as st
 import pandas as pd
-from core.io import REQUIRED_SCHEMAS, validate_and_save_upload
+from core.io import (REQUIRED_SCHEMAS, UPSERT_KEYS, stream_validate_and_save, ingest_delta,
+                     dataset_versions, dataset_cache_stats)
+from core.jobs import runner
 
 st.title("Admin / Data")
-st.write("Upload CSVs matching the required schemas.")
+st.write("Upload CSVs matching the required schemas. Registrations and CRM also accept deltas "
+         "(new and changed rows only), upserted on their key columns.")
+
+# Each uploaded file is applied once, on "Apply": reruns (any widget interaction) show the stored
+# report instead of writing again, and the mode is locked while an applied file is still loaded
+applied = st.session_state.setdefault("applied_uploads", {})
 
 for name, cols in REQUIRED_SCHEMAS.items():
     st.subheader(name)
+    loaded = st.session_state.get(name)
+    done = applied.get(name)
+    if done is not None and (loaded is None or done["file_id"] != loaded.file_id):
+        del applied[name]
+        done = None
+    mode = "Replace"
+    if name in UPSERT_KEYS:
+        mode = st.radio("Mode", ["Replace", "Append / update"], horizontal=True, key=f"{name}_mode",
+                        disabled=done is not None,
+                        help=f"Append / update matches rows on {', '.join(UPSERT_KEYS[name])}")
     file = st.file_uploader(f"Upload {name}.csv", type=["csv"], key=name)
-    if file is not None:
-        ok, msg = validate_and_save_upload(file, expected_name=f"{name}.csv")
-        if ok:
-            st.success(msg)
+    if file is not None and done is None:
+        if st.button(f"Apply ({mode})", key=f"{name}_apply"):
+            if mode == "Replace":
+                report = stream_validate_and_save(file, expected_name=f"{name}.csv")
+            else:
+                report = ingest_delta(file, expected_name=f"{name}.csv")
+            applied[name] = {"file_id": file.file_id, "report": report}
+            st.rerun()
+    if done is not None:
+        report = done["report"]
+        if report["ok"]:
+            st.success(report["message"])
         else:
-            st.error(msg)
+            st.error(report["message"])
+            if report["errors"]:
+                st.caption(f"First {len(report['errors'])} of {report['n_errors']} invalid values")
+                st.dataframe(pd.DataFrame(report["errors"]), use_container_width=True)
+    versions = dataset_versions(name)
+    if versions:
+        with st.expander(f"Version log ({len(versions)})"):
+            st.dataframe(pd.DataFrame(versions[::-1]), use_container_width=True)
+
+stats = dataset_cache_stats()
+st.caption(f"Dataset cache (this process): {stats['entries']} files, {stats['hits']} hits, "
+           f"{stats['misses']} misses, {stats['invalidations']} invalidations")
+
+jobs = runner().jobs()
+if jobs:
+    with st.expander(f"Background jobs ({len(jobs)})"):
+        st.dataframe(pd.DataFrame([j.summary() for j in jobs]), use_container_width=True)
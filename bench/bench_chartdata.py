@@ -0,0 +1,69 @@
+# Benchmark: browser payload of the Overview / Leads charts with and without server-side
+# aggregation (core.chartdata), measured as the size of the Plotly figure JSON, on a synthetic
+# network (default 1,000 branches x 200 models) and 1M lead scores. Also times LTTB on a
+# 1M-point series.
+#   python bench/bench_chartdata.py [--branches 1000] [--models 200] [--scores 1000000]
+import os
+import sys
+import time
+import argparse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+from core import chartdata
+from bench_optimize import make_network
+
+
+def mb(fig) -> float:
+    return len(fig.to_json()) / 1e6
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--branches", type=int, default=1000)
+    ap.add_argument("--models", type=int, default=200)
+    ap.add_argument("--scores", type=int, default=1_000_000)
+    args = ap.parse_args()
+
+    inv, branches = make_network(args.branches, args.models)
+    invb = inv.merge(branches[["branch_id", "branch_name", "county"]], on="branch_id", how="left")
+    t0 = time.perf_counter()
+    raw = px.bar(invb, x="branch_name", y="stock_units", color="model", barmode="group",
+                 hover_data=["county", "avg_days_on_lot", "msrp"])
+    t_raw = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    agg = chartdata.aggregate(invb, ["branch_name", "model"], sums=["stock_units"],
+                              means={"avg_days_on_lot": "stock_units", "msrp": None},
+                              max_categories={"branch_name": chartdata.MAX_CATEGORIES, "model": 10})
+    small = px.bar(agg, x="branch_name", y="stock_units", color="model", barmode="group",
+                   hover_data=["avg_days_on_lot", "msrp"])
+    t_agg = time.perf_counter() - t0
+    print(f"inventory bars ({len(invb):,} rows): raw {mb(raw):7.1f} MB in {t_raw:.2f}s  "
+          f"aggregated {mb(small):6.3f} MB ({len(agg)} bars) in {t_agg:.2f}s")
+
+    scores = np.random.default_rng(0).uniform(0, 100, args.scores)
+    raw = px.histogram(x=scores, nbins=chartdata.HIST_BINS)
+    t0 = time.perf_counter()
+    bins = chartdata.histogram(scores, range=(0, 100))
+    t_bins = time.perf_counter() - t0
+    small = px.bar(bins, x="bin_mid", y="count")
+    print(f"score histogram ({args.scores:,} leads): raw {mb(raw):7.1f} MB  binned {mb(small):6.3f} MB "
+          f"(binning {t_bins * 1000:.0f} ms)")
+
+    n = 1_000_000
+    series = pd.DataFrame({"t": pd.date_range("2000-01-01", periods=n, freq="min"),
+                           "y": np.cumsum(np.random.default_rng(1).normal(size=n))})
+    t0 = time.perf_counter()
+    down = chartdata.downsample(series, "t", "y")
+    t_lttb = time.perf_counter() - t0
+    print(f"series ({n:,} points): raw {mb(px.line(series, x='t', y='y')):7.1f} MB  "
+          f"LTTB {len(down):,} points {mb(px.line(down, x='t', y='y')):6.3f} MB in {t_lttb:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
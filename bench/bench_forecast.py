@@ -0,0 +1,59 @@
+# Benchmark: serial vs process-pool county forecasting.
+#   python bench/bench_forecast.py [--repeat 3]
+import os
+import sys
+import time
+import argparse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import pandas as pd
+from core.io import load_all_datasets
+from core import forecast
+
+
+def _time(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    eri, hist, *_ = load_all_datasets(prefer_real=True)
+    counties = sorted(hist["county"].unique().tolist())
+    engine = forecast.default_engine()
+    print(f"engine={engine} counties={len(counties)} cores={os.cpu_count()}")
+
+    serial = forecast.make_county_forecasts(hist, eri, counties, 0.1, 0.15, n_jobs=1)
+    t1 = _time(lambda: forecast.make_county_forecasts(hist, eri, counties, 0.1, 0.15, n_jobs=1), args.repeat)
+    print(f"workers=1  {t1:8.2f}s  speedup=1.00x")
+
+    workers = 2
+    while workers <= (os.cpu_count() or 1):
+        par = forecast.make_county_forecasts(hist, eri, counties, 0.1, 0.15, n_jobs=workers)
+        pd.testing.assert_frame_equal(serial, par)
+        tn = _time(lambda: forecast.make_county_forecasts(hist, eri, counties, 0.1, 0.15, n_jobs=workers), args.repeat)
+        print(f"workers={workers:<2} {tn:8.2f}s  speedup={t1 / tn:.2f}x")
+        workers *= 2
+
+    # Batch engines on county x model sized inputs (series replicated from the sample history)
+    for copies in (1, 10, 100):
+        big = pd.concat([hist.assign(county=hist["county"].astype(str) + f"#{i}") for i in range(copies)],
+                        ignore_index=True)
+        n_series = big["county"].nunique()
+        for engine in forecast.BATCH_ENGINES:
+            tb = _time(lambda: forecast.batch_forecast(big, periods=3, engine=engine), args.repeat)
+            print(f"batch {engine:<6} series={n_series:<5} {tb * 1000:8.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+# Benchmark: cold import cost of the modules the pages load at the top.
+# Each measurement runs in a fresh interpreter.
+#   python bench/bench_import.py [--repeat 5]
+import os
+import sys
+import argparse
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODULES = ["pandas", "core.io", "core.forecast", "core.scoring", "core.optimize"]
+
+_SNIPPET = """
+import time, sys
+sys.path.insert(0, {root!r})
+import pandas
+t0 = time.perf_counter()
+import {mod}
+t1 = time.perf_counter()
+{extra}
+t2 = time.perf_counter()
+print(t1 - t0, t2 - t1)
+"""
+
+
+def _run(mod: str, extra: str = "") -> tuple:
+    code = _SNIPPET.format(root=ROOT, mod=mod, extra=extra)
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    a, b = out.stdout.split()
+    return float(a), float(b)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+
+    print("import time on top of pandas (best of %d)" % args.repeat)
+    for mod in MODULES:
+        best = min(_run(mod)[0] for _ in range(args.repeat))
+        print(f"  {mod:<16} {best * 1000:8.1f}ms")
+
+    # What the first fit pays once backends are resolved lazily
+    extra = "import core.forecast as f; f.default_engine(); f._arima_cls()"
+    best = min(_run("core.forecast", extra)[1] for _ in range(args.repeat))
+    print(f"  first-fit backend resolution {best * 1000:8.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+# Benchmark: bulk per-branch / per-county PDF reports (core.pdf.build_report_pack) on a synthetic
+# network, serial vs a process pool, into a zip. Also times one report with the logo embedded at
+# its source resolution and ASCII85 image streams (the previous rendering path) for reference.
+#   python bench/bench_pdf.py [--branches 300] [--models 20] [--leads 50000] [--jobs 4]
+import os
+import sys
+import time
+import argparse
+import tempfile
+import zipfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import numpy as np
+import pandas as pd
+from reportlab.lib.utils import ImageReader
+from core import io
+from core import pdf
+from bench_optimize import make_network
+from bench_scoring import make_crm
+
+LOGO = os.path.join(ROOT, "assets", "logo.png")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--branches", type=int, default=300)
+    ap.add_argument("--models", type=int, default=20)
+    ap.add_argument("--leads", type=int, default=50_000)
+    ap.add_argument("--jobs", type=int, default=4)
+    args = ap.parse_args()
+
+    inv, branches = make_network(args.branches, args.models)
+    rng = np.random.default_rng(0)
+    branches["serves_counties"] = [f"{c}|{d}" for c, d in zip(branches["county"], rng.choice(branches["county"], len(branches)))]
+    crm = io._apply_dtypes(make_crm(args.leads), io._schema_for("CRM"))
+    eri = io._read_dataset_file(os.path.join(ROOT, "data", "sample", "EV_Readiness_Index.csv"), "EV_Readiness_Index")
+    hist = io._read_dataset_file(os.path.join(ROOT, "data", "sample", "Historical_Registrations.csv"), "Historical_Registrations")
+    print(f"branches={args.branches:,} models={args.models} leads={args.leads:,} cpus={os.cpu_count()}")
+
+    tmp = tempfile.mkdtemp()
+    runs = {}
+    for jobs in (1, args.jobs):
+        zip_path = os.path.join(tmp, f"reports_{jobs}.zip")
+        res = pdf.build_report_pack(eri, hist, branches, inv, crm, LOGO, out_dir=None, zip_path=zip_path, n_jobs=jobs)
+        assert not res["errors"], res["errors"]
+        runs[jobs] = zipfile.ZipFile(zip_path).namelist()
+        print(f"{res['workers']} worker(s): {res['reports']:,} reports, {res['pages']:,} pages, "
+              f"{res['bytes'] / 1e6:.1f} MB  partition {res['partition_seconds']:.2f}s  render {res['render_seconds']:.2f}s  "
+              f"{res['pages_per_s']:,.0f} pages/s")
+    assert runs[1] == runs[args.jobs]
+
+    # Previous path: full-resolution logo, ASCII85 image streams
+    plan = pd.DataFrame(columns=["from_branch", "to_branch", "model", "units", "distance_km", "transfer_cost"])
+    forecast = pd.DataFrame(columns=["county", "period", "forecast"])
+    kind, name, part = pdf._partition(eri, branches, inv, crm, plan, forecast, ["branch"], pdf.TOP_LEADS)[0]
+    # (_render without _render_part's binary-stream switch, so reportlab's default ASCII85 applies)
+    t0 = time.perf_counter()
+    data, pages = pdf._render(pdf._DRAW[kind], part, ImageReader(LOGO))
+    print(f"previous path: {time.perf_counter() - t0:.2f}s and {len(data) / 1e6:.1f} MB for one {pages}-page report")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+# Benchmark: out-of-core propensity model. Trains on a synthetic CRM whose conversions follow
+# the hand-tuned score through a logistic link, then scores the file under a memory budget and
+# reports load time, throughput and how well the learned ranking matches the labels.
+#   python bench/bench_propensity.py [--rows 1000000] [--memory-mb 128]
+import os
+import sys
+import argparse
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import numpy as np
+import pandas as pd
+from core import io
+from core import scoring
+from core import propensity
+from bench_scoring import make_crm
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=1_000_000)
+    ap.add_argument("--memory-mb", type=float, default=128)
+    ap.add_argument("--epochs", type=int, default=2)
+    args = ap.parse_args()
+
+    tmp = tempfile.mkdtemp()
+    crm = make_crm(args.rows)
+    eri = io._read_dataset_file(os.path.join(ROOT, "data", "sample", "EV_Readiness_Index.csv"), "EV_Readiness_Index")
+    score = scoring.score_leads(io._apply_dtypes(crm.copy(), io._schema_for("CRM")), eri)["score"].to_numpy()
+    rng = np.random.default_rng(2)
+    crm["converted"] = (rng.random(args.rows) < 1 / (1 + np.exp(-(score - 60) / 6))).astype(int)
+    crm_path = os.path.join(tmp, "CRM.csv")
+    crm.to_csv(crm_path, index=False)
+    print(f"CRM rows={args.rows:,}  conversion rate={crm['converted'].mean():.3f}")
+
+    model_path = os.path.join(tmp, "propensity.pkl")
+    rep = propensity.train_propensity(crm_path, eri, epochs=args.epochs, model_path=model_path)
+    print(f"train  {rep['seconds']:7.2f}s  {rep['rows_per_s']:10,} rows/s  log loss={rep['progressive_log_loss']}")
+    print(f"       coef={rep['coef']}")
+
+    out_path = os.path.join(tmp, "propensity.parquet")
+    rep = propensity.score_propensity(crm_path, eri, out_path, model_path=model_path, memory_budget_mb=args.memory_mb)
+    print(f"score  {rep['score_seconds']:7.2f}s  {rep['rows_per_s']:10,} rows/s  load={rep['load_seconds'] * 1000:.1f}ms  "
+          f"chunk={rep['chunk_rows']:,} (budget {args.memory_mb:g}MB)")
+
+    from sklearn.metrics import roc_auc_score  # type: ignore
+    p = pd.read_parquet(out_path)["propensity"].to_numpy()
+    y = crm["converted"].to_numpy()
+    print(f"AUC  learned={roc_auc_score(y, p):.3f}  hand-tuned={roc_auc_score(y, score):.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+# Benchmark: revenue simulation. simulate_uplift over a conversion x margin grid, as arrays vs one
+# scalar call per point (results must match), then Monte Carlo (core.revenue.simulate_uplift_mc):
+# 1M-draw runs with tracemalloc peak memory for a few chunk sizes; the point-estimate case must
+# equal simulate_uplift exactly.
+#   python bench/bench_revenue.py [--draws 1000000] [--grid 300]
+import os
+import sys
+import time
+import argparse
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import numpy as np
+from core.revenue import simulate_uplift, simulate_uplift_mc
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--draws", type=int, default=1_000_000)
+    ap.add_argument("--grid", type=int, default=300)
+    args = ap.parse_args()
+
+    base = (0.05, 2000, 180, 4000.0, 60, 150.0)
+    conv = np.linspace(0.01, 0.2, args.grid)
+    margin = np.linspace(1000.0, 8000.0, args.grid)
+    t0 = time.perf_counter()
+    loop = np.array([[simulate_uplift(c, 2000, 180, m, 60, 150.0)["uplift_revenue"] for m in margin] for c in conv])
+    t_loop = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    grid = simulate_uplift(conv[:, None], 2000, 180, margin[None, :], 60, 150.0)["uplift_revenue"]
+    t_grid = time.perf_counter() - t0
+    np.testing.assert_allclose(grid, loop, atol=0.01)
+    print(f"grid {args.grid}x{args.grid}: scalar calls {t_loop:.3f}s  arrays {t_grid:.4f}s  speedup x{t_loop / t_grid:,.0f}")
+
+    point = simulate_uplift_mc(*base, n_draws=1000)
+    assert point["p5"] == point["p95"] == simulate_uplift(*base)["uplift_revenue"]
+
+    rng = np.random.default_rng(0)
+    margins = rng.gamma(9.0, 450.0, 5000)
+    stock = rng.integers(0, 20, 5000)
+    kw = dict(conversion_sd=0.01, margin_samples=margins, margin_weights=stock,
+              plan_error_sd=0.15, transfer_cost_cv=0.2, n_draws=args.draws)
+    print(f"draws={args.draws:,}")
+    for chunk in (50_000, 250_000, 1_000_000):
+        t0 = time.perf_counter()
+        res = simulate_uplift_mc(*base, chunk_draws=chunk, **kw)
+        secs = time.perf_counter() - t0
+        tracemalloc.start()
+        simulate_uplift_mc(*base, chunk_draws=chunk, **kw)
+        peak = tracemalloc.get_traced_memory()[1] / 1e6
+        tracemalloc.stop()
+        print(f"chunk={chunk:>9,}  {secs:5.3f}s  peak={peak:6.1f} MB  "
+              f"P5={res['p5']:>10,.0f}  P50={res['p50']:>10,.0f}  P95={res['p95']:>10,.0f}  P(loss)={res['prob_loss']:.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+# Benchmark: cold start of the home page and each page. Every script is rendered once with
+# Streamlit's AppTest in a fresh interpreter run with -X importtime. Reports wall time from
+# process launch to the end of the first render, import time by top-level package, and which
+# heavy libraries got loaded. --baseline adds another checkout (e.g. a git worktree of an older
+# commit), run interleaved with this one so both see the same machine state; medians are shown.
+#   python bench/bench_startup.py [--baseline /tmp/base] [--repeat 5] [--top 8]
+import os
+import sys
+import json
+import time
+import argparse
+import subprocess
+from collections import defaultdict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPTS = ["app/app.py", "app/pages/1_Overview.py", "app/pages/2_Forecasts.py", "app/pages/3_Leads.py",
+           "app/pages/4_Inventory_Optimizer.py", "app/pages/5_Revenue_Simulator.py", "app/pages/6_Admin_Data.py"]
+HEAVY = ["pandas", "plotly.express", "reportlab", "statsmodels", "prophet", "sklearn", "pulp", "PIL.Image"]
+
+CHILD = r"""
+import sys, json, time, os
+root, script, heavy, launched = sys.argv[1], sys.argv[2], json.loads(sys.argv[3]), float(sys.argv[4])
+os.chdir(root)
+sys.path.insert(0, root)
+from streamlit.testing.v1 import AppTest
+t_render = time.time()
+at = AppTest.from_file(os.path.join(root, script), default_timeout=300)
+for k, v in {"sel_counties": [], "alpha": 0.10, "market_share": 0.15, "forecast_df": None, "forecast_next": None,
+             "plan_units": None, "optimizer_plan": None, "transfer_units": 0, "transfer_cost_per_unit": 50}.items():
+    at.session_state[k] = v
+at.run()
+done = time.time()
+print(json.dumps({"first_render_s": done - launched, "render_s": done - t_render,
+                  "exceptions": len(at.exception), "loaded": [m for m in heavy if m in sys.modules]}))
+"""
+
+
+def run_once(root: str, script: str):
+    launched = time.time()
+    p = subprocess.run([sys.executable, "-X", "importtime", "-c", CHILD, root, script, json.dumps(HEAVY), str(launched)],
+                       capture_output=True, text=True, cwd=root)
+    res = json.loads(p.stdout.strip().splitlines()[-1])
+    by_pkg = defaultdict(float)
+    for line in p.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            parts = line[len("import time:"):].split("|")
+            if parts[0].strip().isdigit():
+                by_pkg[parts[2].strip().split(".")[0]] += int(parts[0]) / 1e6
+    res["imports"] = dict(by_pkg)
+    return res
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--root", default=ROOT)
+    ap.add_argument("--baseline", default=None)
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--top", type=int, default=8)
+    args = ap.parse_args()
+    roots = {"current": os.path.abspath(args.root)}
+    if args.baseline:
+        roots["baseline"] = os.path.abspath(args.baseline)
+    for name, root in roots.items():
+        print(f"{name}: {root}")
+    for script in SCRIPTS:
+        runs = {name: [] for name in roots}
+        for _ in range(args.repeat):
+            for name, root in roots.items():
+                runs[name].append(run_once(root, script))
+        print(script)
+        for name in reversed(list(roots)):
+            rs = sorted(runs[name], key=lambda r: r["first_render_s"])
+            med = rs[len(rs) // 2]
+            imports = sorted(med["imports"].items(), key=lambda kv: -kv[1])
+            print(f"  {name:9s} first render {med['first_render_s']:5.2f}s (median of {args.repeat})  "
+                  f"imports {sum(v for _, v in imports):5.2f}s  exceptions={med['exceptions']}  "
+                  f"loaded: {', '.join(med['loaded']) or '-'}")
+            print("            " + "  ".join(f"{k} {v:.2f}" for k, v in imports[:args.top]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+# Benchmark: optimizer parameter sweep, serial vs a process pool, on a synthetic network.
+# Checks the two give identical results and prints the Pareto set (cost vs residual shortfall).
+#   python bench/bench_sweep.py [--branches 300] [--models 20] [--jobs 4]
+import os
+import sys
+import time
+import argparse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import pandas as pd
+from core import sweep
+from bench_optimize import make_network
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--branches", type=int, default=300)
+    ap.add_argument("--models", type=int, default=20)
+    ap.add_argument("--jobs", type=int, default=4)
+    args = ap.parse_args()
+
+    inv, branches = make_network(args.branches, args.models)
+    grid = {"min_safety": [6, 8, 10], "max_distance": [50, 100, 200, 400],
+            "max_batch": [1, 2, 3, 5], "transfer_cost_per_unit": [100.0, 150.0]}
+    print(f"branches={args.branches:,} models={args.models} combinations="
+          f"{len(grid['min_safety']) * len(grid['max_distance']) * len(grid['max_batch']) * len(grid['transfer_cost_per_unit'])} "
+          f"cpus={os.cpu_count()}")
+
+    t0 = time.perf_counter()
+    serial = sweep.sweep_reallocation(inv, branches, grid, n_jobs=1)
+    t_serial = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    pooled = sweep.sweep_reallocation(inv, branches, grid, n_jobs=args.jobs)
+    t_pool = time.perf_counter() - t0
+    pd.testing.assert_frame_equal(serial.drop(columns="seconds"), pooled.drop(columns="seconds"))
+
+    print(f"serial   {t_serial:7.2f}s")
+    print(f"{pooled.attrs['workers']} workers {t_pool:7.2f}s")
+    cols = sweep.SWEEP_PARAMS + ["units_moved", "transfer_cost", "residual_shortfall", "uplift_revenue"]
+    print(sweep.pareto_front(serial)[cols].to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+# core/backtest.py
+# Rolling-origin backtest of the forecast engines: accuracy next to fit time and memory.
+from __future__ import annotations
+import os
+import json
+import time
+import tracemalloc
+import pandas as pd
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence
+
+from core.io import DATA_DIR
+from core.forecast import (BATCH_ENGINES, FORECAST_ENGINES, _forecast_one, _resolve_workers,
+                           batch_forecast, default_engine)
+
+BACKTEST_OUT_DIR = os.path.join(DATA_DIR, "outputs", "backtest")
+
+FOLD_COLUMNS = ['engine', 'county', 'origin', 'period', 'h', 'actual', 'forecast',
+                'fit_seconds', 'peak_mem_mb', 'error']
+
+
+def _fit(engine: str, train: pd.DataFrame, horizon: int) -> pd.DataFrame:
+    if engine in BATCH_ENGINES:
+        return batch_forecast(train, periods=horizon, engine=engine)[['period', 'forecast']]
+    fc = _forecast_one(train, periods=horizon, engine=engine)
+    return fc.assign(period=pd.to_datetime(fc['period']).dt.strftime('%Y-%m'))
+
+
+def _run_fold(engine: str, county: str, train: pd.DataFrame, test: pd.DataFrame, horizon: int,
+              measure_memory: bool=True) -> List[dict]:
+    origin = train['period'].max()
+    err = None
+    t0 = time.perf_counter()
+    try:
+        fc = _fit(engine, train, horizon)
+    except Exception as e:
+        fc = pd.DataFrame({'period': test['period'].to_numpy(), 'forecast': np.nan})
+        err = f"{type(e).__name__}: {e}"
+    fit_seconds = time.perf_counter() - t0
+
+    # tracemalloc slows allocation-heavy fits several-fold, so memory gets its own (untimed) run
+    peak = np.nan
+    if measure_memory and err is None:
+        tracemalloc.start()
+        try:
+            _fit(engine, train, horizon)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+    actual = dict(zip(test['period'], test['ev_units'].astype(float)))
+    rows = []
+    for h, (p, f) in enumerate(zip(fc['period'], fc['forecast']), start=1):
+        rows.append({
+            'engine': engine, 'county': county, 'origin': origin, 'period': p, 'h': h,
+            'actual': actual.get(p, np.nan), 'forecast': float(f),
+            # Fit cost is per fold; attribute it to the first horizon row only so sums stay honest
+            'fit_seconds': fit_seconds if h == 1 else 0.0,
+            'peak_mem_mb': peak / 1e6 if peak == peak else np.nan,
+            'error': err,
+        })
+    return rows
+
+
+def _fold_tasks(hist: pd.DataFrame, engines: Sequence[str], counties: Sequence[str],
+                horizon: int, n_folds: int, step: int, min_train: int):
+    h = hist[['county', 'period', 'ev_units']].copy()
+    h['period'] = pd.to_datetime(h['period']).dt.strftime('%Y-%m')
+    for c in counties:
+        cdf = h[h['county'] == c].sort_values('period').reset_index(drop=True)
+        n = len(cdf)
+        # Origins walk back from the last point that still leaves a full horizon of actuals
+        for k in range(n_folds):
+            cut = n - horizon - k * step
+            if cut < max(min_train, 3):
+                break
+            train, test = cdf.iloc[:cut], cdf.iloc[cut:cut + horizon]
+            for e in engines:
+                yield e, c, train, test
+
+
+def rolling_origin_backtest(hist: pd.DataFrame, engines: Optional[Sequence[str]]=None, counties=None,
+                            horizon: int=3, n_folds: int=6, step: int=1, min_train: int=12,
+                            n_jobs: int=1, measure_memory: bool=True) -> pd.DataFrame:
+    # One row per (engine, county, origin, horizon step) with the fold's fit time and traced peak memory
+    engines = list(engines) if engines else [default_engine(), *BATCH_ENGINES]
+    unknown = [e for e in engines if e not in FORECAST_ENGINES and e not in BATCH_ENGINES]
+    if unknown:
+        raise ValueError(f"Unknown forecast engine(s): {unknown}")
+    counties = list(counties) if counties is not None else sorted(hist['county'].unique().tolist())
+    tasks = list(_fold_tasks(hist, engines, counties, horizon, n_folds, step, min_train))
+
+    rows: List[dict] = []
+    workers = min(_resolve_workers(n_jobs), max(len(tasks), 1))
+    if workers <= 1:
+        for t in tasks:
+            rows.extend(_run_fold(*t, horizon, measure_memory))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as ex:
+            # map() keeps task order, so results are deterministic regardless of worker count
+            n = len(tasks)
+            for r in ex.map(_run_fold, *zip(*tasks), [horizon] * n, [measure_memory] * n, chunksize=4):
+                rows.extend(r)
+    return pd.DataFrame(rows, columns=FOLD_COLUMNS)
+
+
+def _metrics(g: pd.DataFrame) -> dict:
+    ok = g.dropna(subset=['actual', 'forecast'])
+    a, f = ok['actual'].to_numpy(), ok['forecast'].to_numpy()
+    nz = a != 0
+    denom = np.abs(a) + np.abs(f)
+    fit_seconds = g['fit_seconds'].sum()
+    mape = float(np.mean(np.abs(a[nz] - f[nz]) / np.abs(a[nz])) * 100) if nz.any() else np.nan
+    smape = float(np.mean(np.where(denom > 0, 2 * np.abs(a - f) / np.where(denom > 0, denom, 1), 0)) * 100) if len(a) else np.nan
+    return {
+        'n_points': len(ok),
+        'n_failed_folds': int(g.loc[g['h'] == 1, 'error'].notna().sum()),
+        'mape': mape,
+        'smape': smape,
+        'bias': float(np.mean(f - a)) if len(a) else np.nan,
+        'fit_seconds': float(fit_seconds),
+        'fit_seconds_per_fold': float(g.loc[g['h'] == 1, 'fit_seconds'].mean()),
+        'peak_mem_mb': float(g['peak_mem_mb'].max()),
+    }
+
+
+def summarize_backtest(folds: pd.DataFrame) -> Dict[str, pd.DataFrame]:
+    by_engine = pd.DataFrame([{'engine': e, **_metrics(g)} for e, g in folds.groupby('engine', sort=True)])
+    by_county = pd.DataFrame([{'engine': e, 'county': c, **_metrics(g)}
+                              for (e, c), g in folds.groupby(['engine', 'county'], sort=True)])
+    return {'by_engine': by_engine.sort_values('smape', ignore_index=True), 'by_engine_county': by_county}
+
+
+def save_backtest(folds: pd.DataFrame, summary: Dict[str, pd.DataFrame], out_dir: str=BACKTEST_OUT_DIR) -> Dict[str, str]:
+    os.makedirs(out_dir, exist_ok=True)
+    paths = {'folds': os.path.join(out_dir, 'backtest_folds.csv')}
+    folds.to_csv(paths['folds'], index=False)
+    for name, df in summary.items():
+        paths[name] = os.path.join(out_dir, f'backtest_{name}.csv')
+        df.to_csv(paths[name], index=False)
+    paths['json'] = os.path.join(out_dir, 'backtest_summary.json')
+    with open(paths['json'], 'w') as f:
+        json.dump({name: json.loads(df.to_json(orient='records')) for name, df in summary.items()}, f, indent=2)
+    return paths
+
+
+if __name__ == "__main__":
+    import argparse
+    from core.io import load_all_datasets
+
+    ap = argparse.ArgumentParser(description="Rolling-origin backtest of the forecast engines")
+    ap.add_argument("--engines", nargs="*", default=None)
+    ap.add_argument("--horizon", type=int, default=3)
+    ap.add_argument("--folds", type=int, default=6)
+    ap.add_argument("--jobs", type=int, default=-1)
+    ap.add_argument("--out", default=BACKTEST_OUT_DIR)
+    args = ap.parse_args()
+
+    _, hist, *_ = load_all_datasets(prefer_real=True)
+    folds = rolling_origin_backtest(hist, engines=args.engines, horizon=args.horizon,
+                                    n_folds=args.folds, n_jobs=args.jobs)
+    summary = summarize_backtest(folds)
+    print(summary['by_engine'].to_string(index=False))
+    for name, path in save_backtest(folds, summary, args.out).items():
+        print(f"{name}: {path}")
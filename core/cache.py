@@ -0,0 +1,98 @@
+# core/cache.py
+# Small on-disk, content-addressed cache with LRU eviction by total size.
+from __future__ import annotations
+import os
+import pickle
+import hashlib
+import tempfile
+import threading
+from typing import Any, Optional
+
+
+def content_key(*parts) -> str:
+    h = hashlib.sha256()
+    for p in parts:
+        b = p if isinstance(p, (bytes, bytearray)) else str(p).encode("utf-8")
+        h.update(len(b).to_bytes(8, "little"))
+        h.update(b)
+    return h.hexdigest()
+
+
+class DiskCache:
+    def __init__(self, root: str, max_bytes: int = 64 * 1024 * 1024):
+        self.root = root
+        self.max_bytes = int(max_bytes)
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], f"{key}.pkl")
+
+    def get(self, key: str) -> Optional[Any]:
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                obj = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return None
+        # mtime doubles as the LRU clock
+        try:
+            os.utime(path, None)
+        except OSError:
+            pass
+        return obj
+
+    def put(self, key: str, obj: Any) -> None:
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(obj, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, path)
+        except Exception:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+        self.evict()
+
+    def clear(self) -> None:
+        for path, _, _ in self._entries():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def size_bytes(self) -> int:
+        return sum(size for _, size, _ in self._entries())
+
+    def _entries(self):
+        out = []
+        if not os.path.isdir(self.root):
+            return out
+        for dirpath, _, files in os.walk(self.root):
+            for fn in files:
+                if not fn.endswith(".pkl"):
+                    continue
+                p = os.path.join(dirpath, fn)
+                try:
+                    st = os.stat(p)
+                except OSError:
+                    continue
+                out.append((p, st.st_size, st.st_mtime))
+        return out
+
+    def evict(self) -> None:
+        with self._lock:
+            entries = self._entries()
+            total = sum(size for _, size, _ in entries)
+            if total <= self.max_bytes:
+                return
+            # Oldest access first
+            for path, size, _ in sorted(entries, key=lambda e: e[2]):
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                    total -= size
+                except OSError:
+                    pass
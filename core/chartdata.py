@@ -0,0 +1,139 @@
+# core/chartdata.py
+# Chart and table data sized to what is displayed, computed server-side so the browser payload
+# stays bounded whatever the dataset size: grouped totals with the long tail folded into "Other",
+# binned histograms, LTTB downsampling of long series, and table pages.
+from __future__ import annotations
+import numpy as np
+import pandas as pd
+from typing import Dict, Optional, Sequence, Tuple
+
+# Defaults for the pages: points per series, categories per chart axis, histogram bins
+MAX_POINTS = 1500
+MAX_CATEGORIES = 30
+HIST_BINS = 20
+OTHER = "Other"
+_theme_applied = False
+
+
+def apply_plotly_theme() -> None:
+    # The app's dark Plotly template, set once per process by the pages that draw charts (the home
+    # page draws none, so it doesn't pay for plotly at startup)
+    global _theme_applied
+    if _theme_applied:
+        return
+    import plotly.io as pio
+    pio.templates.default = "plotly_dark"  # matches dark theme
+    pio.templates["plotly_dark"]["layout"]["font"]["family"] = "Inter, system-ui, sans-serif"
+    pio.templates["plotly_dark"]["layout"]["paper_bgcolor"] = "#0B0F19"
+    pio.templates["plotly_dark"]["layout"]["plot_bgcolor"] = "#0B0F19"
+    pio.templates["plotly_dark"]["layout"]["colorway"] = ["#21D4FD","#B721FF","#00E6A8","#F9C80E","#FF3D71"]
+    _theme_applied = True
+
+
+def histogram(values, bins: int=HIST_BINS, range: Optional[Tuple[float, float]]=None) -> pd.DataFrame:
+    # Binned counts (NaN ignored): one row per bin with its edges, midpoint and count
+    v = np.asarray(values, dtype=float)
+    v = v[~np.isnan(v)]
+    if range is None and not len(v):
+        range = (0.0, 1.0)
+    counts, edges = np.histogram(v, bins=bins, range=range)
+    return pd.DataFrame({"bin_left": edges[:-1], "bin_right": edges[1:],
+                         "bin_mid": (edges[:-1] + edges[1:]) / 2, "count": counts})
+
+
+def top_categories(df: pd.DataFrame, col: str, weight: str, n: int=MAX_CATEGORIES, other: str=OTHER) -> pd.Series:
+    # `col` as strings with every value outside the n largest by total `weight` replaced by `other`
+    s = df[col].astype(str)
+    totals = df[weight].groupby(s, sort=False).sum()
+    if len(totals) <= n:
+        return s
+    keep = totals.nlargest(n).index
+    return s.where(s.isin(keep), other)
+
+
+def aggregate(df: pd.DataFrame, by: Sequence[str], sums: Sequence[str]=(), means: Dict[str, Optional[str]]=None,
+              max_categories: Optional[Dict[str, int]]=None) -> pd.DataFrame:
+    # One row per combination of `by`: `sums` summed, `means` averaged (weighted by the named column,
+    # or plain when the weight is None). max_categories caps a `by` column to its n largest values by
+    # the first of `sums`, folding the rest into OTHER.
+    means = means or {}
+    keys = {}
+    for col in by:
+        cap = (max_categories or {}).get(col)
+        keys[col] = top_categories(df, col, sums[0], cap) if cap and sums else df[col].astype(str)
+    work = pd.DataFrame(keys, index=df.index)
+    for col in sums:
+        work[col] = df[col].to_numpy(dtype=float)
+    for col, w in means.items():
+        if w is None:
+            work[f"_{col}_sum"] = df[col].to_numpy(dtype=float)
+            work[f"_{col}_w"] = 1.0
+        else:
+            weights = df[w].to_numpy(dtype=float)
+            work[f"_{col}_sum"] = df[col].to_numpy(dtype=float) * weights
+            work[f"_{col}_w"] = weights
+    out = work.groupby(list(by), as_index=False, sort=True).sum()
+    out = out.sort_values(list(by), key=lambda s: s.eq(OTHER), kind="stable", ignore_index=True)
+    for col in means:
+        w = out.pop(f"_{col}_w")
+        out[col] = out.pop(f"_{col}_sum") / w.where(w != 0)
+    return out
+
+
+def _as_float(x) -> np.ndarray:
+    x = pd.Series(x) if not isinstance(x, pd.Series) else x
+    if pd.api.types.is_datetime64_any_dtype(x):
+        return x.astype("int64").to_numpy(dtype=float)
+    if pd.api.types.is_numeric_dtype(x):
+        return x.to_numpy(dtype=float)
+    parsed = pd.to_datetime(x, errors="coerce")
+    if parsed.notna().all():
+        return parsed.astype("int64").to_numpy(dtype=float)
+    return np.arange(len(x), dtype=float)
+
+
+def lttb(x, y, n_out: int) -> np.ndarray:
+    # Largest-Triangle-Three-Buckets: positions of n_out points (first and last always kept) that
+    # preserve the visual shape of the series. x must be sorted; NumPy within each bucket.
+    x = _as_float(x)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    if n_out >= n:
+        return np.arange(n)
+    if n_out < 3:
+        return np.array([0, n - 1][:max(n_out, 0)], dtype=int)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    out = np.empty(n_out, dtype=int)
+    out[0], out[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], max(edges[i + 1], edges[i] + 1)
+        if i + 2 < len(edges):
+            nlo, nhi = edges[i + 1], max(edges[i + 2], edges[i + 1] + 1)
+            cx, cy = x[nlo:nhi].mean(), y[nlo:nhi].mean()
+        else:
+            cx, cy = x[-1], y[-1]
+        area = np.abs((x[a] - cx) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (cy - y[a]))
+        a = lo + int(np.argmax(area))
+        out[i + 1] = a
+    return out
+
+
+def downsample(df: pd.DataFrame, x: str, y: str, max_points: int=MAX_POINTS, by: Optional[str]=None) -> pd.DataFrame:
+    # Rows of df (sorted by x, per `by` group if given) reduced to at most max_points per series with
+    # LTTB; short series pass through. attrs["downsampled"] is True if any rows were dropped.
+    groups = [df] if by is None else [g for _, g in df.groupby(by, sort=False, observed=True)]
+    parts = []
+    for g in groups:
+        g = g.sort_values(x, kind="stable")
+        parts.append(g.iloc[lttb(g[x], g[y], max_points)] if len(g) > max_points else g)
+    out = pd.concat(parts) if parts else df.iloc[:0]
+    out.attrs["downsampled"] = len(out) < len(df)
+    return out
+
+
+def paginate(df: pd.DataFrame, page: int, page_size: int) -> Tuple[pd.DataFrame, int]:
+    # Rows of 1-based `page` and the number of pages (at least 1); out-of-range pages are clamped
+    n_pages = max(1, -(-len(df) // page_size))
+    page = min(max(int(page), 1), n_pages)
+    return df.iloc[(page - 1) * page_size: page * page_size], n_pages
@@ -1,16 +1,83 @@
+import os
+import time
+import multiprocessing
 import pandas as pd
 import numpy as np
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from typing import Callable, Dict, List, Optional, Tuple
 from dateutil.relativedelta import relativedelta
 
-# Try Prophet first, fall back to ARIMA
-try:
+from core.io import DATA_DIR
+from core.cache import DiskCache, content_key
+
+# Forecasting backends are imported on first fit, not at module import: Prophet and statsmodels
+# cost seconds to import and most page loads never fit a model (cached/session forecasts).
+def _prophet_cls():
     from prophet import Prophet  # type: ignore
-    _HAS_PROPHET = True
-except Exception:
-    _HAS_PROPHET = False
+    return Prophet
+
+def _arima_cls():
     from statsmodels.tsa.arima.model import ARIMA  # type: ignore
+    return ARIMA
+
+_DEFAULT_ENGINE: Optional[str] = None
+
+def default_engine() -> str:
+    # Prophet when it imports cleanly, ARIMA otherwise (resolved once per process)
+    global _DEFAULT_ENGINE
+    if _DEFAULT_ENGINE is None:
+        try:
+            _prophet_cls()
+            _DEFAULT_ENGINE = 'prophet'
+        except Exception:
+            _DEFAULT_ENGINE = 'arima'
+    return _DEFAULT_ENGINE
+
+def default_engine_hint() -> str:
+    # default_engine() without importing a backend: 'prophet' when the package is installed. For job
+    # keys and labels; the fit resolves the real default (a broken Prophet install still gets ARIMA).
+    if _DEFAULT_ENGINE is not None:
+        return _DEFAULT_ENGINE
+    import importlib.util
+    return 'prophet' if importlib.util.find_spec('prophet') is not None else 'arima'
+
+def _new_prophet():
+    Prophet = _prophet_cls()
+    return Prophet(seasonality_mode='additive', yearly_seasonality=True, weekly_seasonality=False, daily_seasonality=False)
+
+def _arima_order(n: int):
+    return (1,1,1) if n > 6 else (1,0,0)
+
+def _future_index(last, periods: int):
+    return [last + relativedelta(months=i) for i in range(1, periods+1)]
 
-def _forecast_one(county_df: pd.DataFrame, periods: int=3) -> pd.DataFrame:
+def _fit_prophet(ds: pd.Series, y: pd.Series, periods: int) -> pd.DataFrame:
+    m = _new_prophet()
+    train = pd.DataFrame({'ds': ds, 'y': y})
+    m.fit(train)
+    future = m.make_future_dataframe(periods=periods, freq='MS')
+    return m.predict(future).tail(periods)[['ds','yhat']].rename(columns={'ds':'period','yhat':'forecast'})
+
+def _fit_arima(ds: pd.Series, y: pd.Series, periods: int) -> pd.DataFrame:
+    model = _arima_cls()(y, order=_arima_order(len(y)))
+    res = model.fit()
+    pred = res.forecast(steps=periods)
+    return pd.DataFrame({'period': _future_index(ds.max(), periods), 'forecast': pred.values})
+
+# Per-series engines: name -> fit(ds, y, periods) returning period/forecast rows.
+# Fit functions must be module-level so the process pool can pickle them, and registered when
+# their module is imported so pool workers see the same registry.
+FORECAST_ENGINES: Dict[str, Callable[[pd.Series, pd.Series, int], pd.DataFrame]] = {
+    'prophet': _fit_prophet,
+    'arima': _fit_arima,
+}
+
+def register_engine(name: str, fit: Callable[[pd.Series, pd.Series, int], pd.DataFrame]) -> None:
+    if name in BATCH_ENGINES:
+        raise ValueError(f"{name} is a batch engine name")
+    FORECAST_ENGINES[name] = fit
+
+def _forecast_one(county_df: pd.DataFrame, periods: int=3, engine: Optional[str]=None) -> pd.DataFrame:
     df = county_df.copy()
     df['period'] = pd.to_datetime(df['period'])
     df = df.sort_values('period')
@@ -18,41 +85,426 @@ def _forecast_one(county_df: pd.DataFrame, periods: int=3) -> pd.DataFrame:
 
     # Ensure positive values
     y = y.clip(lower=0.0)
-    if _HAS_PROPHET:
-        m = Prophet(seasonality_mode='additive', yearly_seasonality=True, weekly_seasonality=False, daily_seasonality=False)
-        train = pd.DataFrame({'ds': df['period'], 'y': y})
+    engine = engine or default_engine()
+    if engine not in FORECAST_ENGINES:
+        raise ValueError(f"Unknown forecast engine: {engine}. Expected one of {sorted(FORECAST_ENGINES)}")
+    return FORECAST_ENGINES[engine](df['period'], y, periods)
+
+# Raw per-county forecasts, keyed on the county's history + horizon + engine + fit mode (an
+# incremental fit is not a full refit). Alpha/share never touch the fit, so slider moves are served from here.
+FORECAST_CACHE_DIR = os.path.join(DATA_DIR, "cache", "forecasts")
+FORECAST_CACHE_MAX_BYTES = 64 * 1024 * 1024
+_CACHE_VERSION = 1
+_forecast_cache = DiskCache(FORECAST_CACHE_DIR, FORECAST_CACHE_MAX_BYTES)
+
+def _series_key(cdf: pd.DataFrame, periods: int, engine: str, incremental: bool=False) -> str:
+    periods_s = pd.to_datetime(cdf['period']).dt.strftime('%Y-%m').to_numpy()
+    order = np.argsort(periods_s, kind='stable')
+    units = cdf['ev_units'].to_numpy(dtype=float)[order]
+    return content_key(_CACHE_VERSION, engine, 'incremental' if incremental else 'full', periods,
+                       '|'.join(periods_s[order]), units.tobytes())
+
+# Batch engines: every series stacked into one (series x month) matrix, forecast in one pass.
+# Cheap enough for interactive what-ifs; Prophet/ARIMA stay for the final plan.
+BATCH_ENGINES = ('ets', 'snaive', 'drift')
+_SEASON = 12
+_ETS_GRID = np.array([(a, b, g) for a in (0.1, 0.3, 0.5, 0.7)
+                      for b in (0.0, 0.05, 0.15)
+                      for g in (0.0, 0.1, 0.3)])
+
+def _stack_series(df: pd.DataFrame, key: str, value: str):
+    # Right-align every series on its own last month so column -1 is each key's latest observation
+    d = df[[key, 'period', value]].copy()
+    d[key] = d[key].astype(object)
+    d['period'] = pd.to_datetime(d['period']).dt.to_period('M')
+    d = d.groupby([key, 'period'], observed=True, sort=True)[value].sum().reset_index()
+    keys = d[key].drop_duplicates().tolist()
+    kidx = d[key].map({k: i for i, k in enumerate(keys)}).to_numpy(dtype=np.int64)
+    pnum = d['period'].array.asi8
+    last = pd.Series(pnum).groupby(kidx).max().to_numpy()
+    first = pd.Series(pnum).groupby(kidx).min().to_numpy()
+    n_obs = last - first + 1
+    T = int(n_obs.max())
+    Y = np.full((len(keys), T), np.nan)
+    Y[kidx, T - 1 - (last[kidx] - pnum)] = d[value].to_numpy(dtype=float)
+    Y = np.clip(Y, 0.0, None)
+    # Interior gaps carry the previous month forward; months before a series starts take its first value
+    Y = pd.DataFrame(Y).ffill(axis=1).bfill(axis=1).to_numpy()
+    last_period = [pd.Period(ordinal=int(o), freq='M') for o in last]
+    return keys, Y, n_obs, last_period
+
+def _snaive_matrix(Y: np.ndarray, n_obs: np.ndarray, periods: int) -> np.ndarray:
+    T = Y.shape[1]
+    h = np.arange(periods)
+    out = np.repeat(Y[:, -1:], periods, axis=1)
+    if T >= _SEASON:
+        seasonal = Y[:, T - _SEASON + (h % _SEASON)]
+        has_season = (n_obs >= _SEASON)[:, None]
+        out = np.where(has_season, seasonal, out)
+    return out
+
+def _drift_matrix(Y: np.ndarray, n_obs: np.ndarray, periods: int) -> np.ndarray:
+    T = Y.shape[1]
+    first = Y[np.arange(len(Y)), T - n_obs]
+    slope = np.where(n_obs > 1, (Y[:, -1] - first) / np.maximum(n_obs - 1, 1), 0.0)
+    return Y[:, -1:] + slope[:, None] * np.arange(1, periods + 1)
+
+def _ets_matrix(Y: np.ndarray, periods: int) -> np.ndarray:
+    # Additive Holt-Winters with one (alpha, beta, gamma) shared by all series, picked from a small
+    # grid by total one-step squared error. Grid x series is vectorized; only time is a Python loop.
+    N, T = Y.shape
+    m = _SEASON if T >= _SEASON else 0
+    a = _ETS_GRID[:, 0][:, None]
+    b = _ETS_GRID[:, 1][:, None]
+    g = _ETS_GRID[:, 2][:, None] if m else np.zeros_like(a)
+    G = len(_ETS_GRID)
+
+    if m:
+        level = np.broadcast_to(Y[:, :m].mean(axis=1), (G, N)).copy()
+        if T >= 2 * m:
+            trend0 = (Y[:, m:2*m].mean(axis=1) - Y[:, :m].mean(axis=1)) / m
+        else:
+            trend0 = np.zeros(N)
+        season = np.broadcast_to(Y[:, :m] - Y[:, :m].mean(axis=1, keepdims=True), (G, N, m)).copy()
+    else:
+        level = np.broadcast_to(Y[:, 0], (G, N)).copy()
+        trend0 = np.zeros(N)
+        season = np.zeros((G, N, 1))
+    trend = np.broadcast_to(trend0, (G, N)).copy()
+    sse = np.zeros(G)
+    for t in range(T):
+        si = t % m if m else 0
+        s = season[:, :, si]
+        pred = level + trend + s
+        err = Y[:, t] - pred
+        sse += (err ** 2).sum(axis=1)
+        new_level = a * (Y[:, t] - s) + (1 - a) * (level + trend)
+        trend = b * (new_level - level) + (1 - b) * trend
+        if m:
+            season[:, :, si] = g * (Y[:, t] - new_level) + (1 - g) * s
+        level = new_level
+
+    best = int(np.argmin(sse))
+    h = np.arange(1, periods + 1)
+    fc = level[best][:, None] + trend[best][:, None] * h
+    if m:
+        fc = fc + season[best][:, (T + h - 1) % m]
+    return fc
+
+def batch_forecast(df: pd.DataFrame, periods: int=3, engine: str='ets', key: str='county',
+                   value: str='ev_units') -> pd.DataFrame:
+    # Forecast every `key` series of `df` at once; returns key, period (YYYY-MM), forecast
+    if engine not in BATCH_ENGINES:
+        raise ValueError(f"Unknown batch engine: {engine}. Expected one of {BATCH_ENGINES}")
+    if df.empty:
+        return pd.DataFrame(columns=[key, 'period', 'forecast'])
+    keys, Y, n_obs, last_period = _stack_series(df, key, value)
+    if engine == 'snaive':
+        F = _snaive_matrix(Y, n_obs, periods)
+    elif engine == 'drift':
+        F = _drift_matrix(Y, n_obs, periods)
+    else:
+        F = _ets_matrix(Y, periods)
+    out_period = [(p + h).strftime('%Y-%m') for p in last_period for h in range(1, periods + 1)]
+    return pd.DataFrame({
+        key: np.repeat(np.asarray(keys, dtype=object), periods),
+        'period': out_period,
+        'forecast': F.reshape(-1),
+    })
+
+# Incremental mode: fitted per-county model state is kept on disk. When the history only gained
+# new months, the stored parameters are re-filtered (ARIMA) or warm-started (Prophet) instead
+# of refitting; a full fit happens every REFIT_EVERY new months or when the new observations
+# drift more than DRIFT_THRESHOLD residual sigmas from the stored model's one-step predictions.
+MODEL_STATE_DIR = os.path.join(DATA_DIR, "cache", "models")
+REFIT_EVERY = 6
+DRIFT_THRESHOLD = 3.0
+_model_store = DiskCache(MODEL_STATE_DIR, 256 * 1024 * 1024)
+
+def _stan_init(m) -> dict:
+    res = {pname: m.params[pname][0][0] for pname in ['k', 'm', 'sigma_obs']}
+    res.update({pname: m.params[pname][0] for pname in ['delta', 'beta']})
+    return res
+
+def _full_fit_state(engine: str, ds: pd.Series, y: pd.Series, periods: int):
+    if engine == 'prophet':
+        from prophet.serialize import model_to_json  # type: ignore
+        m = _new_prophet()
+        train = pd.DataFrame({'ds': ds, 'y': y})
         m.fit(train)
+        insample = m.predict(train[['ds']])['yhat'].to_numpy()
         future = m.make_future_dataframe(periods=periods, freq='MS')
         fc = m.predict(future).tail(periods)[['ds','yhat']].rename(columns={'ds':'period','yhat':'forecast'})
+        state = {'model_json': model_to_json(m), 'init': _stan_init(m)}
     else:
-        order = (1,1,1) if len(y) > 6 else (1,0,0)
-        model = ARIMA(y, order=order)
-        res = model.fit()
-        pred = res.forecast(steps=periods)
-        last = df['period'].max()
-        idx = [last + relativedelta(months=i) for i in range(1, periods+1)]
-        fc = pd.DataFrame({'period': idx, 'forecast': pred.values})
+        order = _arima_order(len(y))
+        res = _arima_cls()(y, order=order).fit()
+        insample = res.fittedvalues.to_numpy()
+        fc = pd.DataFrame({'period': _future_index(ds.max(), periods),
+                           'forecast': res.forecast(steps=periods).values})
+        state = {'order': order, 'params': res.params.to_numpy()}
+    state['sigma'] = float(np.nanstd(y.to_numpy() - insample)) or 1.0
+    return fc, state
+
+def _forecast_incremental(county_df: pd.DataFrame, periods: int=3, engine: Optional[str]=None) -> pd.DataFrame:
+    engine = engine or default_engine()
+    if engine not in ('prophet', 'arima'):
+        return _forecast_one(county_df, periods=periods, engine=engine)
+    df = county_df.copy()
+    df['period'] = pd.to_datetime(df['period'])
+    df = df.sort_values('period').reset_index(drop=True)
+    y = df['ev_units'].astype(float).clip(lower=0.0)
+    key = content_key('model-state', _CACHE_VERSION, engine, str(df['county'].iloc[0]))
+    months = df['period'].dt.strftime('%Y-%m').tolist()
 
+    state = _model_store.get(key)
+    n_old = len(state['months']) if state else 0
+    reuse = (
+        state is not None
+        and 0 < n_old <= len(y)
+        and state['months'] == months[:n_old]
+        and np.array_equal(state['y'], y.to_numpy()[:n_old])
+        and len(y) - state['fit_n'] < REFIT_EVERY
+    )
+    if reuse and engine == 'arima' and state['order'] != _arima_order(len(y)):
+        reuse = False
+
+    fc = None
+    if reuse:
+        if engine == 'prophet':
+            from prophet.serialize import model_from_json  # type: ignore
+            old = model_from_json(state['model_json'])
+            new = df.iloc[n_old:]
+            if len(new):
+                pred = old.predict(pd.DataFrame({'ds': new['period']}))['yhat'].to_numpy()
+                z = np.abs(y.to_numpy()[n_old:] - pred) / state['sigma']
+                reuse = not (z > DRIFT_THRESHOLD).any()
+            if reuse:
+                from prophet.serialize import model_to_json  # type: ignore
+                m = _new_prophet()
+                m.fit(pd.DataFrame({'ds': df['period'], 'y': y}), init=state['init'])
+                future = m.make_future_dataframe(periods=periods, freq='MS')
+                fc = m.predict(future).tail(periods)[['ds','yhat']].rename(columns={'ds':'period','yhat':'forecast'})
+                state['model_json'] = model_to_json(m)
+                state['init'] = _stan_init(m)
+        else:
+            res = _arima_cls()(y, order=state['order']).filter(state['params'])
+            errs = res.filter_results.forecasts_error[0][n_old:]
+            z = np.abs(errs) / state['sigma']
+            if (z > DRIFT_THRESHOLD).any():
+                reuse = False
+            else:
+                fc = pd.DataFrame({'period': _future_index(df['period'].max(), periods),
+                                   'forecast': res.forecast(steps=periods).values})
+
+    if fc is None:
+        fc, fitted = _full_fit_state(engine, df['period'], y, periods)
+        state = dict(fitted, fit_n=len(y))
+    state['months'] = months
+    state['y'] = y.to_numpy()
+    _model_store.put(key, state)
     return fc
 
-def make_county_forecasts(hist: pd.DataFrame, eri: pd.DataFrame, counties, alpha: float, share: float) -> pd.DataFrame:
-    out_rows = []
-    eri2 = eri[['county','readiness_score']].copy()
-    z = (eri2['readiness_score'] - eri2['readiness_score'].mean()) / (eri2['readiness_score'].std() + 1e-6)
-    eri2['readiness_z'] = z
+def _resolve_workers(n_jobs: int) -> int:
+    # n_jobs <= 0 means "one worker per core", like joblib's -1
+    if n_jobs is None or n_jobs <= 0:
+        return os.cpu_count() or 1
+    return int(n_jobs)
+
+def _fit_counties(hist: pd.DataFrame, counties, periods: int=3, n_jobs: int=1,
+                  timeout: Optional[float]=None, incremental: bool=False,
+                  engine: Optional[str]=None,
+                  progress: Optional[Callable[[float, str], None]]=None) -> Tuple[List[Tuple[str, pd.DataFrame]], Dict[str, str]]:
+    # Returns [(county, fc), ...] in the order of `counties` plus {county: error} for failed fits.
+    # timeout (pool path only) is per county, in seconds from when that county's fit starts.
+    # progress(fraction, message) is called after each county; an exception from it (e.g. a
+    # cancelled job) stops the remaining fits.
+    jobs = []
+    for c in counties:
+        cdf = hist[hist['county']==c]
+        if len(cdf) < 3:
+            continue
+        jobs.append((c, cdf[['county','period','ev_units']]))
+
+    fit_one = _forecast_incremental if incremental else _forecast_one
+    fitted: List[Tuple[str, pd.DataFrame]] = []
+    errors: Dict[str, str] = {}
+    workers = min(_resolve_workers(n_jobs), max(len(jobs), 1))
+
+    if workers <= 1:
+        for i, (c, cdf) in enumerate(jobs):
+            try:
+                fitted.append((c, fit_one(cdf, periods=periods, engine=engine)))
+            except Exception as e:
+                errors[c] = f"{type(e).__name__}: {e}"
+            if progress is not None:
+                progress((i + 1) / len(jobs), f"Fitted {c}")
+        return fitted, errors
+
+    # Pool path: workers report when each county's fit starts, so `timeout` is per county and
+    # counted from that start, not from when the parent begins waiting. A fit past its deadline
+    # can't be interrupted inside the worker, so the pool's processes are terminated and the
+    # counties still queued or running are resubmitted on a fresh pool.
+    results: Dict[str, pd.DataFrame] = {}
+    todo = list(jobs)
+    n_done = 0
+    ex = started_q = None
+
+    def collect(fut, c: str) -> None:
+        nonlocal n_done
+        try:
+            results[c] = fut.result()
+        except Exception as e:
+            errors[c] = f"{type(e).__name__}: {e}"
+        n_done += 1
+        if progress is not None:
+            progress(n_done / len(jobs), f"Fitted {c}")
+
+    try:
+        while todo:
+            # A fresh queue per pool: terminating a worker mid-put can leave a queue unusable
+            started_q = multiprocessing.get_context().Queue()
+            ex = ProcessPoolExecutor(max_workers=workers, initializer=_init_fit_worker, initargs=(started_q,))
+            futures = {ex.submit(_fit_reporting_start, fit_one, c, cdf, periods, engine): (c, cdf) for c, cdf in todo}
+            todo, started, expired = [], {}, []
+            while futures and not expired:
+                now = time.time()
+                waits = [started[c] + timeout - now for c, _ in futures.values() if c in started] if timeout else []
+                done, _ = wait(futures, timeout=min(waits + [0.5]) if timeout else None, return_when=FIRST_COMPLETED)
+                while not started_q.empty():
+                    c, t = started_q.get()
+                    started[c] = t
+                for fut in done:
+                    collect(fut, futures.pop(fut)[0])
+                if timeout:
+                    now = time.time()
+                    expired = [f for f, (c, _) in futures.items() if c in started and now - started[c] > timeout]
+            for fut in expired:
+                c, _ = futures.pop(fut)
+                errors[c] = f"Timeout: fit still running after {timeout}s"
+                n_done += 1
+                if progress is not None:
+                    progress(n_done / len(jobs), f"Timed out {c}")
+            if expired:
+                # Fits that finished meanwhile are kept; the rest start over on the next pool
+                for fut in [f for f in futures if f.done()]:
+                    collect(fut, futures.pop(fut)[0])
+                todo = list(futures.values())
+                _terminate_pool(ex)
+            else:
+                ex.shutdown()
+            ex = None
+            started_q.close()
+    finally:
+        # Reached with a pool still up only when progress() aborted or a fit raised past us
+        if ex is not None:
+            _terminate_pool(ex)
+            started_q.close()
+    fitted = [(c, results[c]) for c, _ in jobs if c in results]
+    return fitted, errors
+
+_fit_started_q = None
+
+def _init_fit_worker(q) -> None:
+    global _fit_started_q
+    _fit_started_q = q
+
+def _fit_reporting_start(fit_one, county: str, cdf: pd.DataFrame, periods: int, engine: Optional[str]):
+    _fit_started_q.put((county, time.time()))
+    return fit_one(cdf, periods, engine)
+
+def _terminate_pool(ex: ProcessPoolExecutor) -> None:
+    # Stop the pool without waiting on running fits: shutdown() can't interrupt them, so the
+    # worker processes are terminated (ProcessPoolExecutor has no public way to do this)
+    processes = list((getattr(ex, "_processes", None) or {}).values())
+    ex.shutdown(wait=False, cancel_futures=True)
+    for p in processes:
+        if p.is_alive():
+            p.terminate()
+    for p in processes:
+        p.join(5)
+
+def fit_raw_forecasts(hist: pd.DataFrame, counties, periods: int=3, n_jobs: int=1,
+                      timeout: Optional[float]=None, use_cache: bool=True,
+                      engine: Optional[str]=None, incremental: bool=False,
+                      progress: Optional[Callable[[float, str], None]]=None) -> pd.DataFrame:
+    # Unadjusted model output: county, period (YYYY-MM), forecast.
+    # progress(fraction, message) is reported per county fitted (cache hits are not reported)
+    if engine in BATCH_ENGINES:
+        counts = hist['county'].value_counts()
+        keep = [c for c in counties if counts.get(c, 0) >= 3]
+        sub = hist[hist['county'].isin(keep)]
+        res = batch_forecast(sub, periods=periods, engine=engine)
+        order = {c: i for i, c in enumerate(keep)}
+        res = res.iloc[np.argsort(res['county'].map(order).to_numpy(), kind='stable')].reset_index(drop=True)
+        res.attrs['errors'] = {}
+        return res
+    engine = engine or default_engine()
+    if engine not in FORECAST_ENGINES:
+        raise ValueError(f"Unknown forecast engine: {engine}. Expected one of {sorted(FORECAST_ENGINES) + list(BATCH_ENGINES)}")
+    cached: Dict[str, pd.DataFrame] = {}
+    keys: Dict[str, str] = {}
+    misses = []
     for c in counties:
         cdf = hist[hist['county']==c]
         if len(cdf) < 3:
             continue
-        fc = _forecast_one(cdf, periods=3)
-        rz = float(eri2.loc[eri2['county']==c, 'readiness_z'].fillna(0).iloc[0]) if (eri2['county']==c).any() else 0.0
-        adj = 1 + alpha * rz
-        fc['county'] = c
-        fc['forecast_adj'] = (fc['forecast'] * adj).clip(lower=0.0)
-        fc['expected_dealer_units'] = (fc['forecast_adj'] * share).round(0).astype(int)
-        out_rows.append(fc)
+        if use_cache:
+            keys[c] = _series_key(cdf, periods, engine, incremental)
+            hit = _forecast_cache.get(keys[c])
+            if hit is not None:
+                cached[c] = hit
+                continue
+        misses.append(c)
+
+    fitted, errors = _fit_counties(hist, misses, periods=periods, n_jobs=n_jobs, timeout=timeout,
+                                   incremental=incremental, engine=engine, progress=progress)
+    for c, fc in fitted:
+        fc = fc[['period','forecast']].reset_index(drop=True)
+        if use_cache:
+            _forecast_cache.put(keys[c], fc)
+        cached[c] = fc
+
+    out_rows = []
+    for c in counties:
+        if c in cached:
+            out_rows.append(cached[c].assign(county=c))
     if not out_rows:
-        return pd.DataFrame()
-    res = pd.concat(out_rows, ignore_index=True)
-    res['period'] = pd.to_datetime(res['period']).dt.strftime('%Y-%m')
-    return res[['county','period','forecast','forecast_adj','expected_dealer_units']]
+        res = pd.DataFrame(columns=['county','period','forecast'])
+    else:
+        res = pd.concat(out_rows, ignore_index=True)
+        res['period'] = pd.to_datetime(res['period']).dt.strftime('%Y-%m')
+        res = res[['county','period','forecast']]
+    res.attrs['errors'] = errors
+    return res
+
+def adjust_forecasts(raw: pd.DataFrame, eri: pd.DataFrame, alpha: float, share: float) -> pd.DataFrame:
+    # Readiness-z and dealer-share step, vectorized over the raw forecast frame
+    eri2 = eri[['county','readiness_score']].copy()
+    z = (eri2['readiness_score'] - eri2['readiness_score'].mean()) / (eri2['readiness_score'].std() + 1e-6)
+    rz_by_county = z.fillna(0).groupby(eri2['county'].astype(str)).first()
+    rz = raw['county'].astype(str).map(rz_by_county).fillna(0.0).astype(float)
+    res = raw[['county','period','forecast']].copy()
+    res['forecast_adj'] = (res['forecast'] * (1 + alpha * rz)).clip(lower=0.0)
+    res['expected_dealer_units'] = (res['forecast_adj'] * share).round(0).astype(int)
+    res.attrs['errors'] = raw.attrs.get('errors', {})
+    return res
+
+def make_county_forecasts(hist: pd.DataFrame, eri: pd.DataFrame, counties, alpha: float, share: float,
+                          n_jobs: int=1, timeout: Optional[float]=None, use_cache: bool=True,
+                          engine: Optional[str]=None, incremental: bool=False) -> pd.DataFrame:
+    # engine=None uses default_engine() (Prophet, else ARIMA); any FORECAST_ENGINES name picks one explicitly;
+    # one of BATCH_ENGINES forecasts all counties in one vectorized pass.
+    # incremental=True updates stored per-county model state instead of refitting from scratch.
+    raw = fit_raw_forecasts(hist, counties, periods=3, n_jobs=n_jobs, timeout=timeout,
+                            use_cache=use_cache, engine=engine, incremental=incremental)
+    return forecasts_from_raw(raw, eri, alpha, share)
+
+def forecasts_from_raw(raw: pd.DataFrame, eri: pd.DataFrame, alpha: float, share: float) -> pd.DataFrame:
+    # make_county_forecasts' output from already fitted raw forecasts (e.g. a background job's result)
+    if raw.empty:
+        res = pd.DataFrame()
+        # Per-county fit failures (exceptions/timeouts); those counties are left out like short series
+        res.attrs['errors'] = raw.attrs.get('errors', {})
+        return res
+    return adjust_forecasts(raw, eri, alpha, share)
@@ -1,5 +1,10 @@
 # core/geo.py
 # Ireland county centroids (approx). Feel free to tweak any lat/lon.
+import threading
+import numpy as np
+import pandas as pd
+from typing import Dict, Hashable, Optional, Sequence, Tuple
+
 COUNTY_CENTROIDS = {
     "Dublin": (53.3498, -6.2603),
     "Cork": (51.8985, -8.4756),
@@ -28,3 +33,156 @@ COUNTY_CENTROIDS = {
     "Sligo": (54.2683, -8.4761),
     "Donegal": (54.6540, -8.1100),
 }
+
+# ---- Distances
+# Great-circle (haversine) km between points. A DistanceIndex holds one set of points (county
+# centroids, or branch coordinates when Branches carries lat/lon) with the full distance matrix
+# (float32) and each row's distance order, sorted on first use (int16/int32); above
+# MATRIX_MAX_POINTS it answers from a BallTree instead. At the limit an index holds ~16 MB of
+# distances and at most ~8 MB of orders.
+
+EARTH_RADIUS_KM = 6371.0088
+MATRIX_MAX_POINTS = 2000
+# Distance between places with no known coordinates (the optimizer's old flat figure)
+UNKNOWN_DISTANCE_KM = 200.0
+
+
+def haversine_km(lat1, lon1, lat2, lon2) -> np.ndarray:
+    # Broadcasting haversine in km; degree inputs
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(a, dtype=float)) for a in (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+
+class DistanceIndex:
+    def __init__(self, labels: Sequence[Hashable], lat: Sequence[float], lon: Sequence[float]):
+        self.labels = list(labels)
+        self.lat = np.asarray(lat, dtype=float)
+        self.lon = np.asarray(lon, dtype=float)
+        self._pos = {l: i for i, l in enumerate(self.labels)}
+        self._known = ~(np.isnan(self.lat) | np.isnan(self.lon))
+        self.matrix: Optional[np.ndarray] = None
+        self._order: Optional[np.ndarray] = None
+        self._sorted: Optional[np.ndarray] = None
+        self._tree = None
+        n = len(self.labels)
+        if n <= MATRIX_MAX_POINTS:
+            self.matrix = self._rows(np.arange(n)).astype(np.float32)
+            # Row i's points nearest first (stable: ties keep label order), sorted when first asked for
+            self._order = np.empty((n, n), dtype=np.int16 if n <= np.iinfo(np.int16).max else np.int32)
+            self._sorted = np.zeros(n, dtype=bool)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(a.nbytes for a in (self.matrix, self._order) if a is not None)
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    def position(self, label: Hashable) -> int:
+        return self._pos[label]
+
+    def _rows(self, idx: np.ndarray) -> np.ndarray:
+        d = haversine_km(self.lat[idx][:, None], self.lon[idx][:, None], self.lat[None, :], self.lon[None, :])
+        # Unknown coordinates: 0 to itself, the flat fallback to everything else
+        unknown = ~(self._known[idx][:, None] & self._known[None, :])
+        d[unknown] = UNKNOWN_DISTANCE_KM
+        d[np.arange(len(idx)), idx] = 0.0
+        return d
+
+    def _row_order(self, i: int) -> np.ndarray:
+        if not self._sorted[i]:
+            self._order[i] = np.argsort(self.matrix[i], kind="stable")
+            self._sorted[i] = True
+        return self._order[i]
+
+    def distances_from(self, i: int) -> np.ndarray:
+        return self.matrix[i].astype(float) if self.matrix is not None else self._rows(np.array([i]))[0]
+
+    def pairwise(self, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+        a, b = np.asarray(a), np.asarray(b)
+        if self.matrix is not None:
+            return self.matrix[a[:, None], b[None, :]].astype(float)
+        return self._rows(a)[:, b]
+
+    def _balltree(self):
+        if self._tree is None:
+            from sklearn.neighbors import BallTree  # type: ignore
+            known = np.flatnonzero(self._known)
+            self._tree = (BallTree(np.radians(np.column_stack([self.lat[known], self.lon[known]])),
+                                   metric="haversine"), known)
+        return self._tree
+
+    def within(self, i: int, radius_km: float) -> Tuple[np.ndarray, np.ndarray]:
+        # Points within radius_km of point i as (positions, km), nearest first
+        if self.matrix is not None:
+            order = self._row_order(i)
+            d = self.matrix[i, order]
+            n = int(np.searchsorted(d, radius_km, side="right"))
+            return order[:n].astype(np.intp), d[:n].astype(float)
+        if not self._known[i]:
+            d = self.distances_from(i)
+            pos = np.flatnonzero(d <= radius_km)
+            pos = pos[np.argsort(d[pos], kind="stable")]
+            return pos, d[pos]
+        tree, known = self._balltree()
+        idx, dist = tree.query_radius(np.radians([[self.lat[i], self.lon[i]]]), r=radius_km / EARTH_RADIUS_KM,
+                                      return_distance=True, sort_results=True)
+        pos, d = known[idx[0]], dist[0] * EARTH_RADIUS_KM
+        unknown = np.flatnonzero(~self._known)
+        if UNKNOWN_DISTANCE_KM <= radius_km and len(unknown):
+            pos = np.concatenate([pos, unknown])
+            d = np.concatenate([d, np.full(len(unknown), UNKNOWN_DISTANCE_KM)])
+            by = np.argsort(d, kind="stable")
+            pos, d = pos[by], d[by]
+        return pos, d
+
+    def nearest(self, i: int, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        # The k nearest points to point i (itself included) as (positions, km)
+        if self.matrix is not None:
+            order = self._row_order(i)[:k].astype(np.intp)
+            return order, self.matrix[i, order].astype(float)
+        d = self.distances_from(i)
+        pos = np.argpartition(d, min(k, len(d)) - 1)[:k]
+        pos = pos[np.argsort(d[pos], kind="stable")]
+        return pos, d[pos]
+
+
+# Built indexes shared by every session, keyed on the labels and coordinates they were built from;
+# oldest dropped first once they hold more than _MAX_INDEX_BYTES (the newest is always kept)
+_MAX_INDEX_BYTES = 64 * 1024 * 1024
+_indexes: Dict[Hashable, DistanceIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def distance_index(labels: Sequence[Hashable], lat: Sequence[float], lon: Sequence[float]) -> DistanceIndex:
+    lat_a, lon_a = np.asarray(lat, dtype=float), np.asarray(lon, dtype=float)
+    key = (tuple(labels), lat_a.tobytes(), lon_a.tobytes())
+    with _indexes_lock:
+        hit = _indexes.get(key)
+    if hit is not None:
+        return hit
+    index = DistanceIndex(labels, lat_a, lon_a)
+    with _indexes_lock:
+        _indexes[key] = index
+        while len(_indexes) > 1 and sum(ix.nbytes for ix in _indexes.values()) > _MAX_INDEX_BYTES:
+            _indexes.pop(next(iter(_indexes)))
+    return index
+
+
+def county_coordinates(counties: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+    # Centroid lat/lon per county; NaN where the county is not in COUNTY_CENTROIDS
+    ll = np.array([COUNTY_CENTROIDS.get(str(c), (np.nan, np.nan)) for c in counties], dtype=float).reshape(-1, 2)
+    return ll[:, 0], ll[:, 1]
+
+
+def branch_coordinates(branches: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+    # lat/lon per branch row: the branch's own coordinates when Branches has lat/lon columns,
+    # otherwise (or where they are blank) its county centroid
+    lat, lon = county_coordinates(branches["county"].astype(object).tolist())
+    if "lat" in branches.columns and "lon" in branches.columns:
+        own_lat = pd.to_numeric(branches["lat"], errors="coerce").to_numpy(dtype=float)
+        own_lon = pd.to_numeric(branches["lon"], errors="coerce").to_numpy(dtype=float)
+        has = ~(np.isnan(own_lat) | np.isnan(own_lon))
+        lat, lon = np.where(has, own_lat, lat), np.where(has, own_lon, lon)
+    return lat, lon
@@ -1,36 +1,193 @@
 from __future__ import annotations
 import os
 import io
+import json
+import threading
 import pandas as pd
 from typing import Tuple, Optional, Dict, List
 
 DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data")
 SAMPLE_DIR = os.path.join(DATA_DIR, "sample")
 
-REQUIRED_SCHEMAS: Dict[str, List[str]] = {
-    "EV_Readiness_Index": ["county","readiness_score","disposable_income_index","dealer_presence_index","yoy_ev_growth_index"],
-    "Historical_Registrations": ["county","period","ev_units"],
-    "Branches": ["branch_id","branch_name","county","serves_counties"],
-    "Inventory": ["branch_id","model","trim","stock_units","avg_days_on_lot","msrp","gross_margin_per_unit"],
-    "CRM": ["lead_id","first_name","last_name","email","phone","county","current_vehicle_type","vehicle_year","income_band","distance_km","last_touch_date","engagements_90d"],
+# Column -> dtype. Text columns with few distinct values are categoricals; counts are int32 and
+# indices/money float32. Integer columns that contain blanks fall back to float on load.
+REQUIRED_SCHEMAS: Dict[str, Dict[str, str]] = {
+    "EV_Readiness_Index": {"county": "category", "readiness_score": "float32", "disposable_income_index": "float32",
+                           "dealer_presence_index": "float32", "yoy_ev_growth_index": "float32"},
+    "Historical_Registrations": {"county": "category", "period": "category", "ev_units": "int32"},
+    "Branches": {"branch_id": "str", "branch_name": "str", "county": "category", "serves_counties": "str"},
+    "Inventory": {"branch_id": "str", "model": "category", "trim": "category", "stock_units": "int32",
+                  "avg_days_on_lot": "int32", "msrp": "float32", "gross_margin_per_unit": "float32"},
+    "CRM": {"lead_id": "str", "first_name": "str", "last_name": "str", "email": "str", "phone": "str",
+            "county": "category", "current_vehicle_type": "category", "vehicle_year": "int32",
+            "income_band": "category", "distance_km": "float32", "last_touch_date": "str",
+            "engagements_90d": "int32"},
 }
 
-OPTIONAL_SCHEMAS: Dict[str, List[str]] = {
-    "WebSignals": ["county","model","pageviews_30d","configurator_starts_30d","testdrive_requests_30d"],
+OPTIONAL_SCHEMAS: Dict[str, Dict[str, str]] = {
+    "WebSignals": {"county": "category", "model": "category", "pageviews_30d": "int32",
+                   "configurator_starts_30d": "int32", "testdrive_requests_30d": "int32"},
 }
 
-def _load_csv(path: str) -> Optional[pd.DataFrame]:
-    if not os.path.exists(path):
+# Columnar copies (Parquet) are written next to the CSVs on upload and memory-mapped on read.
+# CSV stays the interchange format; without pyarrow everything keeps working on CSV alone.
+try:
+    import pyarrow as _pa  # type: ignore
+    import pyarrow.parquet as _pq  # type: ignore
+    _HAS_ARROW = True
+except Exception:
+    _HAS_ARROW = False
+
+def _schema_for(name: str) -> Optional[Dict[str, str]]:
+    return REQUIRED_SCHEMAS.get(name) or OPTIONAL_SCHEMAS.get(name)
+
+def _csv_read_dtypes(schema: Dict[str, str]) -> Dict[str, str]:
+    # Ints are cast after parsing (blank cells would fail a direct int32 parse)
+    return {c: ("float64" if t.startswith("int") else t) for c, t in schema.items()}
+
+def _apply_dtypes(df: pd.DataFrame, schema: Optional[Dict[str, str]]) -> pd.DataFrame:
+    if not schema:
+        return df
+    for c, t in schema.items():
+        if c not in df.columns or str(df[c].dtype) == t:
+            continue
+        try:
+            if t.startswith("int"):
+                col = pd.to_numeric(df[c], errors="raise")
+                df[c] = col.astype(t) if not col.isna().any() else col.astype("float64")
+            elif t == "str":
+                if df[c].dtype == object or pd.api.types.is_string_dtype(df[c].dtype):
+                    continue
+                df[c] = df[c].where(df[c].isna(), df[c].astype(str))
+            else:
+                df[c] = df[c].astype(t)
+        except (ValueError, TypeError):
+            # Leave unexpected content as parsed; schema checks report it on upload
+            pass
+    return df
+
+def _read_dataset_file(path: str, name: Optional[str]=None) -> pd.DataFrame:
+    schema = _schema_for(name) if name else None
+    if path.endswith(".parquet"):
+        # Categoricals are stored as plain strings; read them straight into dictionary arrays
+        names = set(_pq.read_schema(path).names)
+        cats = [c for c, t in (schema or {}).items() if t == "category" and c in names]
+        df = _pq.read_table(path, memory_map=True, read_dictionary=cats).to_pandas()
+    else:
+        try:
+            df = pd.read_csv(path, dtype=_csv_read_dtypes(schema) if schema else None)
+        except (ValueError, TypeError):
+            df = pd.read_csv(path)
+    return _apply_dtypes(df, schema)
+
+def iter_dataset_chunks(path: str, name: Optional[str]=None, columns: Optional[List[str]]=None,
+                        chunk_rows: int=100_000):
+    # Typed chunks of a CSV or Parquet dataset file without loading it whole; columns=None reads all
+    schema = _schema_for(name) if name else None
+    if columns is not None and schema:
+        schema = {c: t for c, t in schema.items() if c in columns}
+    if path.endswith(".parquet"):
+        for batch in _pq.ParquetFile(path, memory_map=True).iter_batches(batch_size=chunk_rows, columns=columns):
+            yield _apply_dtypes(batch.to_pandas(), schema)
+        return
+    usecols = (lambda c: c in columns) if columns is not None else None
+    for chunk in pd.read_csv(path, usecols=usecols, chunksize=chunk_rows,
+                             dtype=_csv_read_dtypes(schema) if schema else None):
+        yield _apply_dtypes(chunk, schema)
+
+def _arrow_type(t: str):
+    return {"int32": _pa.int32(), "float32": _pa.float32()}.get(t, _pa.string())
+
+def _arrow_table(df: pd.DataFrame, schema: Dict[str, str], parsed: Optional[Dict[str, pd.Series]]=None):
+    # Fixed Arrow types per column so every chunk of a streamed write shares one schema.
+    # parsed holds numeric columns already converted by the validator.
+    arrays, fields = [], []
+    for c in df.columns:
+        t = schema.get(c, "str")
+        s = df[c]
+        if t.startswith("int") or t.startswith("float"):
+            num = parsed[c] if parsed and c in parsed else pd.to_numeric(s, errors="coerce")
+            vals = num.to_numpy(dtype="float64")
+        elif pd.api.types.is_string_dtype(s.dtype) and s.dtype != object:
+            vals = s
+        else:
+            vals = s.where(s.isna(), s.astype(str)).astype(object)
+        arrays.append(_pa.array(vals, type=_arrow_type(t), from_pandas=True))
+        fields.append(_pa.field(str(c), _arrow_type(t)))
+    return _pa.Table.from_arrays(arrays, schema=_pa.schema(fields))
+
+def _write_columnar(df: pd.DataFrame, name: str, out_path: str) -> Optional[str]:
+    if not _HAS_ARROW:
         return None
-    return pd.read_csv(path)
+    pq_path = os.path.splitext(out_path)[0] + ".parquet"
+    _pq.write_table(_arrow_table(df, _schema_for(name) or {}), pq_path)
+    invalidate_dataset_cache(pq_path)
+    return pq_path
+
+# One parsed copy of each dataset file per process, shared by every session and rerun.
+# Entries are keyed on path and revalidated against (mtime_ns, size) on every lookup.
+_dataset_cache: Dict[str, Tuple[Tuple[int, int], pd.DataFrame]] = {}
+_dataset_cache_lock = threading.Lock()
+_dataset_cache_stats = {"hits": 0, "misses": 0, "invalidations": 0}
+
+def _file_signature(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+def _load_dataset(path: str, name: Optional[str]=None) -> Optional[pd.DataFrame]:
+    sig = _file_signature(path)
+    if sig is None:
+        return None
+    with _dataset_cache_lock:
+        entry = _dataset_cache.get(path)
+        if entry is not None and entry[0] == sig:
+            _dataset_cache_stats["hits"] += 1
+            # Shallow copy: callers may add/replace columns without touching the shared frame.
+            # Treat the values themselves as read-only.
+            return entry[1].copy(deep=False)
+    df = _read_dataset_file(path, name)
+    with _dataset_cache_lock:
+        _dataset_cache[path] = (sig, df)
+        _dataset_cache_stats["misses"] += 1
+    return df.copy(deep=False)
+
+def invalidate_dataset_cache(path: Optional[str]=None) -> None:
+    with _dataset_cache_lock:
+        if path is None:
+            n = len(_dataset_cache)
+            _dataset_cache.clear()
+        else:
+            n = 1 if _dataset_cache.pop(path, None) is not None else 0
+        _dataset_cache_stats["invalidations"] += n
+
+def dataset_cache_stats() -> Dict[str, int]:
+    with _dataset_cache_lock:
+        return dict(_dataset_cache_stats, entries=len(_dataset_cache))
+
+def _dataset_path(name: str) -> Optional[str]:
+    # Real data beats sample data; within a directory the Parquet copy wins unless the CSV is newer
+    for d in (DATA_DIR, SAMPLE_DIR):
+        csv_path = os.path.join(d, f"{name}.csv")
+        pq_path = os.path.join(d, f"{name}.parquet")
+        csv_sig, pq_sig = _file_signature(csv_path), _file_signature(pq_path)
+        if _HAS_ARROW and pq_sig is not None and (csv_sig is None or pq_sig[0] >= csv_sig[0]):
+            return pq_path
+        if csv_sig is not None:
+            return csv_path
+    return None
+
+def dataset_signature(name: str) -> Optional[Tuple[str, int, int]]:
+    # (path, mtime_ns, size) of the file load_all_datasets would read for `name`; a cheap cache key
+    path = _dataset_path(name)
+    sig = _file_signature(path) if path else None
+    return (path,) + sig if sig else None
 
 def _find_real_or_sample(name: str) -> Optional[pd.DataFrame]:
-    real_path = os.path.join(DATA_DIR, f"{name}.csv")
-    df = _load_csv(real_path)
-    if df is None:
-        sample_path = os.path.join(SAMPLE_DIR, f"{name}.csv")
-        df = _load_csv(sample_path)
-    return df
+    path = _dataset_path(name)
+    return _load_dataset(path, name) if path else None
 
 def load_all_datasets(prefer_real: bool=True):
     eri = _find_real_or_sample("EV_Readiness_Index")
@@ -41,23 +198,370 @@ def load_all_datasets(prefer_real: bool=True):
     webs = _find_real_or_sample("WebSignals")
     return eri, hist, branches, inv, crm, webs
 
-def validate_and_save_upload(file, expected_name: str) -> (bool, str):
-    # Determine which schema to use
+# Uploads are validated and written chunk by chunk: peak memory is bounded by UPLOAD_CHUNK_ROWS,
+# and the target files are only replaced (atomically) once every chunk has passed.
+UPLOAD_CHUNK_ROWS = 100_000
+MAX_UPLOAD_ERRORS = 100
+_PERIOD_PATTERN = r"^\d{4}-(0[1-9]|1[0-2])$"
+
+# Columns that identify a row and must not be blank
+KEY_COLUMNS: Dict[str, List[str]] = {
+    "EV_Readiness_Index": ["county"],
+    "Historical_Registrations": ["county", "period"],
+    "Branches": ["branch_id"],
+    "Inventory": ["branch_id", "model"],
+    "CRM": ["lead_id"],
+    "WebSignals": ["county", "model"],
+}
+
+# Inclusive (low, high) bounds for numeric columns; None = unbounded
+VALUE_RANGES: Dict[str, Tuple[Optional[float], Optional[float]]] = {
+    "readiness_score": (0, 100),
+    "ev_units": (0, None),
+    "stock_units": (0, None),
+    "avg_days_on_lot": (0, None),
+    "msrp": (0, None),
+    "vehicle_year": (1900, 2100),
+    "distance_km": (0, None),
+    "engagements_90d": (0, None),
+    "pageviews_30d": (0, None),
+    "configurator_starts_30d": (0, None),
+    "testdrive_requests_30d": (0, None),
+}
+
+def _validate_chunk(raw: pd.DataFrame, name: str, schema: Dict[str, str], errors: List[dict],
+                    max_errors: int, parsed: Optional[Dict[str, pd.Series]]=None) -> int:
+    # raw is all strings (NaN for blanks); returns the number of bad cells, records up to max_errors.
+    # Numeric columns are parsed once and left in parsed for the Parquet writer.
+    n_bad = 0
+    checks = []
+    for c in KEY_COLUMNS.get(name, []):
+        checks.append((c, raw[c].isna(), "missing value"))
+    for c, t in schema.items():
+        s = raw[c]
+        if t.startswith("int") or t.startswith("float"):
+            num = pd.to_numeric(s, errors="coerce")
+            if parsed is not None:
+                parsed[c] = num
+            checks.append((c, s.notna() & num.isna(), "not a number"))
+            if t.startswith("int"):
+                checks.append((c, num.notna() & (num % 1 != 0), "not an integer"))
+            lo, hi = VALUE_RANGES.get(c, (None, None))
+            if lo is not None:
+                checks.append((c, num < lo, f"below {lo}"))
+            if hi is not None:
+                checks.append((c, num > hi, f"above {hi}"))
+        if c == "period":
+            checks.append((c, s.notna() & ~s.astype(str).str.match(_PERIOD_PATTERN), "period must be YYYY-MM"))
+    for c, mask, msg in checks:
+        mask = mask.to_numpy(dtype=bool)
+        k = int(mask.sum())
+        if not k:
+            continue
+        n_bad += k
+        room = max_errors - len(errors)
+        if room > 0:
+            for i in raw.index[mask][:room]:
+                v = raw.at[i, c]
+                # Row numbers are 1-based data rows (header excluded)
+                errors.append({"row": int(i) + 1, "column": c, "value": None if pd.isna(v) else v, "error": msg})
+    return n_bad
+
+class _DatasetWriter:
+    # Streams chunks into temp CSV (+ Parquet) files next to data/<name>.csv, hashing the CSV bytes
+    # as they are written. commit() renames both over the targets; close() drops anything left over.
+    def __init__(self, name: str, schema: Dict[str, str]):
+        import hashlib
+        import tempfile
+        self.schema = schema
+        self.out_path = os.path.join(DATA_DIR, f"{name}.csv")
+        self.pq_path = os.path.splitext(self.out_path)[0] + ".parquet"
+        os.makedirs(DATA_DIR, exist_ok=True)
+        fd, self.tmp_csv = tempfile.mkstemp(dir=DATA_DIR, prefix=f".{name}.", suffix=".csv.tmp")
+        self.tmp_pq = self.tmp_csv[:-len(".csv.tmp")] + ".parquet.tmp"
+        self._out = os.fdopen(fd, "w", newline="", encoding="utf-8")
+        self._pq_writer = None
+        self._sha = hashlib.sha256()
+        self.rows = 0
+        self.empty = True  # nothing (not even a header) written yet
+
+    def write(self, chunk: pd.DataFrame, parsed: Optional[Dict[str, pd.Series]]=None) -> None:
+        text = chunk.to_csv(header=self.empty, index=False)
+        self.empty = False
+        self._out.write(text)
+        self._sha.update(text.encode("utf-8"))
+        self.rows += len(chunk)
+        if _HAS_ARROW:
+            table = _arrow_table(chunk, self.schema, parsed)
+            if self._pq_writer is None:
+                self._pq_writer = _pq.ParquetWriter(self.tmp_pq, table.schema)
+            self._pq_writer.write_table(table)
+
+    @property
+    def sha256(self) -> str:
+        return self._sha.hexdigest()
+
+    def _finish(self) -> None:
+        if not self._out.closed:
+            self._out.close()
+        if self._pq_writer is not None:
+            self._pq_writer.close()
+            self._pq_writer = None
+
+    def commit(self) -> None:
+        self._finish()
+        os.replace(self.tmp_csv, self.out_path)
+        invalidate_dataset_cache(self.out_path)
+        if os.path.exists(self.tmp_pq):
+            os.replace(self.tmp_pq, self.pq_path)
+            invalidate_dataset_cache(self.pq_path)
+
+    def close(self) -> None:
+        self._finish()
+        for p in (self.tmp_csv, self.tmp_pq):
+            if os.path.exists(p):
+                os.remove(p)
+
+def _errors_message(report: Dict) -> str:
+    report["errors"].sort(key=lambda e: e["row"])
+    shown = "; ".join(f"row {e['row']} {e['column']}={e['value']!r}: {e['error']}" for e in report["errors"][:5])
+    return f"{report['n_errors']} invalid value(s) in {report['rows']} rows. {shown}"
+
+# Every successful upload or delta ingest appends one line to data/versions/<name>/log.jsonl.
+# Delta ingests also write v<version>.changes.csv: the key columns of each inserted/updated row.
+_ingest_lock = threading.Lock()
+
+def _versions_dir(name: str) -> str:
+    return os.path.join(DATA_DIR, "versions", name)
+
+def dataset_versions(name: str) -> List[Dict]:
+    path = os.path.join(_versions_dir(name), "log.jsonl")
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def changed_rows(name: str, version: int) -> pd.DataFrame:
+    # Key columns plus a 'change' column (insert/update); empty for full replacements
+    entry = next((e for e in dataset_versions(name) if e["version"] == version), None)
+    if entry is None:
+        raise KeyError(f"{name} has no version {version}")
+    if not entry.get("changes"):
+        return pd.DataFrame(columns=UPSERT_KEYS.get(name, []) + ["change"])
+    return pd.read_csv(os.path.join(_versions_dir(name), entry["changes"]), dtype=str)
+
+def _record_version(name: str, entry: Dict, changes: Optional[pd.DataFrame]=None) -> Dict:
+    # Returns the new log entry, or the latest one unchanged when the data is identical to it
+    # (same sha256): re-applying a file adds no version
+    from datetime import datetime, timezone
+    d = _versions_dir(name)
+    os.makedirs(d, exist_ok=True)
+    prev = dataset_versions(name)
+    if prev and prev[-1]["sha256"] == entry["sha256"]:
+        return prev[-1]
+    version = prev[-1]["version"] + 1 if prev else 1
+    entry = dict(version=version, timestamp=datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                 parent_sha256=prev[-1]["sha256"] if prev else None, **entry)
+    if changes is not None:
+        entry["changes"] = f"v{version:06d}.changes.csv"
+        changes.to_csv(os.path.join(d, entry["changes"]), index=False)
+    with open(os.path.join(d, "log.jsonl"), "a", encoding="utf-8") as f:
+        f.write(json.dumps(entry) + "\n")
+    return entry
+
+def stream_validate_and_save(file, expected_name: str, chunk_rows: int=UPLOAD_CHUNK_ROWS,
+                             max_errors: int=MAX_UPLOAD_ERRORS, trace_memory: bool=False) -> Dict:
+    # Returns a report: ok, message, rows, errors (capped), n_errors, seconds, rows_per_s, mb_per_s,
+    # version and chunk_mb (largest parsed chunk). tracemalloc slows parsing several-fold, so the
+    # traced process peak (peak_mb) is only measured with trace_memory=True.
+    import time
+    import tracemalloc
+
     base = expected_name.replace(".csv","")
-    schema = REQUIRED_SCHEMAS.get(base) or OPTIONAL_SCHEMAS.get(base)
+    schema = _schema_for(base)
+    report: Dict = {"ok": False, "rows": 0, "errors": [], "n_errors": 0, "path": None, "chunk_mb": 0.0}
     if schema is None:
-        return False, f"Unknown dataset: {base}"
+        report["message"] = f"Unknown dataset: {base}"
+        return report
+
+    tracing = trace_memory and not tracemalloc.is_tracing()
+    if tracing:
+        tracemalloc.start()
+    t0 = time.perf_counter()
+    with _ingest_lock:
+        writer = _DatasetWriter(base, schema)
+        try:
+            try:
+                first = True
+                for raw in pd.read_csv(file, dtype=str, chunksize=chunk_rows):
+                    if first:
+                        missing = [c for c in schema if c not in raw.columns]
+                        if missing:
+                            report["message"] = f"Missing columns: {missing}. Expected: {list(schema)}"
+                            return report
+                        first = False
+                    parsed: Dict[str, pd.Series] = {}
+                    report["n_errors"] += _validate_chunk(raw, base, schema, report["errors"], max_errors, parsed)
+                    report["rows"] += len(raw)
+                    report["chunk_mb"] = max(report["chunk_mb"], round(raw.memory_usage(deep=True).sum() / 1e6, 1))
+                    # After the first bad value keep scanning to report errors, but stop writing
+                    if not report["n_errors"]:
+                        writer.write(raw, parsed)
+            except Exception as e:
+                report["message"] = f"Failed to read CSV: {e}"
+                return report
 
-    # Read into DataFrame
+            if report["n_errors"]:
+                report["message"] = _errors_message(report)
+                return report
+
+            writer.commit()
+            report["version"] = _record_version(base, {"mode": "replace", "rows": writer.rows,
+                                                       "sha256": writer.sha256})["version"]
+            report["ok"] = True
+            report["path"] = writer.out_path
+        finally:
+            writer.close()
+            secs = time.perf_counter() - t0
+            if tracing:
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                report["peak_mb"] = round(peak / 1e6, 1)
+            report["seconds"] = round(secs, 3)
+            report["rows_per_s"] = round(report["rows"] / secs) if secs > 0 else None
+            if report["ok"]:
+                report["mb_per_s"] = round(os.path.getsize(writer.out_path) / 1e6 / secs, 1) if secs > 0 else None
+
+    report["message"] = (f"Saved {report['rows']} rows to {report['path']} as version {report['version']} "
+                         f"({report['rows_per_s']} rows/s, {report['mb_per_s']} MB/s, "
+                         f"largest chunk {report['chunk_mb']} MB)")
+    return report
+
+def validate_and_save_upload(file, expected_name: str) -> (bool, str):
+    report = stream_validate_and_save(file, expected_name)
+    return report["ok"], report["message"]
+
+# Datasets that accept deltas, and the columns a delta row is matched on
+UPSERT_KEYS: Dict[str, List[str]] = {
+    "Historical_Registrations": ["county", "period"],
+    "CRM": ["lead_id"],
+}
+
+def _row_keys(df: pd.DataFrame, keys: List[str]) -> pd.Series:
+    out = df[keys[0]].astype(str)
+    for k in keys[1:]:
+        out = out + "\x1f" + df[k].astype(str)
+    return out
+
+def _stored_chunks(name: str, chunk_rows: int):
+    # The rows load_all_datasets currently reads for `name` (the upload in data/, or the sample copy
+    # before any upload) as all-string chunks. The CSV is read when there is one: the Parquet copy
+    # next to it holds the same rows, but typed values would not round-trip to the same text.
+    path = _dataset_path(name)
+    if path is None:
+        return
+    csv_path = os.path.splitext(path)[0] + ".csv"
+    if os.path.exists(csv_path):
+        yield from pd.read_csv(csv_path, dtype=str, chunksize=chunk_rows)
+        return
+    for batch in _pq.ParquetFile(path).iter_batches(batch_size=chunk_rows):
+        df = batch.to_pandas()
+        yield df.astype(str).where(df.notna())
+
+def ingest_delta(file, expected_name: str, chunk_rows: int=UPLOAD_CHUNK_ROWS,
+                 max_errors: int=MAX_UPLOAD_ERRORS) -> Dict:
+    # Upserts a validated delta into data/<name>.csv on UPSERT_KEYS: stored rows with a matching key
+    # are replaced in place, new keys are appended (last one wins within the delta). The stored rows
+    # are the dataset currently loaded, so the first delta on a fresh install starts from the sample
+    # copy. They are streamed through in chunks, so only the delta has to fit in memory. The report carries the
+    # inserted/updated/unchanged counts and the version recorded for this ingest.
+    import time
+    import hashlib
+
+    base = expected_name.replace(".csv","")
+    schema = _schema_for(base)
+    keys = UPSERT_KEYS.get(base)
+    report: Dict = {"ok": False, "rows": 0, "errors": [], "n_errors": 0, "path": None,
+                    "inserted": 0, "updated": 0, "unchanged": 0}
+    if schema is None or keys is None:
+        report["message"] = f"Delta ingest is not supported for {base}; upload the full file"
+        return report
+
+    t0 = time.perf_counter()
+    parts = []
     try:
-        df = pd.read_csv(file)
+        for raw in pd.read_csv(file, dtype=str, chunksize=chunk_rows):
+            if not parts:
+                missing = [c for c in schema if c not in raw.columns]
+                if missing:
+                    report["message"] = f"Missing columns: {missing}. Expected: {list(schema)}"
+                    return report
+            report["n_errors"] += _validate_chunk(raw, base, schema, report["errors"], max_errors)
+            report["rows"] += len(raw)
+            parts.append(raw)
     except Exception as e:
-        return False, f"Failed to read CSV: {e}"
+        report["message"] = f"Failed to read CSV: {e}"
+        return report
+    if report["n_errors"]:
+        report["message"] = _errors_message(report)
+        return report
+
+    delta = pd.concat(parts, ignore_index=True)
+    dkeys = _row_keys(delta, keys)
+    keep = ~dkeys.duplicated(keep="last").to_numpy()
+    delta = delta[keep].set_axis(pd.Index(dkeys[keep].to_numpy()), axis=0)
+    delta_sha = hashlib.sha256(delta.to_csv(index=False).encode("utf-8")).hexdigest()
+    # None = insert until a stored row with the same key turns up
+    status = pd.Series(None, index=delta.index, dtype=object)
+    stored_rows = 0
+
+    with _ingest_lock:
+        writer = _DatasetWriter(base, schema)
+        try:
+            cols = list(delta.columns)
+            aligned = delta
+            for i, chunk in enumerate(_stored_chunks(base, chunk_rows)):
+                if i == 0:
+                    # The stored file's column layout wins; delta-only columns are dropped
+                    cols = list(chunk.columns)
+                    aligned = delta.reindex(columns=cols)
+                stored_rows += len(chunk)
+                ck = _row_keys(chunk, keys)
+                hit = ck.isin(aligned.index).to_numpy()
+                if hit.any():
+                    hit_keys = ck[hit].to_numpy()
+                    old = chunk.loc[hit, cols].to_numpy(dtype=object)
+                    new = aligned.loc[hit_keys].to_numpy(dtype=object)
+                    same = ((old == new) | (pd.isna(old) & pd.isna(new))).all(axis=1)
+                    status.loc[hit_keys[same]] = status.loc[hit_keys[same]].fillna("unchanged")
+                    status.loc[hit_keys[~same]] = "update"
+                    chunk.loc[hit, cols] = new
+                writer.write(chunk)
+            new_rows = aligned[status.isna().to_numpy()]
+            for start in range(0, len(new_rows), chunk_rows):
+                writer.write(new_rows.iloc[start:start + chunk_rows])
+            if writer.empty:
+                writer.write(new_rows)  # header only
+            status = status.fillna("insert")
+            changed = (status != "unchanged").to_numpy()
+            changes = delta.loc[changed, keys].assign(change=status[changed].to_numpy())
+            report.update(inserted=int((status == "insert").sum()), updated=int((status == "update").sum()),
+                          unchanged=int((status == "unchanged").sum()), total_rows=writer.rows)
 
-    missing = [c for c in schema if c not in df.columns]
-    if missing:
-        return False, f"Missing columns: {missing}. Expected: {schema}"
+            writer.commit()
+            entry = _record_version(base, {"mode": "delta", "rows": writer.rows, "sha256": writer.sha256,
+                                           "delta_rows": report["rows"], "delta_sha256": delta_sha,
+                                           "inserted": report["inserted"], "updated": report["updated"],
+                                           "unchanged": report["unchanged"]}, changes)
+            report["version"] = entry["version"]
+            report["ok"] = True
+            report["path"] = writer.out_path
+        finally:
+            writer.close()
 
-    out_path = os.path.join(DATA_DIR, expected_name)
-    df.to_csv(out_path, index=False)
-    return True, f"Saved to {out_path}"
+    secs = time.perf_counter() - t0
+    report["seconds"] = round(secs, 3)
+    report["rows_per_s"] = round((report["rows"] + stored_rows) / secs) if secs > 0 else None
+    report["message"] = (f"Version {report['version']}: {report['inserted']} inserted, {report['updated']} updated, "
+                         f"{report['unchanged']} unchanged; {report['total_rows']} rows in {report['path']}")
+    return report
@@ -0,0 +1,182 @@
+# core/jobs.py
+# Process-wide background jobs for work too slow to run inside a Streamlit script run (forecast
+# fits, optimizer runs, reports). Jobs run on a small thread pool shared by every session (the
+# work itself may fan out to process pools, e.g. make_county_forecasts(n_jobs=...)). Submitting a
+# key that is already queued, running or finished returns that job (single-flight), so sessions
+# asking for the same computation share one run. Progress and cancellation are cooperative: a job
+# function that accepts `progress` gets a callback to report through, which raises once cancelled.
+from __future__ import annotations
+import time
+import uuid
+import inspect
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+JOB_WORKERS = 2
+# Finished jobs kept for result reuse and the jobs list; oldest dropped first
+KEEP_FINISHED = 32
+
+QUEUED, RUNNING, DONE, FAILED, CANCELLED = "queued", "running", "done", "failed", "cancelled"
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class Job:
+    def __init__(self, key: Hashable, kind: str, label: str):
+        self.id = uuid.uuid4().hex[:12]
+        self.key = key
+        self.kind = kind
+        self.label = label
+        self.status = QUEUED
+        self.progress = 0.0
+        self.message = ""
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.created = time.time()
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+        self.owners: set = set()
+        # Owners that cancelled their wait; a cancelled job is only shown as such to them
+        self.dropped_by: set = set()
+        self._cancel = threading.Event()
+        self._done = threading.Event()
+        self._future = None
+
+    @property
+    def done(self) -> bool:
+        return self.status in (DONE, FAILED, CANCELLED)
+
+    @property
+    def cancel_requested(self) -> bool:
+        return self._cancel.is_set()
+
+    @property
+    def seconds(self) -> Optional[float]:
+        if self.started is None:
+            return None
+        return round((self.finished or time.time()) - self.started, 2)
+
+    def report(self, fraction: float, message: str="") -> None:
+        # Progress callback handed to the job function; raises JobCancelled once cancel was requested
+        if self._cancel.is_set():
+            raise JobCancelled(self.id)
+        self.progress = float(min(max(fraction, 0.0), 1.0))
+        if message:
+            self.message = message
+
+    def wait(self, timeout: Optional[float]=None) -> bool:
+        return self._done.wait(timeout)
+
+    def summary(self) -> Dict[str, Any]:
+        return {"id": self.id, "kind": self.kind, "label": self.label, "status": self.status,
+                "progress": round(self.progress, 3), "message": self.message, "seconds": self.seconds,
+                "waiting_sessions": len(self.owners), "error": self.error}
+
+
+class JobRunner:
+    def __init__(self, max_workers: int=JOB_WORKERS, keep_finished: int=KEEP_FINISHED):
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self._keep = keep_finished
+        self._lock = threading.Lock()
+        self._jobs: Dict[str, Job] = {}
+        self._by_key: Dict[Hashable, str] = {}
+
+    def submit(self, key: Hashable, fn: Callable, *args, kind: str="job", label: str="",
+               owner: Optional[Hashable]=None, retry: bool=False, **kwargs) -> Job:
+        # The job for `key` if one is queued, running or finished, else a new run of fn(*args, **kwargs).
+        # A failed job is returned as is (so callers can show why) unless retry=True; so is a cancelled
+        # one, except to an owner that didn't cancel it, which gets a fresh run.
+        # owner (e.g. a session id) registers interest for cancel().
+        with self._lock:
+            job = self._jobs.get(self._by_key.get(key, ""))
+            restart = job is not None and job.status == CANCELLED and owner is not None and owner not in job.dropped_by
+            if job is None or restart or (retry and job.status in (FAILED, CANCELLED)):
+                job = Job(key, kind, label)
+                self._jobs[job.id] = job
+                self._by_key[key] = job.id
+                if "progress" in inspect.signature(fn).parameters:
+                    kwargs = dict(kwargs, progress=job.report)
+                job._future = self._pool.submit(self._run, job, fn, args, kwargs)
+                self._trim()
+            if owner is not None and not job.done:
+                job.owners.add(owner)
+            return job
+
+    def _run(self, job: Job, fn: Callable, args, kwargs) -> None:
+        if job._cancel.is_set():
+            self._finish(job, CANCELLED)
+            return
+        job.status, job.started = RUNNING, time.time()
+        try:
+            job.result = fn(*args, **kwargs)
+        except JobCancelled:
+            self._finish(job, CANCELLED)
+        except Exception as e:
+            job.error = f"{type(e).__name__}: {e}"
+            self._finish(job, FAILED)
+        else:
+            job.progress = 1.0
+            self._finish(job, DONE)
+
+    def _finish(self, job: Job, status: str) -> None:
+        job.status, job.finished = status, time.time()
+        job.owners.clear()
+        job._done.set()
+
+    def _trim(self) -> None:
+        finished = sorted((j for j in self._jobs.values() if j.done), key=lambda j: j.finished)
+        for j in finished[:max(len(finished) - self._keep, 0)]:
+            del self._jobs[j.id]
+            if self._by_key.get(j.key) == j.id:
+                del self._by_key[j.key]
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def find(self, key: Hashable) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(self._by_key.get(key, ""))
+
+    def cancel(self, job_id: str, owner: Optional[Hashable]=None) -> bool:
+        # With an owner, only drops that owner's interest; the job stops once nobody waits on it.
+        # Without one, cancels outright. True if cancellation was requested.
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.done:
+                return False
+            if owner is not None:
+                job.owners.discard(owner)
+                job.dropped_by.add(owner)
+                if job.owners:
+                    return False
+            job._cancel.set()
+            if job._future is not None and job._future.cancel():
+                # Never started: finish it here since _run won't
+                self._finish(job, CANCELLED)
+            return True
+
+    def jobs(self) -> List[Job]:
+        with self._lock:
+            return sorted(self._jobs.values(), key=lambda j: j.created, reverse=True)
+
+    def shutdown(self, wait: bool=True) -> None:
+        for job in self.jobs():
+            self.cancel(job.id)
+        self._pool.shutdown(wait=wait, cancel_futures=True)
+
+
+_runner: Optional[JobRunner] = None
+_runner_lock = threading.Lock()
+
+
+def runner() -> JobRunner:
+    # The process-wide runner, created on first use
+    global _runner
+    with _runner_lock:
+        if _runner is None:
+            _runner = JobRunner()
+        return _runner
@@ -0,0 +1,112 @@
+# core/leads.py
+# Query layer over scored leads: rows pre-sorted by (score, engagements_90d) descending and
+# partitioned by vehicle type x income band, so a filter change is a binary search per partition
+# plus a merge of the first offset+limit positions instead of a scan and sort of every lead.
+from __future__ import annotations
+import threading
+import numpy as np
+import pandas as pd
+from typing import Callable, Dict, Hashable, List, Optional, Sequence, Tuple
+
+LEAD_COLUMNS = ["lead_id", "first_name", "last_name", "county", "score",
+                "current_vehicle_type", "income_band", "engagements_90d", "distance_km"]
+
+
+def _labels(s: pd.Series) -> Tuple[np.ndarray, List[str]]:
+    # Codes into stripped labels; values that differ only by whitespace share a label, NaN is -1
+    codes, uniques = pd.factorize(s)
+    stripped = pd.Index([str(u).strip() for u in uniques])
+    labels = sorted(set(stripped))
+    remap = np.append(pd.Index(labels).get_indexer(stripped), -1)
+    return remap[codes], labels
+
+
+class LeadIndex:
+    def __init__(self, scored: pd.DataFrame, columns: Sequence[str] = LEAD_COLUMNS):
+        score = scored["score"].to_numpy()
+        eng = scored["engagements_90d"].to_numpy(dtype=float)
+        # Same order as sort_values(["score", "engagements_90d"], ascending=False): stable, NaN last
+        order = np.lexsort((np.nan_to_num(-eng, nan=np.inf), -score))
+        self.frame = scored[list(columns)].iloc[order].reset_index(drop=True)
+        self.scores = score[order]
+        self.distance = self.frame["distance_km"].to_numpy(dtype=float)
+        self.info = dict(scored.attrs.get("rescore", {}))
+
+        vt, self.vehicle_types = _labels(self.frame["current_vehicle_type"])
+        inc, self.income_bands = _labels(self.frame["income_band"])
+        part = np.where((vt < 0) | (inc < 0), -1, vt * len(self.income_bands) + inc)
+        by_part = np.argsort(part, kind="stable")
+        keys, starts = np.unique(part[by_part], return_index=True)
+        self._parts: Dict[Tuple[str, str], np.ndarray] = {}
+        self._neg_scores: Dict[Tuple[str, str], np.ndarray] = {}
+        for key, pos in zip(keys, np.split(by_part, starts[1:])):
+            if key < 0:
+                continue  # missing type/band never matches a filter
+            label = (self.vehicle_types[key // len(self.income_bands)], self.income_bands[key % len(self.income_bands)])
+            self._parts[label] = pos
+            # Negated so the descending scores can be binary-searched with searchsorted
+            self._neg_scores[label] = -self.scores[pos]
+
+    def __len__(self) -> int:
+        return len(self.frame)
+
+    def percentile(self, q: float) -> float:
+        return float(np.percentile(self.scores, q)) if len(self.scores) else 0.0
+
+    def _matches(self, min_score: float, vehicle_types: Optional[Sequence[str]],
+                 income_bands: Optional[Sequence[str]], max_distance: Optional[float]) -> List[np.ndarray]:
+        vts = set(self.vehicle_types if vehicle_types is None else vehicle_types)
+        incs = set(self.income_bands if income_bands is None else income_bands)
+        out = []
+        for (vt, inc), pos in self._parts.items():
+            if vt not in vts or inc not in incs:
+                continue
+            pos = pos[:np.searchsorted(self._neg_scores[(vt, inc)], -min_score, side="right")]
+            if max_distance:
+                # Not indexed: a vectorized pass over this partition's matches
+                pos = pos[self.distance[pos] <= max_distance]
+            out.append(pos)
+        return out
+
+    def query(self, min_score: float = 0, vehicle_types: Optional[Sequence[str]] = None,
+              income_bands: Optional[Sequence[str]] = None, max_distance: Optional[float] = None,
+              offset: int = 0, limit: int = 50) -> pd.DataFrame:
+        # One page of matching leads in (score, engagements) order; attrs["total"] counts every match
+        parts = self._matches(min_score, vehicle_types, income_bands, max_distance)
+        need = offset + limit
+        cand = np.concatenate([p[:need] for p in parts]) if parts else np.empty(0, dtype=np.intp)
+        cand.sort()
+        page = self.frame.iloc[cand[offset:need]]
+        page.attrs["total"] = int(sum(len(p) for p in parts))
+        return page
+
+    def count(self, min_score: float = 0, vehicle_types: Optional[Sequence[str]] = None,
+              income_bands: Optional[Sequence[str]] = None, max_distance: Optional[float] = None) -> int:
+        return int(sum(len(p) for p in self._matches(min_score, vehicle_types, income_bands, max_distance)))
+
+    def export_csv(self, min_score: float = 0, vehicle_types: Optional[Sequence[str]] = None,
+                   income_bands: Optional[Sequence[str]] = None, max_distance: Optional[float] = None) -> bytes:
+        parts = self._matches(min_score, vehicle_types, income_bands, max_distance)
+        pos = np.sort(np.concatenate(parts)) if parts else np.empty(0, dtype=np.intp)
+        return self.frame.iloc[pos].to_csv(index=False).encode("utf-8")
+
+
+# Built indexes, shared by every session, keyed on whatever identifies the scored input
+# (e.g. the CRM and readiness file signatures). Only the latest few are kept.
+_MAX_INDEXES = 2
+_indexes: Dict[Hashable, LeadIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def lead_index(key: Hashable, build: Callable[[], pd.DataFrame]) -> LeadIndex:
+    # build() returns the scored frame and only runs when no index exists for `key`
+    with _indexes_lock:
+        hit = _indexes.get(key)
+    if hit is not None:
+        return hit
+    index = LeadIndex(build())
+    with _indexes_lock:
+        _indexes[key] = index
+        while len(_indexes) > _MAX_INDEXES:
+            _indexes.pop(next(iter(_indexes)))
+    return index
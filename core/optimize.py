@@ -1,52 +1,279 @@
+import os
+import re
+import time
+import tempfile
 import pandas as pd
 import numpy as np
+from typing import Dict, Optional, Tuple
 
+from core.geo import DistanceIndex, branch_coordinates, distance_index
 
 
-def _county_distance(c1: str, c2: str) -> float:
-    return 0.0 if c1 == c2 else 200.0
+PLAN_COLUMNS = ['from_branch','to_branch','model','units','distance_km','transfer_cost','note']
 
-def greedy_reallocate(inv: pd.DataFrame, branches: pd.DataFrame, min_safety: int, max_distance: float, max_batch: int, transfer_cost_per_unit: float) -> pd.DataFrame:
+# LP objective: every arc costs transfer_cost_per_unit plus this per unit-km, so among equally
+# priced plans the solver prefers nearer sources (as the greedy pass does)
+DISTANCE_TIEBREAK = 1e-3
+LP_TIME_LIMIT = 30.0
+# Nearest locations a greedy sink looks at before scanning everything within max_distance
+_PROBE_LOCATIONS = 32
+
+def _positions(grp: pd.DataFrame, min_safety: int):
+    # Sources (stock > min_safety) and sinks (stock < min_safety) as positions into grp, plus
+    # the stock and integer model codes shared by both
+    stock = grp['stock_units'].to_numpy()
+    model_codes, _ = pd.factorize(grp['model'])
+    return np.flatnonzero(stock > min_safety), np.flatnonzero(stock < min_safety), stock, model_codes
+
+def _locations(grp: pd.DataFrame, branches: pd.DataFrame) -> Tuple[np.ndarray, DistanceIndex]:
+    # One point per branch (its own lat/lon, else its county centroid) in branch_id order, and
+    # each grp row's point
+    b = branches.drop_duplicates('branch_id').sort_values('branch_id', kind='stable')
+    lat, lon = branch_coordinates(b)
+    index = distance_index(b['branch_id'].astype(str).tolist(), lat, lon)
+    loc = pd.Index(index.labels).get_indexer(grp['branch_id'].astype(str))
+    return loc, index
+
+def _stock_by_branch_model(inv: pd.DataFrame, branches: pd.DataFrame) -> pd.DataFrame:
     # Merge branch county
     inv2 = inv.merge(branches[['branch_id','county']], on='branch_id', how='left', suffixes=('','_branch'))
     # Compute surplus and shortfall by (branch_id, model)
-    grp = inv2.groupby(['branch_id','county','model'], as_index=False)['stock_units'].sum()
+    return inv2.groupby(['branch_id','county','model'], as_index=False, observed=True)['stock_units'].sum()
+
+def _model_groups(src_pos: np.ndarray, model_codes: np.ndarray) -> Dict[int, np.ndarray]:
+    # Source positions per model code, grp order kept within a model
+    src_model = model_codes[src_pos]
+    order = np.argsort(src_model, kind='stable')
+    keys, starts = np.unique(src_model[order], return_index=True)
+    return {key: src_pos[idx] for key, idx in zip(keys.tolist(), np.split(order, starts[1:]))}
+
+def _plan_frame(grp: pd.DataFrame, src: np.ndarray, sink: np.ndarray, units: np.ndarray, dist: np.ndarray,
+                transfer_cost_per_unit: float, note: str) -> pd.DataFrame:
+    if not len(units):
+        return pd.DataFrame(columns=PLAN_COLUMNS)
+    return pd.DataFrame({
+        'from_branch': grp['branch_id'].to_numpy()[src],
+        'to_branch': grp['branch_id'].to_numpy()[sink],
+        'model': grp['model'].to_numpy()[sink],
+        'units': units.astype(int),
+        'distance_km': dist,
+        'transfer_cost': units * transfer_cost_per_unit,
+        'note': note,
+    })
+
+def _greedy_moves(grp: pd.DataFrame, loc: np.ndarray, index: DistanceIndex, min_safety: int,
+                  max_distance: float, max_batch: int):
+    # Greedy transfers as (source pos, sink pos, units, distance) arrays into grp.
+    # Sinks are served in (branch, county, model) order, each from the nearest sources of its model
+    # within max_distance that still have surplus (ties in branch order), at most max_batch units
+    # per transfer.
+    src_pos, sink_pos, stock, model_codes = _positions(grp, min_safety)
+    empty = (np.empty(0, dtype=np.intp),) * 3 + (np.empty(0),)
+    if len(src_pos) == 0 or len(sink_pos) == 0 or max_batch <= 0:
+        return empty
+
+    surplus = np.zeros(len(grp), dtype=np.int64)  # remaining surplus per grp row, updated in place
+    surplus[src_pos] = stock[src_pos] - min_safety
+    # Per model, the source row at each location while it still has surplus (-1 otherwise): a
+    # radius query's nearest-first locations map straight to that model's live candidates
+    live_at: Dict[int, np.ndarray] = {}
+    for m, pos in _model_groups(src_pos, model_codes).items():
+        live_at[m] = np.full(len(index), -1, dtype=np.intp)
+        live_at[m][loc[pos]] = pos
+    # Locations within max_distance of each sink location, nearest first, built on first use
+    near: Dict[int, Tuple[np.ndarray, np.ndarray]] = {}
+
+    parts = {'src': [], 'sink': [], 'units': [], 'dist': []}
+    for s, m, c, need in zip(sink_pos.tolist(), model_codes[sink_pos].tolist(), loc[sink_pos].tolist(),
+                             (min_safety - stock[sink_pos]).tolist()):
+        at = live_at.get(m)
+        if at is None:
+            continue
+        if c not in near:
+            near[c] = index.within(c, max_distance)
+        locs, d = near[c]
+        # Usually the nearest few locations cover the need: look there before scanning the full radius
+        for stop in (_PROBE_LOCATIONS, len(locs)):
+            rows = at[locs[:stop]]
+            hits = np.flatnonzero(rows >= 0)
+            cand = rows[hits]
+            step = np.minimum(surplus[cand], max_batch)
+            if step.sum() >= need or stop >= len(locs):
+                break
+        if not len(cand):
+            continue
+        # Each source gives min(surplus, max_batch, what is still needed), nearest first
+        before = np.cumsum(step) - step
+        k = int(np.searchsorted(before, need, side='left'))
+        units = np.minimum(step[:k], need - before[:k])
+        surplus[cand[:k]] -= units
+        drained = cand[:k][surplus[cand[:k]] == 0]
+        at[loc[drained]] = -1
+        parts['src'].append(cand[:k])
+        parts['sink'].append(np.full(k, s))
+        parts['units'].append(units)
+        parts['dist'].append(d[hits[:k]])
+
+    if not parts['units']:
+        return empty
+    return tuple(np.concatenate(parts[k]) for k in ('src', 'sink', 'units', 'dist'))
 
+def greedy_reallocate(inv: pd.DataFrame, branches: pd.DataFrame, min_safety: int, max_distance: float, max_batch: int, transfer_cost_per_unit: float) -> pd.DataFrame:
     # Heuristic: branches with stock_units > min_safety are sources, stock_units < min_safety are sinks
-    sources = grp[grp['stock_units'] > min_safety].copy()
-    sinks = grp[grp['stock_units'] < min_safety].copy()
-    if sources.empty or sinks.empty:
-        return pd.DataFrame(columns=['from_branch','to_branch','model','units','distance_km','transfer_cost','note'])
-
-    plan = []
-    for _, s in sinks.iterrows():
-        need = min_safety - s['stock_units']
-        if need <= 0:
+    grp = _stock_by_branch_model(inv, branches)
+    loc, index = _locations(grp, branches)
+    src, sink, units, dist = _greedy_moves(grp, loc, index, min_safety, max_distance, max_batch)
+    return _plan_frame(grp, src, sink, units, dist, transfer_cost_per_unit, 'greedy')
+
+
+def _transfer_arcs(grp: pd.DataFrame, loc: np.ndarray, index: DistanceIndex, min_safety: int,
+                   max_distance: float, max_batch: int):
+    # Feasible (source, sink) arcs of the same model within max_distance, with their capacity
+    # min(max_batch, source surplus, sink need); arcs that cannot carry a unit are not created
+    src_pos, sink_pos, stock, model_codes = _positions(grp, min_safety)
+    by_model = _model_groups(src_pos, model_codes)
+    sinks_by_model = _model_groups(sink_pos, model_codes)
+    parts = {'src': [], 'sink': [], 'dist': []}
+    for m, srcs in by_model.items():
+        sinks = sinks_by_model.get(m)
+        if sinks is None:
             continue
-        # find candidate sources for same model
-        cand = sources[(sources['model']==s['model']) & (sources['stock_units'] > min_safety)].copy()
-        # sort by proximity
-        cand['dist'] = cand.apply(lambda r: _county_distance(r['county'], s['county']), axis=1)
-        cand = cand.sort_values('dist')
-        for _, src in cand.iterrows():
-            if need <= 0: break
-            if src['dist'] > max_distance: continue
-            surplus = src['stock_units'] - min_safety
-            if surplus <= 0: continue
-            move = int(min(surplus, need, max_batch))
-            if move <= 0: continue
-            plan.append({
-                'from_branch': src['branch_id'],
-                'to_branch': s['branch_id'],
-                'model': s['model'],
-                'units': move,
-                'distance_km': src['dist'],
-                'transfer_cost': move * transfer_cost_per_unit,
-                'note': 'greedy'
-            })
-            # update bookkeeping
-            need -= move
-            idx = (sources['branch_id']==src['branch_id']) & (sources['model']==src['model'])
-            sources.loc[idx, 'stock_units'] -= move
-
-    return pd.DataFrame(plan)
+        d = index.pairwise(loc[srcs], loc[sinks])
+        i, j = np.nonzero(d <= max_distance)
+        parts['src'].append(srcs[i])
+        parts['sink'].append(sinks[j])
+        parts['dist'].append(d[i, j])
+    if not parts['src']:
+        return (np.empty(0, dtype=np.intp),) * 2 + (np.empty(0), np.empty(0, dtype=np.int64), stock)
+    src, sink, d = (np.concatenate(parts[k]) for k in ('src', 'sink', 'dist'))
+    cap = np.minimum(np.minimum(stock[src] - min_safety, min_safety - stock[sink]), max(max_batch, 0))
+    keep = cap > 0
+    return src[keep], sink[keep], d[keep], cap[keep], stock
+
+def _cbc_bound(log_path: str) -> Optional[float]:
+    # Best lower bound from a CBC log ("Lower bound:" on a MIP stop, absent for a solved LP)
+    try:
+        with open(log_path) as f:
+            text = f.read()
+    except OSError:
+        return None
+    m = re.findall(r"Lower bound:\s*(-?[\d.eE+-]+)", text)
+    return float(m[-1]) if m else None
+
+def lp_reallocate(inv: pd.DataFrame, branches: pd.DataFrame, min_safety: int, max_distance: float, max_batch: int,
+                  transfer_cost_per_unit: float, cost_per_transfer: float=0.0, time_limit: float=LP_TIME_LIMIT,
+                  warm_start: bool=True, arc_cover: Optional[float]=None) -> pd.DataFrame:
+    # Min-cost transfer plan with the same inputs and columns as greedy_reallocate.
+    # Variables exist only for feasible arcs (same model, within max_distance). Each sink's unmet need
+    # is penalized above any arc cost, so the plan fills as much shortfall as possible, then at the
+    # lowest transfer cost (+ DISTANCE_TIEBREAK per unit-km). With no per-transfer cost this is a
+    # network flow whose LP optimum is integral, so it is solved as an LP. cost_per_transfer > 0 adds
+    # a binary per used arc (a MIP), warm-started from the greedy plan and stopped at time_limit
+    # (CBC applies the limit to the MIP search, not to a plain LP).
+    # arc_cover=c keeps, per sink, only its nearest arcs until their capacity reaches c x its need
+    # (plus the greedy arcs): far fewer variables on dense networks, optimal for that reduced network.
+    # out.attrs["solve"] has the status, objective, bound/gap, timings and the greedy comparison.
+    import pulp  # type: ignore
+
+    t0 = time.perf_counter()
+    grp = _stock_by_branch_model(inv, branches)
+    loc, index = _locations(grp, branches)
+    src, sink, dist, cap, stock = _transfer_arcs(grp, loc, index, min_safety, max_distance, max_batch)
+    g_src, g_sink, g_units, g_dist = _greedy_moves(grp, loc, index, min_safety, max_distance, max_batch)
+    if arc_cover is not None and len(src):
+        order = np.lexsort((src, dist, sink))
+        s_sorted, c_sorted = sink[order], cap[order]
+        first = np.r_[True, s_sorted[1:] != s_sorted[:-1]]
+        before = np.cumsum(c_sorted) - c_sorted
+        before -= np.maximum.accumulate(np.where(first, before, 0))
+        keep = np.zeros(len(src), dtype=bool)
+        keep[order[before < arc_cover * (min_safety - stock[s_sorted])]] = True
+        greedy_arc = set(zip(g_src.tolist(), g_sink.tolist()))
+        keep |= np.fromiter(((a, b) in greedy_arc for a, b in zip(src.tolist(), sink.tolist())), bool, len(src))
+        src, sink, dist, cap = src[keep], sink[keep], dist[keep], cap[keep]
+    unit_cost = transfer_cost_per_unit + DISTANCE_TIEBREAK * dist
+    greedy_units = int(g_units.sum())
+    info = {"status": "no feasible transfers", "arcs": int(len(src)), "units": 0,
+            "greedy_units": greedy_units, "time_limit": time_limit}
+    if not len(src):
+        out = pd.DataFrame(columns=PLAN_COLUMNS)
+        out.attrs["solve"] = info
+        return out
+
+    mip = cost_per_transfer > 0
+    sink_ids, sink_of_arc = np.unique(sink, return_inverse=True)
+    src_ids, src_of_arc = np.unique(src, return_inverse=True)
+    need = min_safety - stock[sink_ids]
+    penalty = float(unit_cost.max() + cost_per_transfer) * 2 + 1
+
+    prob = pulp.LpProblem("transfers", pulp.LpMinimize)
+    cat = pulp.LpInteger if mip else pulp.LpContinuous
+    x = [pulp.LpVariable(f"x{k}", 0, int(c), cat) for k, c in enumerate(cap.tolist())]
+    short = [pulp.LpVariable(f"u{j}", 0, int(n)) for j, n in enumerate(need.tolist())]
+    y = [pulp.LpVariable(f"y{k}", cat=pulp.LpBinary) for k in range(len(x))] if mip else []
+    objective = pulp.LpAffineExpression(list(zip(x, unit_cost.tolist())) + [(u, penalty) for u in short]
+                                        + [(b, cost_per_transfer) for b in y])
+    prob += objective
+    for j, arcs in enumerate(np.split(np.argsort(sink_of_arc, kind='stable'), np.cumsum(np.bincount(sink_of_arc))[:-1])):
+        prob += pulp.LpAffineExpression([(x[k], 1) for k in arcs.tolist()] + [(short[j], 1)]) == int(need[j]), f"sink{j}"
+    surplus = stock[src_ids] - min_safety
+    for i, arcs in enumerate(np.split(np.argsort(src_of_arc, kind='stable'), np.cumsum(np.bincount(src_of_arc))[:-1])):
+        prob += pulp.LpAffineExpression([(x[k], 1) for k in arcs.tolist()]) <= int(surplus[i]), f"src{i}"
+    for k, b in enumerate(y):
+        prob += x[k] - int(cap[k]) * b <= 0, f"use{k}"
+
+    # Greedy plan as the starting point (every greedy move lies on an arc, within its capacity)
+    arc_of = {(a, b): k for k, (a, b) in enumerate(zip(src.tolist(), sink.tolist()))}
+    start = np.zeros(len(x), dtype=np.int64)
+    for a, b, n in zip(g_src.tolist(), g_sink.tolist(), g_units.tolist()):
+        start[arc_of[(a, b)]] = n
+    filled = np.bincount(sink_of_arc, weights=start, minlength=len(sink_ids))
+    greedy_objective = float(unit_cost @ start + penalty * (need - filled).sum() + cost_per_transfer * (start > 0).sum())
+    if warm_start:
+        for k, v in enumerate(start.tolist()):
+            x[k].setInitialValue(v)
+            if mip:
+                y[k].setInitialValue(int(v > 0))
+        for j, v in enumerate((need - filled).tolist()):
+            short[j].setInitialValue(v)
+    build_secs = time.perf_counter() - t0
+
+    fd, log_path = tempfile.mkstemp(suffix=".log")
+    os.close(fd)
+    try:
+        solver = pulp.PULP_CBC_CMD(msg=False, timeLimit=time_limit, warmStart=warm_start and mip, logPath=log_path)
+        t1 = time.perf_counter()
+        prob.solve(solver)
+        solve_secs = time.perf_counter() - t1
+        bound = _cbc_bound(log_path)
+    finally:
+        os.remove(log_path)
+
+    status = pulp.LpStatus[prob.status]
+    values = np.array([v.varValue if v.varValue is not None else np.nan for v in x])
+    if np.isnan(values).any() or pulp.LpSolution[prob.sol_status] not in ("Optimal Solution Found", "Solution Found"):
+        # No usable solution within the time limit: fall back to the greedy plan
+        units, note, objective_value = start, "greedy", greedy_objective
+    else:
+        units, note, objective_value = np.rint(values).astype(np.int64), "mip" if mip else "lp", float(pulp.value(prob.objective))
+    if not mip or pulp.LpSolution[prob.sol_status] == "Optimal Solution Found":
+        bound = objective_value if bound is None else bound
+    gap = abs(objective_value - bound) / max(abs(objective_value), 1e-9) if bound is not None else None
+
+    used = np.flatnonzero(units > 0)
+    # Same row order as the greedy plan: by sink, nearest source first
+    used = used[np.lexsort((src[used], dist[used], sink[used]))]
+    out = _plan_frame(grp, src[used], sink[used], units[used], dist[used], transfer_cost_per_unit, note)
+    if len(out) and cost_per_transfer:
+        out['transfer_cost'] = out['transfer_cost'] + cost_per_transfer
+    info.update({
+        "status": status, "solution": pulp.LpSolution[prob.sol_status], "mip": mip,
+        "objective": round(objective_value, 4), "bound": None if bound is None else round(bound, 4),
+        "gap": None if gap is None else round(gap, 6),
+        "units": int(units.sum()), "unmet_units": int(need.sum() - units.sum()),
+        "greedy_objective": round(greedy_objective, 4),
+        "build_seconds": round(build_secs, 3), "solve_seconds": round(solve_secs, 3),
+        "variables": len(x) + len(short) + len(y), "constraints": len(prob.constraints),
+    })
+    out.attrs["solve"] = info
+    return out
@@ -1,24 +1,107 @@
 # core/pdf.py
+# PDF reports: the one-page group-wide executive summary, and bulk report packs with one report per
+# branch and per county (KPIs, top leads, transfer plan, forecast). Reports are rendered into
+# memory; packs are partitioned per report in the parent process and rendered on a process pool.
+from __future__ import annotations
+import io
+import hashlib
+import os
+import re
+import time
+import zipfile
+import threading
+import pandas as pd
 from reportlab.lib.pagesizes import A4
 from reportlab.pdfgen import canvas
 from reportlab.lib.units import cm
 from reportlab.lib import colors
+from reportlab.lib.utils import ImageReader
+from reportlab import rl_config
 from pathlib import Path
 from datetime import datetime
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from core.io import DATA_DIR
+
+REPORTS_OUT_DIR = os.path.join(DATA_DIR, "outputs", "reports")
+REPORT_LEVELS = ("branch", "county")
+REPORT_WORKERS = 4
+TOP_LEADS = 10
+# Transfer rows listed per report before "... n more"
+MAX_TRANSFER_ROWS = 25
+FOOTER = "Generated by EV Sales Optimizer — Forecast • Focus • Reallocate • Prove Revenue Uplift"
+
+# The logo is drawn LOGO_SIZE on the page. It is decoded once per process (keyed on path + mtime)
+# and downsampled to LOGO_DPI at that size: reportlab re-encodes the image into every PDF, which
+# at the source resolution costs ~2 s and ~2.5 MB per report.
+LOGO_SIZE = (3.2*cm, 1.6*cm)
+LOGO_DPI = 300
+_logos: Dict[Tuple[str, float], ImageReader] = {}
+_logos_lock = threading.Lock()
 
-def build_exec_summary(eri, hist, branches, inv, crm, logo_path: Path, out_path: Path):
-    out_path.parent.mkdir(parents=True, exist_ok=True)
-    c = canvas.Canvas(str(out_path), pagesize=A4)
-    W, H = A4
 
-    # Header
+def _logo(logo_path) -> Optional[ImageReader]:
+    path = Path(logo_path) if logo_path else None
+    if path is None or not path.exists():
+        return None
+    key = (str(path), path.stat().st_mtime)
+    with _logos_lock:
+        img = _logos.get(key)
+        if img is None:
+            from PIL import Image
+            with Image.open(path) as im:
+                im.load()
+                px = tuple(max(1, round(v / 72 * LOGO_DPI)) for v in LOGO_SIZE)
+                if im.width > px[0] or im.height > px[1]:
+                    im = im.resize(px, Image.LANCZOS)
+                if im.mode in ("RGB", "L"):
+                    # Opaque logos are held as JPEG, which reportlab embeds as is instead of
+                    # zlib-compressing the pixels again for every report
+                    buf = io.BytesIO()
+                    im.save(buf, format="JPEG", quality=95)
+                    buf.seek(0)
+                    im = buf
+                img = _logos[key] = ImageReader(im)
+        return img
+
+
+def _header(c, title: str, subtitle: str, logo: Optional[ImageReader], size: int=18) -> float:
+    W, H = A4
     y = H - 2*cm
-    if logo_path.exists():
-        c.drawImage(str(logo_path), 1.5*cm, y-1.6*cm, width=3.2*cm, height=1.6*cm, mask='auto')
-    c.setFont("Helvetica-Bold", 18)
-    c.drawString(6*cm, y, "EV Sales Optimizer — Executive Summary")
+    if logo is not None:
+        c.drawImage(logo, 1.5*cm, y-LOGO_SIZE[1], width=LOGO_SIZE[0], height=LOGO_SIZE[1], mask='auto')
+    c.setFont("Helvetica-Bold", size)
+    c.drawString(6*cm, y, title)
     c.setFont("Helvetica", 10)
-    c.drawString(6*cm, y-0.6*cm, datetime.now().strftime("%d %b %Y, %H:%M"))
+    c.drawString(6*cm, y-0.6*cm, subtitle)
+    return y
+
+
+def _footer(c) -> None:
+    W, _ = A4
+    c.setStrokeColor(colors.grey)
+    c.line(1.5*cm, 1.8*cm, W-1.5*cm, 1.8*cm)
+    c.setFont("Helvetica-Oblique", 9)
+    c.drawString(1.5*cm, 1.4*cm, FOOTER)
+
+
+def _render(draw, *args) -> Tuple[bytes, int]:
+    # Run draw(canvas, *args) on an in-memory canvas; returns the PDF bytes and its page count
+    buf = io.BytesIO()
+    c = canvas.Canvas(buf, pagesize=A4)
+    draw(c, *args)
+    pages = c.getPageNumber()
+    _footer(c)
+    c.showPage()
+    c.save()
+    return buf.getvalue(), pages
+
+
+def _draw_exec_summary(c, eri, hist, branches, inv, crm, logo) -> None:
+    W, H = A4
+    _header(c, "EV Sales Optimizer — Executive Summary", datetime.now().strftime("%d %b %Y, %H:%M"), logo)
 
     # KPIs
     total_leads = len(crm) if crm is not None else 0
@@ -43,24 +126,363 @@ def build_exec_summary(eri, hist, branches, inv, crm, logo_path: Path, out_path:
         c.drawString(1.5*cm, H-7.2*cm, "Top 5 Ready Counties")
         c.setFont("Helvetica", 10)
         y2 = H-7.9*cm
-        for _, r in top.iterrows():
-            c.drawString(1.7*cm, y2, f"{r['county']}: {int(r['readiness_score'])}")
+        for county, score in zip(top["county"], top["readiness_score"]):
+            c.drawString(1.7*cm, y2, f"{county}: {int(score)}")
             y2 -= 0.5*cm
 
         c.setFont("Helvetica-Bold", 12)
         c.drawString(9.5*cm, H-7.2*cm, "Bottom 5 Ready Counties")
         c.setFont("Helvetica", 10)
         y3 = H-7.9*cm
-        for _, r in bot.iterrows():
-            c.drawString(9.7*cm, y3, f"{r['county']}: {int(r['readiness_score'])}")
+        for county, score in zip(bot["county"], bot["readiness_score"]):
+            c.drawString(9.7*cm, y3, f"{county}: {int(score)}")
             y3 -= 0.5*cm
 
-    # Footer
-    c.setStrokeColor(colors.grey)
-    c.line(1.5*cm, 1.8*cm, W-1.5*cm, 1.8*cm)
-    c.setFont("Helvetica-Oblique", 9)
-    c.drawString(1.5*cm, 1.4*cm, "Generated by EV Sales Optimizer — Forecast • Focus • Reallocate • Prove Revenue Uplift")
 
-    c.showPage()
-    c.save()
+def render_exec_summary(eri, hist, branches, inv, crm, logo_path) -> bytes:
+    # The executive summary as PDF bytes (nothing written to disk)
+    return _render(_draw_exec_summary, eri, hist, branches, inv, crm, _logo(logo_path))[0]
+
+
+def build_exec_summary(eri, hist, branches, inv, crm, logo_path: Path, out_path: Path):
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    out_path.write_bytes(render_exec_summary(eri, hist, branches, inv, crm, logo_path))
     return out_path
+
+
+# ---- Per-branch / per-county reports
+
+def _table(c, y: float, title: str, header: Sequence[str], rows: List[Sequence], xs: Sequence[float],
+           empty: str="None") -> float:
+    # A titled text table from y downwards; continues on a new page when it reaches the footer
+    W, H = A4
+    if y < 4*cm:
+        _footer(c)
+        c.showPage()
+        y = H - 2*cm
+    c.setFont("Helvetica-Bold", 12)
+    c.drawString(1.5*cm, y, title)
+    y -= 0.6*cm
+    if not rows:
+        c.setFont("Helvetica-Oblique", 10)
+        c.drawString(1.7*cm, y, empty)
+        return y - 0.8*cm
+    c.setFont("Helvetica-Bold", 9)
+    for x, h in zip(xs, header):
+        c.drawString(x, y, str(h))
+    y -= 0.45*cm
+    c.setFont("Helvetica", 9)
+    for row in rows:
+        if y < 2.4*cm:
+            _footer(c)
+            c.showPage()
+            y = H - 2*cm
+            c.setFont("Helvetica", 9)
+        for x, v in zip(xs, row):
+            c.drawString(x, y, str(v))
+        y -= 0.42*cm
+    return y - 0.5*cm
+
+
+def _kpis(c, y: float, items: List[Tuple[str, str]]) -> float:
+    c.setFont("Helvetica-Bold", 12)
+    c.drawString(1.5*cm, y, "Key Metrics")
+    y -= 0.8*cm
+    c.setFont("Helvetica", 11)
+    for i, (label, value) in enumerate(items):
+        c.drawString(1.7*cm if i % 2 == 0 else 9.5*cm, y - (i // 2) * 0.7*cm, f"{label}: {value}")
+    return y - ((len(items) + 1) // 2) * 0.7*cm - 0.5*cm
+
+
+def _fmt(v, digits: int=0) -> str:
+    return "–" if v is None or pd.isna(v) else f"{v:,.{digits}f}"
+
+
+def _lead_rows(leads: pd.DataFrame) -> List[Tuple]:
+    return [(lid, f"{fn} {ln}", county, int(eng), _fmt(score, 1)) for lid, fn, ln, county, eng, score in
+            zip(leads["lead_id"], leads["first_name"], leads["last_name"], leads["county"],
+                leads["engagements_90d"], leads["score"])]
+
+
+def _transfer_rows(moves: pd.DataFrame, own: Sequence[str]) -> List[Tuple]:
+    # One row per transfer touching `own` branches: direction, counterpart, model, units, km, cost
+    own = set(own)
+    rows = [("out" if f in own else "in", t if f in own else f, m, int(u), _fmt(d), _fmt(k))
+            for f, t, m, u, d, k in zip(moves["from_branch"], moves["to_branch"], moves["model"],
+                                       moves["units"], moves["distance_km"], moves["transfer_cost"])]
+    if len(rows) > MAX_TRANSFER_ROWS:
+        rows = rows[:MAX_TRANSFER_ROWS] + [(f"... {len(rows) - MAX_TRANSFER_ROWS} more", "", "", "", "", "")]
+    return rows
+
+
+def _forecast_rows(fc: pd.DataFrame) -> List[Tuple]:
+    return [(county, period, _fmt(v, 1)) for county, period, v in zip(fc["county"], fc["period"], fc["forecast"])]
+
+
+_LEAD_HEADER = (("Lead", "Name", "County", "Eng. 90d", "Score"), (1.7*cm, 4.2*cm, 9.0*cm, 12.5*cm, 14.5*cm))
+_TRANSFER_HEADER = (("Dir.", "Branch", "Model", "Units", "km", "Cost (€)"),
+                    (1.7*cm, 3.0*cm, 5.5*cm, 10.0*cm, 11.8*cm, 13.6*cm))
+_FORECAST_HEADER = (("County", "Period", "EV registrations"), (1.7*cm, 6.0*cm, 9.0*cm))
+
+
+def _draw_branch_report(c, part: Dict, logo) -> None:
+    b = part["branch"]
+    y = _header(c, f"{b['branch_name']} ({b['branch_id']})",
+                f"{b['county']} · serves {', '.join(part['serves']) or '–'} · {part['generated']}", logo, size=16)
+    stock = part["stock"]
+    units = int(stock["stock_units"].sum()) if len(stock) else 0
+    days = (stock["avg_days_on_lot"] * stock["stock_units"]).sum() / units if units else None
+    plan = part["transfers"]
+    y = _kpis(c, y - 2.2*cm, [
+        ("Stock units", f"{units:,}"), ("Models in stock", f"{int((stock['stock_units'] > 0).sum()) if len(stock) else 0}"),
+        ("Avg days on lot", _fmt(days)), ("Leads in served counties", f"{part['leads_total']:,}"),
+        ("Units in / out", f"{int(plan.loc[plan['to_branch'] == b['branch_id'], 'units'].sum())} / "
+                           f"{int(plan.loc[plan['from_branch'] == b['branch_id'], 'units'].sum())}"),
+        ("Readiness (home county)", _fmt(part["readiness"])),
+    ])
+    y = _table(c, y, f"Top {TOP_LEADS} Leads", _LEAD_HEADER[0], _lead_rows(part["leads"]), _LEAD_HEADER[1])
+    y = _table(c, y, "Transfer Plan", _TRANSFER_HEADER[0], _transfer_rows(plan, [b["branch_id"]]),
+               _TRANSFER_HEADER[1], empty="No transfers planned.")
+    _table(c, y, "Forecast (served counties)", _FORECAST_HEADER[0], _forecast_rows(part["forecast"]),
+           _FORECAST_HEADER[1], empty="No forecast available.")
+
+
+def _draw_county_report(c, part: Dict, logo) -> None:
+    y = _header(c, f"{part['county']} — County Report", part["generated"], logo, size=16)
+    stock = part["stock"]
+    y = _kpis(c, y - 2.2*cm, [
+        ("Readiness", _fmt(part["readiness"])), ("Leads", f"{part['leads_total']:,}"),
+        ("Branches", f"{len(part['branch_ids'])}"), ("Stock units", f"{int(stock['stock_units'].sum()) if len(stock) else 0:,}"),
+    ])
+    y = _table(c, y, f"Top {TOP_LEADS} Leads", _LEAD_HEADER[0], _lead_rows(part["leads"]), _LEAD_HEADER[1])
+    y = _table(c, y, "Transfer Plan (branches in county)", _TRANSFER_HEADER[0],
+               _transfer_rows(part["transfers"], part["branch_ids"]), _TRANSFER_HEADER[1], empty="No transfers planned.")
+    _table(c, y, "Forecast", _FORECAST_HEADER[0], _forecast_rows(part["forecast"]), _FORECAST_HEADER[1],
+           empty="No forecast available.")
+
+
+_DRAW = {"branch": _draw_branch_report, "county": _draw_county_report}
+_a85_lock = threading.Lock()
+
+
+@contextmanager
+def _binary_streams():
+    # Pack reports embed their streams as binary: the ASCII85 encoding reportlab applies by default
+    # runs in pure Python unless its C accelerator is installed, and cost more than the drawing.
+    # rl_config is process-wide, so the switch is held only for the render and then restored.
+    with _a85_lock:
+        saved = rl_config.useA85
+        rl_config.useA85 = 0
+        try:
+            yield
+        finally:
+            rl_config.useA85 = saved
+
+
+def _render_part(task: Tuple[str, str, Dict, Optional[str]]):
+    # Worker entry point: one report -> (file name, PDF bytes, pages, error)
+    kind, name, part, logo_path = task
+    try:
+        logo = _logo(logo_path)
+        with _binary_streams():
+            data, pages = _render(_DRAW[kind], part, logo)
+        return name, data, pages, None
+    except Exception as e:
+        return name, None, 0, f"{type(e).__name__}: {e}"
+
+
+def _slug(s: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_-]+", "_", str(s)).strip("_") or "unnamed"
+
+
+def _report_name(kind: str, raw, taken: set) -> str:
+    # "<kind>_<slug>.pdf", unique within the pack: a slug that dropped characters gets a short hash
+    # of the raw id ("B-1/2" and "B_1_2" must not share a file), and a name still taken (duplicate
+    # ids, or ids differing only in case on a case-insensitive file system) gets a counter
+    slug = _slug(raw)
+    if slug != str(raw):
+        slug += "-" + hashlib.sha1(str(raw).encode("utf-8")).hexdigest()[:8]
+    name, n = f"{kind}_{slug}.pdf", 1
+    while name.lower() in taken:
+        n += 1
+        name = f"{kind}_{slug}-{n}.pdf"
+    taken.add(name.lower())
+    return name
+
+
+def _partition(eri, branches, inv, crm, plan: pd.DataFrame, forecast: pd.DataFrame,
+               levels: Sequence[str], top_leads: int) -> List[Tuple[str, str, Dict]]:
+    # Split the datasets into one small payload per report, so each worker gets only its slice
+    from core.scoring import score_leads_lean
+    generated = datetime.now().strftime("%d %b %Y, %H:%M")
+    readiness = dict(zip(eri["county"].astype(str), eri["readiness_score"])) if eri is not None else {}
+
+    lead_cols = ["lead_id", "first_name", "last_name", "county", "engagements_90d", "score"]
+    if crm is not None and len(crm):
+        leads = crm[lead_cols[:-1]].assign(county=crm["county"].astype(str),
+                                           score=score_leads_lean(crm, eri)["score"].to_numpy())
+        leads = leads.sort_values(["score", "engagements_90d"], ascending=False, kind="stable")
+        lead_count = leads.groupby("county", sort=False).size().to_dict()
+        top_by_county = {k: g for k, g in leads.groupby("county", sort=False).head(top_leads).groupby("county", sort=False)}
+    else:
+        lead_count, top_by_county = {}, {}
+    no_leads = pd.DataFrame(columns=lead_cols)
+
+    stock = inv.assign(branch_id=inv["branch_id"].astype(str), model=inv["model"].astype(str))
+    stock = stock[["branch_id", "model", "stock_units", "avg_days_on_lot"]]
+    stock_by_branch = dict(tuple(stock.groupby("branch_id", sort=False)))
+    no_stock = stock.iloc[:0]
+
+    plan = plan.assign(from_branch=plan["from_branch"].astype(str), to_branch=plan["to_branch"].astype(str))
+    moves_by_branch: Dict[str, List[int]] = {}
+    for i, (f, t) in enumerate(zip(plan["from_branch"], plan["to_branch"])):
+        moves_by_branch.setdefault(f, []).append(i)
+        moves_by_branch.setdefault(t, []).append(i)
+
+    forecast = forecast.assign(county=forecast["county"].astype(str))
+    fc_by_county = dict(tuple(forecast.groupby("county", sort=False)))
+    no_fc = forecast.iloc[:0]
+
+    def moves(ids):
+        rows = sorted({i for b in ids for i in moves_by_branch.get(b, [])})
+        return plan.iloc[rows]
+
+    def top(counties):
+        parts = [top_by_county[k] for k in counties if k in top_by_county]
+        if not parts:
+            return no_leads
+        return pd.concat(parts).sort_values(["score", "engagements_90d"], ascending=False, kind="stable").head(top_leads)
+
+    def fc(counties):
+        parts = [fc_by_county[k] for k in counties if k in fc_by_county]
+        return pd.concat(parts) if parts else no_fc
+
+    tasks, taken = [], set()
+    b = branches.assign(branch_id=branches["branch_id"].astype(str), county=branches["county"].astype(str))
+    serves = [[s for s in str(v).split("|") if s] if pd.notna(v) else [] for v in b["serves_counties"]]
+    if "branch" in levels:
+        for row, served in zip(b[["branch_id", "branch_name", "county"]].to_dict("records"), serves):
+            served = served or [row["county"]]
+            tasks.append(("branch", _report_name("branch", row["branch_id"], taken), {
+                "branch": row, "serves": served, "generated": generated,
+                "stock": stock_by_branch.get(row["branch_id"], no_stock),
+                "leads": top(served), "leads_total": int(sum(lead_count.get(k, 0) for k in served)),
+                "readiness": readiness.get(row["county"]),
+                "transfers": moves([row["branch_id"]]), "forecast": fc(served),
+            }))
+    if "county" in levels:
+        counties = list(dict.fromkeys(list(readiness) + b["county"].tolist()))
+        for county in counties:
+            ids = b.loc[b["county"] == county, "branch_id"].tolist()
+            tasks.append(("county", _report_name("county", county, taken), {
+                "county": county, "generated": generated, "branch_ids": ids,
+                "stock": pd.concat([stock_by_branch[i] for i in ids if i in stock_by_branch] or [no_stock]),
+                "leads": top([county]), "leads_total": int(lead_count.get(county, 0)),
+                "readiness": readiness.get(county), "transfers": moves(ids), "forecast": fc([county]),
+            }))
+    return tasks
+
+
+def build_report_pack(eri, hist, branches, inv, crm, logo_path=None, out_dir: Optional[str]=REPORTS_OUT_DIR,
+                      zip_path: Optional[str]=None, plan: Optional[pd.DataFrame]=None,
+                      forecast: Optional[pd.DataFrame]=None, levels: Sequence[str]=REPORT_LEVELS,
+                      n_jobs: int=REPORT_WORKERS, top_leads: int=TOP_LEADS,
+                      progress: Optional[Callable[[float, str], None]]=None) -> Dict:
+    # One PDF per branch and/or county. plan defaults to greedy_reallocate with the optimizer page
+    # defaults, forecast (county, period, forecast) to a 3-month batch ETS forecast of `hist`.
+    # PDFs are rendered to bytes on n_jobs worker processes and written to out_dir and/or stored
+    # in the zip at zip_path, a path or a binary file object (at least one is needed). Reports come
+    # back in branch, then county, order whatever n_jobs is; failed reports are listed under `errors`.
+    # progress(fraction, message) is reported per report rendered.
+    from core.forecast import _resolve_workers, batch_forecast
+    from core.optimize import greedy_reallocate
+    unknown = [k for k in levels if k not in REPORT_LEVELS]
+    if unknown:
+        raise ValueError(f"Unknown report level(s): {unknown}. Expected some of {list(REPORT_LEVELS)}")
+    if out_dir is None and zip_path is None:
+        raise ValueError("Need out_dir and/or zip_path")
+    t0 = time.perf_counter()
+    if plan is None:
+        plan = greedy_reallocate(inv, branches, 8, 250.0, 3, 150.0)
+    if forecast is None:
+        forecast = batch_forecast(hist, periods=3, engine="ets") if hist is not None else \
+            pd.DataFrame(columns=["county", "period", "forecast"])
+    logo = str(logo_path) if logo_path else None
+    tasks = [(kind, name, part, logo) for kind, name, part in
+             _partition(eri, branches, inv, crm, plan, forecast, levels, top_leads)]
+    t_partition = time.perf_counter() - t0
+
+    t1 = time.perf_counter()
+    workers = min(_resolve_workers(n_jobs), max(len(tasks), 1))
+    if workers <= 1:
+        results = map(_render_part, tasks)
+        ex = None
+    else:
+        ex = ProcessPoolExecutor(max_workers=workers)
+        # map() keeps task order, so files and zip entries come out in the same order for any n_jobs
+        results = ex.map(_render_part, tasks, chunksize=max(1, len(tasks) // (workers * 4)))
+    files, errors, pages, size = [], {}, 0, 0
+    zf = None
+    try:
+        if out_dir is not None:
+            os.makedirs(out_dir, exist_ok=True)
+        if zip_path is not None:
+            if isinstance(zip_path, (str, os.PathLike)):
+                os.makedirs(os.path.dirname(os.path.abspath(zip_path)), exist_ok=True)
+            zf = zipfile.ZipFile(zip_path, "w", compression=zipfile.ZIP_DEFLATED)
+        for i, (name, data, n_pages, error) in enumerate(results):
+            if progress is not None:
+                progress((i + 1) / len(tasks), f"{i + 1}/{len(tasks)} reports")
+            if error is not None:
+                errors[name] = error
+                continue
+            if out_dir is not None:
+                with open(os.path.join(out_dir, name), "wb") as f:
+                    f.write(data)
+            if zf is not None:
+                zf.writestr(name, data)
+            files.append(name)
+            pages += n_pages
+            size += len(data)
+    finally:
+        if zf is not None:
+            zf.close()
+        if ex is not None:
+            # Reports not yet started are dropped if progress() aborted the pack
+            ex.shutdown(cancel_futures=True)
+    render_secs = time.perf_counter() - t1
+    return {"reports": len(files), "pages": pages, "bytes": size, "workers": workers,
+            "partition_seconds": round(t_partition, 3), "render_seconds": round(render_secs, 3),
+            "seconds": round(time.perf_counter() - t0, 3),
+            "pages_per_s": round(pages / render_secs, 1) if render_secs > 0 else None,
+            "out_dir": out_dir, "zip_path": zip_path if isinstance(zip_path, (str, os.PathLike)) else None,
+            "files": files, "errors": errors}
+
+
+def render_report_pack(eri, hist, branches, inv, crm, logo_path=None, **kwargs) -> Tuple[bytes, Dict]:
+    # The pack as ZIP bytes plus build_report_pack's summary (nothing written to disk)
+    buf = io.BytesIO()
+    res = build_report_pack(eri, hist, branches, inv, crm, logo_path, out_dir=None, zip_path=buf, **kwargs)
+    return buf.getvalue(), res
+
+
+if __name__ == "__main__":
+    import argparse
+    from core.io import load_all_datasets
+
+    ap = argparse.ArgumentParser(description="Per-branch and per-county PDF report pack")
+    ap.add_argument("--out", default=REPORTS_OUT_DIR)
+    ap.add_argument("--zip", default=None, help="also (or, with --no-files, only) write the reports to this zip")
+    ap.add_argument("--no-files", action="store_true")
+    ap.add_argument("--levels", nargs="*", default=list(REPORT_LEVELS))
+    ap.add_argument("--jobs", type=int, default=REPORT_WORKERS)
+    args = ap.parse_args()
+
+    eri, hist, branches, inv, crm, _ = load_all_datasets(prefer_real=True)
+    logo = Path(__file__).resolve().parents[1] / "assets" / "logo.png"
+    res = build_report_pack(eri, hist, branches, inv, crm, logo, out_dir=None if args.no_files else args.out,
+                            zip_path=args.zip, levels=args.levels, n_jobs=args.jobs)
+    print(f"{res['reports']} reports, {res['pages']} pages in {res['seconds']}s "
+          f"({res['pages_per_s']} pages/s on {res['workers']} workers)")
+    for name, err in res["errors"].items():
+        print(f"FAILED {name}: {err}")
@@ -0,0 +1,188 @@
+# core/propensity.py
+# Learned alternative to the hand-tuned lead score: a logistic model on the same five normalized
+# components, trained incrementally over CRM chunks and applied in bounded-memory batches.
+#   python -m core.propensity train --labels data/Conversions.csv
+#   python -m core.propensity score --out data/outputs/propensity.parquet
+from __future__ import annotations
+import os
+import time
+import pickle
+import tempfile
+import numpy as np
+import pandas as pd
+from typing import Dict, Optional
+
+from core.io import DATA_DIR, iter_dataset_chunks
+from core.scoring import (SCORE_INPUTS, SCORE_CHUNK_ROWS, ScoreStats, _components, _raw_features,
+                          _readiness_table, fit_score_stats)
+
+PROPENSITY_MODEL_PATH = os.path.join(DATA_DIR, "models", "propensity.pkl")
+PROPENSITY_FEATURES = ["readiness_norm", "vehicle_type_score", "income_norm", "engagements_norm", "proximity"]
+_MODEL_VERSION = 1
+
+
+def _feature_block(chunk: pd.DataFrame, readiness: Dict[str, float], stats: ScoreStats,
+                   fills: Dict[str, float]) -> np.ndarray:
+    c = _components(_raw_features(chunk, readiness), stats, fills)
+    return np.column_stack([c["readiness_norm"], c["vehicle_type_score"], c["income_norm"],
+                            c["engagements_norm"], 1 - c["distance_norm"]])
+
+
+def _labels_for(chunk: pd.DataFrame, labels: Optional[pd.Series], label_col: str) -> np.ndarray:
+    # 1.0 / 0.0 per row, NaN where the lead has no label (left out of training)
+    if labels is not None:
+        pos = labels.index.get_indexer(chunk["lead_id"].astype(str))
+        y = np.where(pos >= 0, labels.to_numpy(dtype=float)[np.maximum(pos, 0)], np.nan)
+    else:
+        y = pd.to_numeric(chunk[label_col], errors="coerce").to_numpy(dtype=float)
+    return np.where(np.isnan(y), np.nan, (y > 0).astype(float))
+
+
+def _save_model(obj: dict, path: str) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump(obj, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+    except Exception:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def train_propensity(crm_path: str, eri: pd.DataFrame, labels: Optional[pd.DataFrame]=None,
+                     label_col: str="converted", epochs: int=2, chunk_rows: int=SCORE_CHUNK_ROWS,
+                     model_path: str=PROPENSITY_MODEL_PATH, seed: int=0) -> Dict:
+    # labels: lead_id + label_col frame joined per chunk; None reads label_col from the CRM file.
+    # Features are normalized with the CRM's own min/max (one extra pass), stored with the model.
+    # progressive_log_loss scores each chunk before the model learns from it.
+    from sklearn.linear_model import SGDClassifier  # type: ignore
+    from sklearn.metrics import log_loss  # type: ignore
+
+    t0 = time.perf_counter()
+    stats, fills = fit_score_stats(crm_path, eri, chunk_rows)
+    if stats is None:
+        raise ValueError(f"No leads in {crm_path}")
+    readiness = _readiness_table(eri)
+    lab = None
+    columns = list(SCORE_INPUTS)
+    if labels is not None:
+        lab = pd.Series(labels[label_col].to_numpy(), index=labels["lead_id"].astype(str).to_numpy())
+        lab = lab[~lab.index.duplicated(keep="last")]
+    else:
+        columns.append(label_col)
+
+    clf = SGDClassifier(loss="log_loss", alpha=1e-4, random_state=seed)
+    rows = positives = 0
+    loss_sum = 0.0
+    loss_rows = 0
+    for epoch in range(epochs):
+        for chunk in iter_dataset_chunks(crm_path, "CRM", columns, chunk_rows):
+            y = _labels_for(chunk, lab, label_col)
+            keep = ~np.isnan(y)
+            if not keep.any():
+                continue
+            X, y = _feature_block(chunk, readiness, stats, fills)[keep], y[keep]
+            if epoch == epochs - 1 and hasattr(clf, "coef_"):
+                loss_sum += log_loss(y, clf.predict_proba(X)[:, 1], labels=[0.0, 1.0]) * len(y)
+                loss_rows += len(y)
+            clf.partial_fit(X, y, classes=np.array([0.0, 1.0]))
+            if epoch == 0:
+                rows += len(y)
+                positives += int(y.sum())
+    if not rows:
+        raise ValueError(f"No labelled leads (column {label_col!r})")
+
+    _save_model({"version": _MODEL_VERSION, "model": clf, "stats": stats, "fills": fills,
+                 "features": PROPENSITY_FEATURES, "trained_rows": rows}, model_path)
+    secs = time.perf_counter() - t0
+    return {
+        "rows": rows, "positives": positives, "epochs": epochs, "seconds": round(secs, 3),
+        "rows_per_s": round(rows * epochs / secs) if secs > 0 else None,
+        "progressive_log_loss": round(loss_sum / loss_rows, 4) if loss_rows else None,
+        "coef": dict(zip(PROPENSITY_FEATURES, np.round(clf.coef_[0], 4).tolist())),
+        "model_path": model_path,
+    }
+
+
+def load_propensity(model_path: str=PROPENSITY_MODEL_PATH) -> dict:
+    with open(model_path, "rb") as f:
+        obj = pickle.load(f)
+    if obj.get("version") != _MODEL_VERSION:
+        raise ValueError(f"{model_path} was written by an incompatible version; retrain it")
+    return obj
+
+
+def _chunk_rows_for_budget(crm_path: str, memory_budget_mb: float) -> int:
+    # Bytes per row from a small probe of the input, plus the float64 features/outputs, doubled
+    # for pandas/numpy temporaries
+    probe = next(iter_dataset_chunks(crm_path, "CRM", SCORE_INPUTS, 2000), None)
+    if probe is None or not len(probe):
+        return SCORE_CHUNK_ROWS
+    per_row = 2 * (probe.memory_usage(deep=True).sum() / len(probe) + 8 * 20)
+    return max(1000, int(memory_budget_mb * 1e6 // per_row))
+
+
+def score_propensity(crm_path: str, eri: pd.DataFrame, out_path: str, model_path: str=PROPENSITY_MODEL_PATH,
+                     memory_budget_mb: float=256, chunk_rows: Optional[int]=None) -> Dict:
+    # Writes lead_id, propensity (0-1) and propensity_score (0-100) to out_path (.csv or .parquet),
+    # one chunk at a time; chunk_rows=None sizes chunks to memory_budget_mb
+    t0 = time.perf_counter()
+    obj = load_propensity(model_path)
+    load_secs = time.perf_counter() - t0
+    clf, stats, fills = obj["model"], obj["stats"], obj["fills"]
+    readiness = _readiness_table(eri)
+    chunk_rows = chunk_rows or _chunk_rows_for_budget(crm_path, memory_budget_mb)
+
+    t1 = time.perf_counter()
+    rows = 0
+    writer = None
+    os.makedirs(os.path.dirname(os.path.abspath(out_path)), exist_ok=True)
+    try:
+        for i, chunk in enumerate(iter_dataset_chunks(crm_path, "CRM", SCORE_INPUTS, chunk_rows)):
+            p = clf.predict_proba(_feature_block(chunk, readiness, stats, fills))[:, 1]
+            part = pd.DataFrame({"lead_id": chunk["lead_id"].to_numpy(), "propensity": p,
+                                 "propensity_score": np.round(100 * p).astype(int)})
+            rows += len(part)
+            if out_path.endswith(".parquet"):
+                import pyarrow as pa
+                import pyarrow.parquet as pq
+                table = pa.Table.from_pandas(part, preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(out_path, table.schema)
+                writer.write_table(table)
+            else:
+                part.to_csv(out_path, mode="w" if i == 0 else "a", header=i == 0, index=False)
+    finally:
+        if writer is not None:
+            writer.close()
+    score_secs = time.perf_counter() - t1
+    return {"rows": rows, "chunk_rows": chunk_rows, "load_seconds": round(load_secs, 3),
+            "score_seconds": round(score_secs, 3),
+            "rows_per_s": round(rows / score_secs) if score_secs > 0 else None, "out_path": out_path}
+
+
+if __name__ == "__main__":
+    import argparse
+    from core.io import load_all_datasets, _dataset_path
+
+    ap = argparse.ArgumentParser(description="Train or apply the lead propensity model out of core")
+    ap.add_argument("command", choices=["train", "score"])
+    ap.add_argument("--crm", default=None, help="CRM file (default: the one the app loads)")
+    ap.add_argument("--labels", default=None, help="CSV with lead_id and the label column")
+    ap.add_argument("--label-col", default="converted")
+    ap.add_argument("--epochs", type=int, default=2)
+    ap.add_argument("--model", default=PROPENSITY_MODEL_PATH)
+    ap.add_argument("--out", default=os.path.join(DATA_DIR, "outputs", "propensity.csv"))
+    ap.add_argument("--memory-mb", type=float, default=256)
+    args = ap.parse_args()
+
+    eri, *_ = load_all_datasets(prefer_real=True)
+    crm_path = args.crm or _dataset_path("CRM")
+    if args.command == "train":
+        labels = pd.read_csv(args.labels, dtype={"lead_id": str}) if args.labels else None
+        print(train_propensity(crm_path, eri, labels=labels, label_col=args.label_col,
+                               epochs=args.epochs, model_path=args.model))
+    else:
+        print(score_propensity(crm_path, eri, args.out, model_path=args.model, memory_budget_mb=args.memory_mb))
@@ -1,4 +1,34 @@
-def simulate_uplift(baseline_conversion: float, available_leads: int, plan_units: int, gross_margin_per_unit: float, transfer_units: int, transfer_cost_per_unit: float):
+import time
+import numpy as np
+import pandas as pd
+from typing import Dict, Optional, Sequence, Tuple
+
+
+# simulate_uplift's inputs, in argument order (the drivers of the sensitivity analysis)
+UPLIFT_DRIVERS = ["baseline_conversion", "available_leads", "plan_units", "gross_margin_per_unit",
+                  "transfer_units", "transfer_cost_per_unit"]
+
+
+def simulate_uplift(baseline_conversion, available_leads, plan_units, gross_margin_per_unit, transfer_units, transfer_cost_per_unit):
+    # Scalars in, rounded scalars out. If any input is an array, inputs broadcast against each other
+    # (e.g. a column of conversions against a row of margins gives a grid) and every output is an
+    # unrounded array of the broadcast shape, with uplift_percent NaN where baseline revenue is zero.
+    args = (baseline_conversion, available_leads, plan_units, gross_margin_per_unit, transfer_units, transfer_cost_per_unit)
+    if any(np.ndim(a) for a in args):
+        conv, leads, plan, margin, t_units, t_cost = (np.asarray(a, dtype=float) for a in args)
+        baseline_units = conv * leads
+        delta_units = plan - baseline_units
+        uplift_revenue = delta_units * margin - t_units * t_cost
+        baseline_revenue = baseline_units * margin
+        with np.errstate(divide="ignore", invalid="ignore"):
+            uplift_percent = np.where(baseline_revenue != 0, uplift_revenue / baseline_revenue * 100, np.nan)
+        return {
+            "baseline_units": np.broadcast_to(baseline_units, uplift_revenue.shape),
+            "plan_units": np.broadcast_to(plan, uplift_revenue.shape),
+            "delta_units": np.broadcast_to(delta_units, uplift_revenue.shape),
+            "uplift_revenue": uplift_revenue,
+            "uplift_percent": uplift_percent,
+        }
     baseline_units = baseline_conversion * available_leads
     delta_units = plan_units - baseline_units
     uplift_revenue = delta_units * gross_margin_per_unit - transfer_units * transfer_cost_per_unit
@@ -11,3 +41,196 @@ def simulate_uplift(baseline_conversion: float, available_leads: int, plan_units
         "uplift_revenue": round(uplift_revenue, 2),
         "uplift_percent": round(uplift_percent*100, 2) if uplift_percent is not None else None
     }
+
+
+def uplift_sensitivity(base: Dict[str, float], ranges: Optional[Dict[str, Tuple[float, float]]]=None,
+                       steps: int=21, spread: float=0.2) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    # One-at-a-time sensitivity of net uplift. Each driver in `ranges` (default: every UPLIFT_DRIVERS
+    # entry over base -/+ spread) is swept over `steps` values with the others held at `base`; the
+    # whole (drivers x steps) grid is one simulate_uplift call. Returns (curves, tornado): curves is
+    # driver/value/uplift_revenue per grid point, tornado one row per driver ranked by swing
+    # (max - min uplift over its range), with the uplift at each end of the range.
+    if ranges is None:
+        ranges = {k: (base[k] * (1 - spread), base[k] * (1 + spread)) for k in UPLIFT_DRIVERS}
+    unknown = [k for k in ranges if k not in UPLIFT_DRIVERS]
+    if unknown:
+        raise ValueError(f"Unknown driver(s): {unknown}. Expected some of {UPLIFT_DRIVERS}")
+    drivers = list(ranges)
+    values = np.array([np.linspace(lo, hi, steps) for lo, hi in ranges.values()]).reshape(len(drivers), steps)
+    grid = []
+    for k in UPLIFT_DRIVERS:
+        arr = np.full(values.shape, float(base[k]))
+        if k in ranges:
+            arr[drivers.index(k)] = values[drivers.index(k)]
+        grid.append(arr)
+    uplift = simulate_uplift(*grid)["uplift_revenue"]
+
+    curves = pd.DataFrame({"driver": np.repeat(drivers, steps), "value": values.ravel(),
+                           "uplift_revenue": uplift.ravel()})
+    tornado = pd.DataFrame({
+        "driver": drivers,
+        "base_value": [float(base[k]) for k in drivers],
+        "low": values[:, 0], "high": values[:, -1],
+        "uplift_at_low": uplift[:, 0], "uplift_at_high": uplift[:, -1],
+        "swing": uplift.max(axis=1) - uplift.min(axis=1),
+    })
+    tornado = tornado.sort_values("swing", ascending=False, kind="stable").reset_index(drop=True)
+    tornado.attrs["base_uplift"] = simulate_uplift(*(base[k] for k in UPLIFT_DRIVERS))["uplift_revenue"]
+    return curves, tornado
+
+
+def uplift_breakdown(plan: pd.DataFrame, inv: pd.DataFrame, sell_through: float=1.0) -> pd.DataFrame:
+    # Net uplift of an optimizer plan per receiving branch and model: units received x sell_through x
+    # that branch's stock-weighted margin for the model (the model's network-wide margin where the
+    # branch stocks none) minus the plan's transfer cost. Groupby rollups only; sorted by net uplift.
+    cols = ["branch_id", "model", "units", "transfers", "gross_margin_per_unit", "gross_uplift",
+            "transfer_cost", "net_uplift"]
+    if plan is None or plan.empty:
+        return pd.DataFrame(columns=cols)
+    recv = (plan.assign(branch_id=plan["to_branch"].astype(str), model=plan["model"].astype(str), transfers=1)
+            .groupby(["branch_id", "model"], as_index=False, sort=False)[["units", "transfers", "transfer_cost"]].sum())
+    m = inv[["branch_id", "model"]].astype(str).assign(
+        w=inv["stock_units"].to_numpy(dtype=float),
+        mw=inv["gross_margin_per_unit"].to_numpy(dtype=float) * inv["stock_units"].to_numpy(dtype=float),
+        m=inv["gross_margin_per_unit"].to_numpy(dtype=float), n=1.0)
+    by_branch = m.groupby(["branch_id", "model"], as_index=False, sort=False)[["w", "mw", "m", "n"]].sum()
+    by_model = m.groupby("model", as_index=False, sort=False)[["w", "mw", "m", "n"]].sum()
+    for g in (by_branch, by_model):
+        # Stock-weighted where there is stock, plain mean otherwise
+        g["margin"] = np.where(g["w"] > 0, g["mw"] / g["w"].where(g["w"] > 0, 1), g["m"] / g["n"])
+    out = recv.merge(by_branch[["branch_id", "model", "margin"]], on=["branch_id", "model"], how="left")
+    out = out.merge(by_model[["model", "margin"]].rename(columns={"margin": "model_margin"}), on="model", how="left")
+    out["gross_margin_per_unit"] = out["margin"].fillna(out["model_margin"]).fillna(0.0)
+    out["gross_uplift"] = out["units"] * sell_through * out["gross_margin_per_unit"]
+    out["net_uplift"] = out["gross_uplift"] - out["transfer_cost"]
+    return out[cols].sort_values("net_uplift", ascending=False, kind="stable").reset_index(drop=True)
+
+
+# ---- Monte Carlo mode
+# simulate_uplift over many scenarios at once: baseline conversion, margin per unit, forecast error
+# on plan units and transfer cost per unit are sampled in NumPy arrays, MC_CHUNK_DRAWS at a time.
+# Draws are not kept: each chunk is folded into running sums and a fixed MC_QUANTILE_BINS-bin
+# histogram, so memory is bounded by the chunk size whatever n_draws is. The histogram spans the
+# first chunk's range widened by that range on each side; draws outside it count as tails.
+MC_DRAWS = 1_000_000
+MC_CHUNK_DRAWS = 250_000
+MC_QUANTILE_BINS = 1 << 16
+
+
+def _beta_params(mean: float, sd: float):
+    # Method-of-moments Beta(a, b) for a rate with this mean and sd (None when it degenerates to a point)
+    var = sd * sd
+    if sd <= 0 or not 0 < mean < 1 or var >= mean * (1 - mean):
+        return None
+    k = mean * (1 - mean) / var - 1
+    return mean * k, (1 - mean) * k
+
+
+def _hist_quantile(counts: np.ndarray, edges: np.ndarray, below: int, n: int, q: float, vmin: float,
+                   vmax: float) -> float:
+    # q-quantile of n draws from binned counts (`below` draws fell under edges[0]), linear within
+    # the bin; quantiles in the tails outside the bins resolve to the observed min/max
+    target = q * n
+    if target <= below:
+        return vmin
+    cum = below + np.cumsum(counts)
+    i = int(np.searchsorted(cum, target))
+    if i >= len(counts):
+        return vmax
+    before = cum[i] - counts[i]
+    frac = (target - before) / counts[i] if counts[i] else 0.0
+    return float(min(max(edges[i] + frac * (edges[i + 1] - edges[i]), vmin), vmax))
+
+
+def simulate_uplift_mc(baseline_conversion: float, available_leads: int, plan_units: int, gross_margin_per_unit: float,
+                       transfer_units: int, transfer_cost_per_unit: float, conversion_sd: float=0.0,
+                       margin_samples: Optional[Sequence[float]]=None, margin_weights: Optional[Sequence[float]]=None,
+                       plan_error_sd: float=0.0, transfer_cost_cv: float=0.0, n_draws: int=MC_DRAWS,
+                       chunk_draws: int=MC_CHUNK_DRAWS, seed: int=0, bins: int=60) -> Dict:
+    # Per draw: conversion ~ Beta(mean baseline_conversion, sd conversion_sd); margin resampled from
+    # margin_samples (e.g. Inventory.gross_margin_per_unit, weighted by stock) or gross_margin_per_unit;
+    # plan units x (1 + Normal(0, plan_error_sd)), floored at 0; transfer cost lognormal with mean
+    # transfer_cost_per_unit and coefficient of variation transfer_cost_cv.
+    # Returns uplift percentiles, mean, sd, P(loss) and a `bins`-bin histogram; same seed and chunk
+    # size, same result. Memory is O(chunk_draws + MC_QUANTILE_BINS), not O(n_draws): with more than
+    # one chunk, percentiles come from the fine histogram (error below one fine bin, ~5e-5 of three
+    # times the first chunk's range); a single chunk gives exact percentiles.
+    t0 = time.perf_counter()
+    rng = np.random.default_rng(seed)
+    beta = _beta_params(baseline_conversion, conversion_sd)
+    margins = None
+    if margin_samples is not None and len(margin_samples):
+        margins = np.asarray(margin_samples, dtype=float)
+        p = None
+        if margin_weights is not None:
+            w = np.clip(np.asarray(margin_weights, dtype=float), 0, None)
+            p = w / w.sum() if w.sum() > 0 else None
+        margin_cdf = np.cumsum(p) if p is not None else None
+    sigma = np.sqrt(np.log1p(transfer_cost_cv ** 2)) if transfer_cost_cv > 0 else 0.0
+
+    uplift = np.empty(min(chunk_draws, n_draws))
+    counts = edges = None
+    below = n_loss = 0
+    total = m2 = 0.0
+    vmin, vmax = np.inf, -np.inf
+    for start in range(0, n_draws, chunk_draws):
+        n = min(chunk_draws, n_draws - start)
+        conv = rng.beta(*beta, size=n) if beta else np.full(n, float(baseline_conversion))
+        if margins is None:
+            margin = np.full(n, float(gross_margin_per_unit))
+        elif margin_cdf is None:
+            margin = margins[rng.integers(0, len(margins), n)]
+        else:
+            margin = margins[np.minimum(np.searchsorted(margin_cdf, rng.random(n) * margin_cdf[-1], side="right"), len(margins) - 1)]
+        plan = plan_units * (1 + rng.normal(0.0, plan_error_sd, n)) if plan_error_sd > 0 else np.full(n, float(plan_units))
+        np.maximum(plan, 0, out=plan)
+        if sigma:
+            cost = transfer_cost_per_unit * rng.lognormal(-sigma * sigma / 2, sigma, n)
+        else:
+            cost = np.full(n, float(transfer_cost_per_unit))
+        # simulate_uplift's formula, one element per draw
+        out = uplift[:n]
+        np.subtract(plan, conv * available_leads, out=out)
+        out *= margin
+        out -= transfer_units * cost
+
+        lo, hi = float(out.min()), float(out.max())
+        if counts is None:
+            pad = (hi - lo) or max(abs(lo), 1.0)
+            edges = np.linspace(lo - pad, hi + pad, MC_QUANTILE_BINS + 1)
+            counts = np.zeros(MC_QUANTILE_BINS, dtype=np.int64)
+        vmin, vmax = min(vmin, lo), max(vmax, hi)
+        below += int((out < edges[0]).sum())
+        counts += np.histogram(out, bins=edges)[0]
+        n_loss += int((out < 0).sum())
+        # Running mean / sum of squared deviations, merged chunk by chunk (Chan et al.)
+        mean_c = float(out.mean())
+        m2_c = float(((out - mean_c) ** 2).sum())
+        if start == 0:
+            mean, m2 = mean_c, m2_c
+        else:
+            delta = mean_c - mean
+            mean += delta * n / (start + n)
+            m2 += m2_c + delta * delta * start * n / (start + n)
+        total = start + n
+
+    if n_draws <= chunk_draws:
+        # A single chunk is still in memory: exact percentiles
+        p5, p50, p95 = (float(v) for v in np.percentile(uplift[:n_draws], [5, 50, 95]))
+    else:
+        p5, p50, p95 = (_hist_quantile(counts, edges, below, n_draws, q, vmin, vmax) for q in (0.05, 0.5, 0.95))
+    # Display histogram over the observed range, from the fine bins' midpoints
+    mids = (edges[:-1] + edges[1:]) / 2
+    span = (vmin, vmax) if vmax > vmin else (vmin - 0.5, vmax + 0.5)
+    hist, hist_edges = np.histogram(np.clip(mids[counts > 0], *span), bins=bins, range=span, weights=counts[counts > 0])
+    outside = n_draws - below - int(counts.sum())
+    hist[0] += below
+    hist[-1] += outside
+    return {
+        "n_draws": n_draws,
+        "p5": round(p5, 2), "p50": round(p50, 2), "p95": round(p95, 2),
+        "mean": round(float(mean), 2), "sd": round(float(np.sqrt(m2 / total)), 2),
+        "prob_loss": round(n_loss / n_draws, 4),
+        "histogram": {"counts": hist.astype(int).tolist(), "edges": hist_edges.tolist()},
+        "seconds": round(time.perf_counter() - t0, 3),
+    }
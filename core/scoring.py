@@ -1,5 +1,11 @@
+import os
+import time
 import pandas as pd
 import numpy as np
+from typing import Dict, Iterator, List, Optional
+
+from core.io import DATA_DIR
+from core.cache import DiskCache, content_key
 
 VEHICLE_TYPE_SCORES = {
     "ICE": 1.0,
@@ -9,6 +15,21 @@ VEHICLE_TYPE_SCORES = {
 }
 
 INCOME_BANDS = ["<€40k","€40–60k","€60–80k",">€80k"]
+_INCOME_LEVELS = {"<€40k": 0, "€40–60k": 1, "€60–80k": 2, ">€80k": 3}
+
+# Per-lead outputs besides the score, and the CRM columns the score reads
+SCORE_COMPONENTS = ["readiness_norm", "vehicle_type_score", "income_norm", "engagements_norm", "distance_norm"]
+SCORE_INPUTS = ["lead_id", "county", "current_vehicle_type", "income_band", "engagements_90d", "distance_km"]
+SCORE_CHUNK_ROWS = 250_000
+
+# score = 100 * (w . [readiness_norm, vehicle_type_score, income_norm, engagements_norm, 1 - distance_norm])
+SCORE_WEIGHTS: Dict[str, float] = {
+    "readiness": 0.35,
+    "vehicle_type": 0.25,
+    "income": 0.20,
+    "engagements": 0.10,
+    "proximity": 0.10,
+}
 
 def _norm_series(s: pd.Series) -> pd.Series:
     s = s.astype(float)
@@ -20,25 +41,377 @@ def _income_to_numeric(band: str) -> float:
     mapping = {"<€40k": 0, "€40–60k": 1, "€60–80k": 2, ">€80k": 3}
     return mapping.get(str(band), 1)
 
-def score_leads(crm: pd.DataFrame, eri: pd.DataFrame) -> pd.DataFrame:
-    # Merge readiness
-    out = crm.copy()
-    out = out.merge(eri[['county','readiness_score']], on='county', how='left')
-
-    # Normalizations
-    out['readiness_norm'] = _norm_series(out['readiness_score'].fillna(out['readiness_score'].median()))
-    out['vehicle_type_score'] = out['current_vehicle_type'].map(VEHICLE_TYPE_SCORES).fillna(0.5)
-    out['income_num'] = out['income_band'].apply(_income_to_numeric)
-    out['income_norm'] = _norm_series(out['income_num'])
-    out['engagements_norm'] = _norm_series(out['engagements_90d'].astype(float).fillna(0))
-    out['distance_norm'] = _norm_series(out['distance_km'].astype(float).fillna(out['distance_km'].median()))
-
-    out['score'] = (100 * (
-        0.35*out['readiness_norm'] +
-        0.25*out['vehicle_type_score'] +
-        0.20*out['income_norm'] +
-        0.10*out['engagements_norm'] +
-        0.10*(1 - out['distance_norm'])
-    )).round(0).astype(int)
+# Vectorized engine. Text columns are looked up once per category (or factorized value), never per
+# row. Min/max and the median fills are gathered up front so a chunked run scores each chunk
+# exactly as _norm_series would score the whole CRM.
+
+def _lookup(s: pd.Series, table: Dict, default: float) -> np.ndarray:
+    if isinstance(s.dtype, pd.CategoricalDtype):
+        codes, cats = s.cat.codes.to_numpy(), s.cat.categories
+    else:
+        codes, cats = pd.factorize(s)
+    # Missing values have code -1 and pick up the trailing default
+    vals = np.array([table.get(str(c), default) for c in cats] + [default], dtype=float)
+    return vals[codes]
+
+def _readiness_table(eri: pd.DataFrame) -> Dict[str, float]:
+    e = eri[["county", "readiness_score"]].drop_duplicates("county")
+    return dict(zip(e["county"].astype(str), e["readiness_score"].astype(float)))
+
+def _raw_features(crm: pd.DataFrame, readiness: Dict[str, float]) -> Dict[str, np.ndarray]:
+    return {
+        "readiness": _lookup(crm["county"], readiness, np.nan),
+        "vehicle_type_score": _lookup(crm["current_vehicle_type"], VEHICLE_TYPE_SCORES, 0.5),
+        "income_num": _lookup(crm["income_band"], _INCOME_LEVELS, 1),
+        "engagements": np.nan_to_num(crm["engagements_90d"].to_numpy(dtype=float), nan=0.0),
+        "distance": crm["distance_km"].to_numpy(dtype=float),
+    }
+
+def _median(values: np.ndarray, counts: np.ndarray, dtype) -> float:
+    # Median of a (sorted values, counts) histogram, averaged in the source dtype like Series.median
+    n = int(counts.sum())
+    if n == 0:
+        return np.nan
+    cum = np.cumsum(counts)
+    lo = values[np.searchsorted(cum, (n - 1) // 2, side="right")]
+    hi = values[np.searchsorted(cum, n // 2, side="right")]
+    return float(np.median(np.array([lo, hi], dtype=dtype)))
+
+class ScoreStats:
+    # Running min/max of every normalized feature plus value counts of readiness and distance,
+    # whose medians fill missing values. Value counts grow with distinct values, not rows.
+    _FILLED = ("readiness", "distance")
+
+    def __init__(self, readiness_dtype=np.float64, distance_dtype=np.float64):
+        self.dtypes = {"readiness": np.dtype(readiness_dtype), "distance": np.dtype(distance_dtype)}
+        self.bounds: Dict[str, List[float]] = {}
+        self.counts: Dict[str, tuple] = {k: (np.empty(0), np.empty(0, dtype=np.int64)) for k in self._FILLED}
+        self.rows = 0
+
+    def update(self, feats: Dict[str, np.ndarray]) -> None:
+        self.rows += len(feats["income_num"])
+        for k in ("readiness", "income_num", "engagements", "distance"):
+            x = feats[k]
+            x = x[~np.isnan(x)]
+            if not len(x):
+                continue
+            lo, hi = float(x.min()), float(x.max())
+            b = self.bounds.setdefault(k, [lo, hi])
+            b[0], b[1] = min(b[0], lo), max(b[1], hi)
+            if k in self._FILLED:
+                v, c = np.unique(x.astype(self.dtypes[k]), return_counts=True)
+                v0, c0 = self.counts[k]
+                allv, inv = np.unique(np.concatenate([v0, v]), return_inverse=True)
+                self.counts[k] = (allv, np.bincount(inv, weights=np.concatenate([c0, c])).astype(np.int64))
 
+    def fill(self, k: str) -> float:
+        v, c = self.counts[k]
+        return _median(v, c, self.dtypes[k])
+
+def _norm(x: np.ndarray, bounds: Optional[List[float]]) -> np.ndarray:
+    if bounds is None or not bounds[1] > bounds[0]:
+        return np.zeros(len(x))
+    return (x - bounds[0]) / (bounds[1] - bounds[0])
+
+def _components(feats: Dict[str, np.ndarray], stats: ScoreStats, fills: Dict[str, float]) -> Dict[str, np.ndarray]:
+    r = np.where(np.isnan(feats["readiness"]), fills["readiness"], feats["readiness"])
+    d = np.where(np.isnan(feats["distance"]), fills["distance"], feats["distance"])
+    return {
+        "readiness_norm": _norm(r, stats.bounds.get("readiness")),
+        "vehicle_type_score": feats["vehicle_type_score"],
+        "income_norm": _norm(feats["income_num"], stats.bounds.get("income_num")),
+        "engagements_norm": _norm(feats["engagements"], stats.bounds.get("engagements")),
+        "distance_norm": _norm(d, stats.bounds.get("distance")),
+    }
+
+def weight_vector(weights=None) -> np.ndarray:
+    # None -> SCORE_WEIGHTS; a dict overrides some of them by name; a sequence gives all five in order
+    if weights is None:
+        return np.array(list(SCORE_WEIGHTS.values()), dtype=float)
+    if isinstance(weights, dict):
+        unknown = set(weights) - set(SCORE_WEIGHTS)
+        if unknown:
+            raise ValueError(f"Unknown score weights: {sorted(unknown)}. Expected {list(SCORE_WEIGHTS)}")
+        return np.array([float(weights.get(k, v)) for k, v in SCORE_WEIGHTS.items()])
+    w = np.asarray(weights, dtype=float)
+    if w.shape != (len(SCORE_WEIGHTS),):
+        raise ValueError(f"Expected {len(SCORE_WEIGHTS)} weights ({list(SCORE_WEIGHTS)}), got shape {w.shape}")
+    return w
+
+def _combine(c: Dict[str, np.ndarray], weights=None) -> np.ndarray:
+    w = weight_vector(weights)
+    return np.round(100 * (
+        w[0]*c["readiness_norm"] +
+        w[1]*c["vehicle_type_score"] +
+        w[2]*c["income_norm"] +
+        w[3]*c["engagements_norm"] +
+        w[4]*(1 - c["distance_norm"])
+    )).astype(int)
+
+def _stats_dtypes(crm_distance_dtype, eri: pd.DataFrame) -> ScoreStats:
+    rd = eri["readiness_score"].dtype
+    return ScoreStats(rd if rd.kind == "f" else np.float64,
+                      crm_distance_dtype if np.dtype(crm_distance_dtype).kind == "f" else np.float64)
+
+def _in_memory(crm: pd.DataFrame, eri: pd.DataFrame, weights=None):
+    feats = _raw_features(crm, _readiness_table(eri))
+    stats = _stats_dtypes(crm["distance_km"].dtype, eri)
+    stats.update(feats)
+    fills = {k: stats.fill(k) for k in ScoreStats._FILLED}
+    comps = _components(feats, stats, fills)
+    return feats, comps, _combine(comps, weights)
+
+def _scored_frame(crm: pd.DataFrame, feats: Dict[str, np.ndarray], comps: Dict[str, np.ndarray],
+                  score: np.ndarray) -> pd.DataFrame:
+    out = crm.copy(deep=False)
+    out["readiness_score"] = feats["readiness"]
+    out["readiness_norm"] = comps["readiness_norm"]
+    out["vehicle_type_score"] = comps["vehicle_type_score"]
+    out["income_num"] = feats["income_num"].astype(int)
+    for c in ("income_norm", "engagements_norm", "distance_norm"):
+        out[c] = comps[c]
+    out["score"] = score
     return out
+
+def score_leads(crm: pd.DataFrame, eri: pd.DataFrame, weights=None) -> pd.DataFrame:
+    # CRM columns plus readiness_score, income_num, the components and score (shallow copy of crm).
+    # weights: see weight_vector
+    return _scored_frame(crm, *_in_memory(crm, eri, weights))
+
+def score_leads_lean(crm: pd.DataFrame, eri: pd.DataFrame, weights=None) -> pd.DataFrame:
+    # lead_id, score and the components only
+    _, comps, score = _in_memory(crm, eri, weights)
+    return pd.DataFrame({"lead_id": crm["lead_id"].to_numpy(), "score": score, **comps})
+
+def fit_score_stats(path: str, eri: pd.DataFrame, chunk_rows: int=SCORE_CHUNK_ROWS):
+    # First pass over a CRM file: (ScoreStats, median fills), or (None, None) for an empty file
+    from core.io import iter_dataset_chunks
+    readiness = _readiness_table(eri)
+    stats = None
+    for chunk in iter_dataset_chunks(path, "CRM", SCORE_INPUTS, chunk_rows):
+        if stats is None:
+            stats = _stats_dtypes(chunk["distance_km"].dtype, eri)
+        stats.update(_raw_features(chunk, readiness))
+    if stats is None:
+        return None, None
+    return stats, {k: stats.fill(k) for k in ScoreStats._FILLED}
+
+def iter_scored_chunks(path: str, eri: pd.DataFrame, chunk_rows: int=SCORE_CHUNK_ROWS,
+                       weights=None) -> Iterator[pd.DataFrame]:
+    # Two passes over a CRM file: min/max and median fills first, then lean scored chunks
+    from core.io import iter_dataset_chunks
+    readiness = _readiness_table(eri)
+    stats, fills = fit_score_stats(path, eri, chunk_rows)
+    if stats is None:
+        return
+    for chunk in iter_dataset_chunks(path, "CRM", SCORE_INPUTS, chunk_rows):
+        comps = _components(_raw_features(chunk, readiness), stats, fills)
+        yield pd.DataFrame({"lead_id": chunk["lead_id"].to_numpy(), "score": _combine(comps, weights), **comps})
+
+def score_leads_stream(path: str, eri: pd.DataFrame, out_path: str, chunk_rows: int=SCORE_CHUNK_ROWS,
+                       weights=None) -> Dict:
+    # Scores a CRM file (CSV/Parquet) chunk by chunk into out_path (.csv or .parquet).
+    # Returns rows, seconds, rows_per_s and out_path.
+    t0 = time.perf_counter()
+    rows = 0
+    writer = None
+    os.makedirs(os.path.dirname(os.path.abspath(out_path)), exist_ok=True)
+    try:
+        for i, part in enumerate(iter_scored_chunks(path, eri, chunk_rows, weights)):
+            rows += len(part)
+            if out_path.endswith(".parquet"):
+                import pyarrow as pa
+                import pyarrow.parquet as pq
+                table = pa.Table.from_pandas(part, preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(out_path, table.schema)
+                writer.write_table(table)
+            else:
+                part.to_csv(out_path, mode="w" if i == 0 else "a", header=i == 0, index=False)
+    finally:
+        if writer is not None:
+            writer.close()
+    secs = time.perf_counter() - t0
+    return {"rows": rows, "seconds": round(secs, 3), "rows_per_s": round(rows / secs) if secs > 0 else None,
+            "out_path": out_path}
+
+# Incremental mode: per-lead raw features, components and scores are kept on disk keyed by lead_id,
+# with a hash of the row's scoring inputs. A call rescores only new/changed leads and leads in
+# counties whose readiness moved. If a min/max bound moves, every lead is rescored. If only a median
+# fill moves, just the leads that were filled are rescored.
+SCORE_STORE_DIR = os.path.join(DATA_DIR, "cache", "scores")
+_STORE_VERSION = 1
+_STORE_KEY = content_key("score-store", _STORE_VERSION)
+_FEATURES = ("readiness", "vehicle_type_score", "income_num", "engagements", "distance")
+_score_store = DiskCache(SCORE_STORE_DIR, 4 * 1024 * 1024 * 1024)
+
+def _same_value(a, b) -> bool:
+    return a == b or (a != a and b != b)
+
+def score_leads_incremental(crm: pd.DataFrame, eri: pd.DataFrame, store: Optional[DiskCache]=None,
+                            weights=None) -> pd.DataFrame:
+    # Same output as score_leads; out.attrs["rescore"] says what was recomputed and why.
+    # New weights only recombine the stored components.
+    store = store or _score_store
+    w = weight_vector(weights)
+    n = len(crm)
+    ids = pd.Index(crm["lead_id"].astype(str))
+    report = {"rows": n, "new": 0, "changed": 0, "removed": 0, "counties": [], "rescored": n, "full": True,
+              "reason": "no stored scores"}
+    state = store.get(_STORE_KEY)
+    # Usual case: same leads in the same order as last time, so no key lookup is needed
+    aligned = state is not None and state["leads"].index.equals(ids)
+    if not aligned and ids.has_duplicates:
+        out = score_leads(crm, eri, w)
+        out.attrs["rescore"] = dict(report, reason="duplicate lead_id")
+        return out
+
+    # Numbers are hashed as float64 (the value the score sees) so a dtype change alone is not an edit
+    hashed = crm[SCORE_INPUTS[1:]].astype({"engagements_90d": "float64", "distance_km": "float64"})
+    row_hash = pd.util.hash_pandas_object(hashed, index=False).to_numpy()
+    readiness = _readiness_table(eri)
+    pos = np.full(n, -1)
+    dirty = np.ones(n, dtype=bool)
+    if state is not None:
+        prev = state["leads"]
+        pos = np.arange(n) if aligned else prev.index.get_indexer(ids)
+        known = pos >= 0
+        same = np.zeros(n, dtype=bool)
+        same[known] = prev["row_hash"].to_numpy()[pos[known]] == row_hash[known]
+        moved = sorted(c for c in set(readiness) | set(state["readiness"])
+                       if not _same_value(readiness.get(c, np.nan), state["readiness"].get(c, np.nan)))
+        dirty = ~same
+        if moved:
+            dirty |= crm["county"].astype(str).isin(moved).to_numpy()
+        report.update(new=int((~known).sum()), changed=int((known & ~same).sum()),
+                      removed=len(prev) - int(known.sum()), counties=moved)
+
+    feats = {k: np.empty(n) for k in _FEATURES}
+    sub = _raw_features(crm[dirty], readiness)
+    for k in _FEATURES:
+        feats[k][dirty] = sub[k]
+        if state is not None:
+            feats[k][~dirty] = prev[k].to_numpy()[pos[~dirty]]
+    stats = _stats_dtypes(crm["distance_km"].dtype, eri)
+    stats.update(feats)
+    fills = {k: stats.fill(k) for k in ScoreStats._FILLED}
+
+    redo = np.ones(n, dtype=bool)
+    if state is not None:
+        moved_bounds = [k for k in set(stats.bounds) | set(state["bounds"])
+                        if stats.bounds.get(k) != state["bounds"].get(k)]
+        if moved_bounds:
+            report["reason"] = f"bounds moved: {', '.join(sorted(moved_bounds))}"
+        else:
+            redo = dirty.copy()
+            for k in ScoreStats._FILLED:
+                if not _same_value(fills[k], state["fills"][k]):
+                    redo |= np.isnan(feats[k])
+            report.update(full=False, reason="incremental", rescored=int(redo.sum()))
+
+    comps = {c: np.empty(n) for c in SCORE_COMPONENTS}
+    score = np.empty(n, dtype=int)
+    fresh = _components({k: feats[k][redo] for k in _FEATURES}, stats, fills)
+    score[redo] = _combine(fresh, w)
+    for c in SCORE_COMPONENTS:
+        comps[c][redo] = fresh[c]
+    reweighted = state is not None and not np.array_equal(w, state.get("weights", weight_vector()))
+    if state is not None and not redo.all():
+        keep = pos[~redo]
+        for c in SCORE_COMPONENTS:
+            comps[c][~redo] = prev[c].to_numpy()[keep]
+        if reweighted:
+            score[~redo] = _combine({c: comps[c][~redo] for c in SCORE_COMPONENTS}, w)
+        else:
+            score[~redo] = prev["score"].to_numpy()[keep]
+    if reweighted:
+        report["weights_changed"] = True
+
+    if report["rescored"] or report["removed"] or reweighted or state is None:
+        leads = pd.DataFrame({"row_hash": row_hash, **feats, **comps, "score": score}, index=ids)
+        store.put(_STORE_KEY, {"leads": leads, "readiness": readiness,
+                               "bounds": {k: list(b) for k, b in stats.bounds.items()}, "fills": fills,
+                               "weights": w})
+
+    out = _scored_frame(crm, feats, comps, score)
+    out.attrs["rescore"] = report
+    return out
+
+# Batch evaluation of many weightings: the normalized feature matrix (leads x 5) is multiplied by
+# all W weight vectors at once, in column blocks sized by block_bytes. Leads are ranked by score,
+# then engagements_90d, then CRM order, like the Leads page.
+def feature_matrix(crm: pd.DataFrame, eri: pd.DataFrame) -> np.ndarray:
+    _, comps, _ = _in_memory(crm, eri)
+    return np.column_stack([comps["readiness_norm"], comps["vehicle_type_score"], comps["income_norm"],
+                            comps["engagements_norm"], 1 - comps["distance_norm"]])
+
+def _batch_scores(F: np.ndarray, W: np.ndarray) -> np.ndarray:
+    X = 100 * (F @ W.T)
+    # BLAS sums the five terms in its own order; entries next to a .5 rounding edge are redone in
+    # _combine's order so every score equals score_leads with the same weights
+    r, c = np.nonzero(np.abs(X - np.floor(X) - 0.5) < 1e-9)
+    if len(r):
+        acc = F[r, 0] * W[c, 0]
+        for i in range(1, F.shape[1]):
+            acc = acc + F[r, i] * W[c, i]
+        X[r, c] = 100 * acc
+    return np.round(X).astype(int)
+
+def _top_positions(score: np.ndarray, eng: np.ndarray, k: int) -> np.ndarray:
+    if k >= len(score):
+        cand = np.arange(len(score))
+    else:
+        kth = np.partition(score, len(score) - k)[len(score) - k]
+        cand = np.flatnonzero(score >= kth)  # every tie at the cut-off, ordered below
+    order = np.lexsort((cand, -eng[cand], -score[cand]))
+    return cand[order[:k]]
+
+def score_weightings(crm: pd.DataFrame, eri: pd.DataFrame, weightings, names: Optional[List[str]]=None,
+                     top_k: Optional[int]=None, top_frac: float=0.1,
+                     block_bytes: int=256 * 1024 * 1024) -> Dict[str, pd.DataFrame]:
+    # weightings: a (W x 5) array or a list of weight_vector() inputs (dicts override SCORE_WEIGHTS).
+    # Returns "top" (weighting, rank, lead_id, score), "summary" (weights, cut-off score, overlap
+    # with the first weighting) and W x W "overlap" (shared top-K leads) and "jaccard" frames.
+    W = np.vstack([weight_vector(w) for w in weightings])
+    names = list(names) if names is not None else [f"w{i}" for i in range(len(W))]
+    if len(names) != len(W):
+        raise ValueError(f"{len(names)} names for {len(W)} weightings")
+    F = feature_matrix(crm, eri)
+    n = len(F)
+    k = min(n, top_k if top_k is not None else max(1, int(round(n * top_frac))))
+    eng = crm["engagements_90d"].to_numpy(dtype=float)
+    eng = np.where(np.isnan(eng), -np.inf, eng)
+
+    per_block = max(1, block_bytes // max(1, 8 * n))
+    tops = np.empty((len(W), k), dtype=np.intp)
+    top_scores = np.empty((len(W), k), dtype=int)
+    for start in range(0, len(W), per_block):
+        S = _batch_scores(F, W[start:start + per_block])
+        for j in range(S.shape[1]):
+            pos = _top_positions(S[:, j], eng, k)
+            tops[start + j], top_scores[start + j] = pos, S[pos, j]
+
+    # Pairwise overlap as one product of the (W x union) membership matrix with itself
+    union, inv = np.unique(tops, return_inverse=True)
+    member = np.zeros((len(W), len(union)), dtype=np.float32)
+    member[np.repeat(np.arange(len(W)), k), inv.reshape(-1)] = 1.0
+    overlap = (member @ member.T).round().astype(int)
+    jaccard = overlap / (2 * k - overlap)
+
+    top = pd.DataFrame({
+        "weighting": pd.Categorical.from_codes(np.repeat(np.arange(len(W)), k), categories=names),
+        "rank": np.tile(np.arange(1, k + 1), len(W)),
+        "lead_id": crm["lead_id"].array.take(tops.reshape(-1)),
+        "score": top_scores.reshape(-1),
+    })
+    summary = pd.DataFrame(W, columns=list(SCORE_WEIGHTS), index=pd.Index(names, name="weighting"))
+    summary["cutoff_score"] = top_scores[:, -1]
+    summary["overlap_with_first"] = overlap[0]
+    summary["jaccard_with_first"] = jaccard[0]
+    return {
+        "top": top,
+        "summary": summary,
+        "overlap": pd.DataFrame(overlap, index=names, columns=names),
+        "jaccard": pd.DataFrame(jaccard, index=names, columns=names),
+    }
+
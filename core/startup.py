@@ -0,0 +1,163 @@
+# core/startup.py
+# Startup profiling. With EVSO_PROFILE_STARTUP=1 (or `launcher --profile-startup`) an import hook
+# times every module import in the process, and the first completed render of the home page
+# writes a report to data/outputs/startup/: time from launch to first render, milestones, and
+# import time per module and per top-level package. Without the variable every call is a no-op.
+# Standard library only, so it can be installed before anything heavy is imported.
+from __future__ import annotations
+import os
+import sys
+import json
+import time
+import threading
+import importlib.abc
+from typing import Dict, List, Optional
+
+PROFILE_ENV = "EVSO_PROFILE_STARTUP"
+# Launch timestamp (time.time()) handed down by the launcher, so the report covers its own startup
+T0_ENV = "EVSO_T0"
+PROFILE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "outputs", "startup")
+
+_lock = threading.Lock()
+_state: Dict = {"t0": None, "marks": [], "reported": False, "hook": None}
+
+
+class _Loader(importlib.abc.Loader):
+    # Wraps a module's loader and times exec_module: cumulative (with nested imports) and self time
+    def __init__(self, hook: "_ImportTimer", loader):
+        self._hook = hook
+        self._loader = loader
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        hook = self._hook
+        stack = hook.stack.setdefault(threading.get_ident(), [])
+        stack.append(0.0)
+        t = time.perf_counter()
+        try:
+            self._loader.exec_module(module)
+        finally:
+            cum = time.perf_counter() - t
+            children = stack.pop()
+            if stack:
+                stack[-1] += cum
+            hook.times.setdefault(module.__name__, (cum, cum - children))
+
+    def __getattr__(self, name):
+        return getattr(self._loader, name)
+
+
+class _ImportTimer(importlib.abc.MetaPathFinder):
+    # First on sys.meta_path: asks the finders after it for the spec and wraps the loader
+    def __init__(self):
+        self.times: Dict[str, tuple] = {}
+        self.stack: Dict[int, List[float]] = {}
+        self._busy = threading.local()
+
+    def find_spec(self, name, path, target=None):
+        if getattr(self._busy, "on", False):
+            return None
+        self._busy.on = True
+        try:
+            for finder in sys.meta_path:
+                if finder is self or not hasattr(finder, "find_spec"):
+                    continue
+                spec = finder.find_spec(name, path, target)
+                if spec is not None:
+                    if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+                        spec.loader = _Loader(self, spec.loader)
+                    return spec
+            return None
+        finally:
+            self._busy.on = False
+
+
+def enabled() -> bool:
+    return os.environ.get(PROFILE_ENV, "") not in ("", "0", "false", "False")
+
+
+def start(force: bool=False) -> None:
+    # Install the import hook (once per process) if profiling is enabled
+    if not (force or enabled()):
+        return
+    with _lock:
+        if _state["hook"] is not None:
+            return
+        os.environ[PROFILE_ENV] = "1"
+        t0 = os.environ.get(T0_ENV)
+        _state["t0"] = float(t0) if t0 else time.time()
+        _state["hook"] = _ImportTimer()
+        sys.meta_path.insert(0, _state["hook"])
+    mark("profiling started")
+
+
+def mark(event: str) -> None:
+    # Record a milestone, in seconds since launch
+    if _state["hook"] is None:
+        return
+    with _lock:
+        _state["marks"].append((event, round(time.time() - _state["t0"], 4)))
+
+
+def report(top: int=40) -> Dict:
+    # The current profile: marks, total import time, the slowest modules and time per package
+    hook = _state["hook"]
+    times = dict(hook.times) if hook is not None else {}
+    by_pkg: Dict[str, float] = {}
+    for name, (_, own) in times.items():
+        pkg = name.split(".")[0]
+        by_pkg[pkg] = by_pkg.get(pkg, 0.0) + own
+    slowest = sorted(times.items(), key=lambda kv: -kv[1][0])[:top]
+    return {
+        "marks": dict(_state["marks"]),
+        "modules_imported": len(times),
+        "import_seconds": round(sum(own for _, own in times.values()), 4),
+        "by_package": {k: round(v, 4) for k, v in sorted(by_pkg.items(), key=lambda kv: -kv[1])},
+        "slowest_modules": [{"module": k, "cumulative_s": round(c, 4), "self_s": round(s, 4)}
+                            for k, (c, s) in slowest],
+    }
+
+
+def record_first_render(page: str="home") -> Optional[str]:
+    # Called at the end of a page script: the first call per process writes the report
+    # (data/outputs/startup/startup_<time>.json plus latest.json) and returns its path
+    if _state["hook"] is None:
+        return None
+    with _lock:
+        if _state["reported"]:
+            return None
+        _state["reported"] = True
+    mark(f"first render: {page}")
+    rep = report()
+    rep["time_to_first_render_s"] = rep["marks"][f"first render: {page}"]
+    rep["frozen"] = bool(getattr(sys, "frozen", False))
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    path = os.path.join(PROFILE_DIR, time.strftime("startup_%Y%m%d_%H%M%S.json"))
+    for p in (path, os.path.join(PROFILE_DIR, "latest.json")):
+        with open(p, "w") as f:
+            json.dump(rep, f, indent=2)
+    return path
+
+
+def format_report(rep: Dict, top: int=15) -> str:
+    lines = [f"time to first render: {rep.get('time_to_first_render_s', '?')}s   "
+             f"imports: {rep['import_seconds']}s over {rep['modules_imported']} modules"]
+    lines += [f"  {t:8.3f}s  {event}" for event, t in rep["marks"].items()]
+    lines.append("by package (self time):")
+    lines += [f"  {v:8.3f}s  {k}" for k, v in list(rep["by_package"].items())[:top]]
+    lines.append("slowest modules (cumulative / self):")
+    lines += [f"  {m['cumulative_s']:8.3f}s {m['self_s']:8.3f}s  {m['module']}" for m in rep["slowest_modules"][:top]]
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    ap = argparse.ArgumentParser(description="Show a startup profile written with EVSO_PROFILE_STARTUP=1")
+    ap.add_argument("path", nargs="?", default=os.path.join(PROFILE_DIR, "latest.json"))
+    ap.add_argument("--top", type=int, default=15)
+    args = ap.parse_args()
+    with open(args.path) as f:
+        print(format_report(json.load(f), args.top))
@@ -1,7 +1,10 @@
 # core/state.py
+from __future__ import annotations
 import streamlit as st
-import pandas as pd
-from typing import List
+from typing import TYPE_CHECKING, List
+
+if TYPE_CHECKING:  # pandas only for annotations: the home page imports this module and no pandas
+    import pandas as pd
 
 def init():
     defaults = {
@@ -32,3 +35,62 @@ def remember_optimizer(plan: pd.DataFrame, transfer_cost_per_unit: float):
     st.session_state.optimizer_plan = plan
     st.session_state.transfer_units = int(plan["units"].sum()) if plan is not None and not plan.empty else 0
     st.session_state.transfer_cost_per_unit = float(transfer_cost_per_unit)
+
+def session_owner() -> str:
+    # This browser session's id, used as the owner of the background jobs it waits on
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+        ctx = get_script_run_ctx()
+        if ctx is not None:
+            return ctx.session_id
+    except Exception:
+        pass
+    return "local"
+
+def job_result(key, fn, *args, kind: str = "job", label: str = "", poll: float = 0.5, **kwargs):
+    # Result of fn(*args, **kwargs) run as a shared background job (core.jobs). While it runs the
+    # page shows progress and a Cancel button and reruns every `poll` seconds; it stops the script
+    # until the result is there. Cancel only stops this session's wait unless nobody else waits.
+    import time
+    from core.jobs import runner, DONE, FAILED
+    dropped = st.session_state.setdefault("dropped_jobs", set())
+    bid = abs(hash(key))
+    if key in dropped:
+        st.info(f"{kind.capitalize()} cancelled.")
+        if st.button("Run again", key=f"job_again_{bid}"):
+            dropped.discard(key)
+            runner().submit(key, fn, *args, kind=kind, label=label, owner=session_owner(), retry=True, **kwargs)
+            st.rerun()
+        st.stop()
+    job = runner().submit(key, fn, *args, kind=kind, label=label, owner=session_owner(), **kwargs)
+    if job.status == DONE:
+        return job.result
+    if job.done:
+        st.error(f"{kind.capitalize()} failed: {job.error}" if job.status == FAILED else f"{kind.capitalize()} was cancelled.")
+        if st.button("Retry", key=f"job_retry_{bid}"):
+            runner().submit(key, fn, *args, kind=kind, label=label, owner=session_owner(), retry=True, **kwargs)
+            st.rerun()
+        st.stop()
+    c1, c2 = st.columns([0.85, 0.15])
+    c1.progress(job.progress, text=f"{label or kind}: {job.message or job.status}…")
+    if c2.button("Cancel", key=f"job_cancel_{bid}"):
+        runner().cancel(job.id, owner=session_owner())
+        dropped.add(key)
+        st.rerun()
+    time.sleep(poll)
+    st.rerun()
+
+def paged_dataframe(df: pd.DataFrame, key: str, page_sizes=(25, 50, 100, 250)):
+    # st.dataframe of one page of df with page-size / page controls; only that page is sent to the browser
+    from core.chartdata import paginate
+    if len(df) <= page_sizes[0]:
+        st.dataframe(df, use_container_width=True, hide_index=True)
+        return
+    c1, c2, c3 = st.columns([0.25, 0.25, 0.5])
+    size = c1.selectbox("Rows per page", page_sizes, index=min(1, len(page_sizes) - 1), key=f"{key}_size")
+    n_pages = max(1, -(-len(df) // size))
+    page_no = c2.number_input("Page", min_value=1, max_value=n_pages, value=1, step=1, key=f"{key}_page")
+    rows, _ = paginate(df, page_no, size)
+    first = (page_no - 1) * size + 1
+    c3.caption(f"Rows {first:,}–{first + len(rows) - 1:,} of {len(df):,}")
+    st.dataframe(rows, use_container_width=True, hide_index=True)
@@ -0,0 +1,132 @@
+# core/sweep.py
+# Parameter sweeps over the inventory reallocation solvers: every combination of a grid of
+# optimizer settings, evaluated on a process pool, summarized per combination (units moved, cost,
+# residual shortfall, revenue) with the Pareto-optimal trade-offs between cost and shortfall flagged.
+from __future__ import annotations
+import time
+import itertools
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, Optional, Sequence, Union
+
+from core.optimize import greedy_reallocate, lp_reallocate, _stock_by_branch_model
+from core.forecast import _resolve_workers
+from core.revenue import simulate_uplift
+
+SOLVERS: Dict[str, Callable[..., pd.DataFrame]] = {"greedy": greedy_reallocate, "lp": lp_reallocate}
+SWEEP_PARAMS = ["min_safety", "max_distance", "max_batch", "transfer_cost_per_unit"]
+# Objective -> direction used for the Pareto set
+PARETO_OBJECTIVES = {"transfer_cost": "min", "residual_shortfall": "min"}
+
+# Inputs shared by every task of a sweep: set once per worker process by the pool initializer
+# (or once in-process for the serial path) instead of being pickled with each combination.
+_shared: Dict[str, object] = {}
+
+
+def _init_shared(inv: pd.DataFrame, branches: pd.DataFrame, solver: Union[str, Callable],
+                 solver_kwargs: Dict, revenue: Dict) -> None:
+    _shared.update(inv=inv, branches=branches, grp=_stock_by_branch_model(inv, branches),
+                   solver=SOLVERS[solver] if isinstance(solver, str) else solver,
+                   solver_kwargs=solver_kwargs, revenue=revenue)
+
+
+def _evaluate(params: Dict) -> Dict:
+    # One combination: run the solver on the shared inputs and summarize its plan
+    t0 = time.perf_counter()
+    row = dict(params)
+    try:
+        plan = _shared["solver"](_shared["inv"], _shared["branches"], **params, **_shared["solver_kwargs"])
+    except Exception as e:
+        row["error"] = f"{type(e).__name__}: {e}"
+        return row
+    stock = _shared["grp"]["stock_units"].to_numpy()
+    shortfall = int(np.clip(params["min_safety"] - stock, 0, None).sum())
+    units = int(plan["units"].sum()) if len(plan) else 0
+    rev = _shared["revenue"]
+    # Units still below safety stock after the transfers count as lost plan units
+    uplift = simulate_uplift(rev["baseline_conversion"], rev["available_leads"],
+                             max(int(rev.get("plan_units", shortfall)) - (shortfall - units), 0),
+                             rev["gross_margin_per_unit"], units, params["transfer_cost_per_unit"])
+    row.update({
+        "transfers": int(len(plan)),
+        "units_moved": units,
+        "transfer_cost": float(plan["transfer_cost"].sum()) if len(plan) else 0.0,
+        "shortfall": shortfall,
+        "residual_shortfall": shortfall - units,
+        "coverage": units / shortfall if shortfall else 1.0,
+        "avg_distance_km": float(np.average(plan["distance_km"], weights=plan["units"])) if units else 0.0,
+        "uplift_revenue": uplift["uplift_revenue"],
+        "seconds": round(time.perf_counter() - t0, 4),
+        "error": None,
+    })
+    return row
+
+
+def pareto_mask(values: np.ndarray) -> np.ndarray:
+    # Rows of `values` (objectives to minimize, one per column) that no other row dominates
+    n = len(values)
+    keep = np.ones(n, dtype=bool)
+    for i in range(n):
+        if not keep[i]:
+            continue
+        dominated = np.all(values <= values[i], axis=1) & np.any(values < values[i], axis=1)
+        if dominated.any():
+            keep[i] = False
+        else:
+            # i dominates these; they can be skipped
+            keep &= ~(np.all(values[i] <= values, axis=1) & np.any(values[i] < values, axis=1))
+    return keep
+
+
+def sweep_reallocation(inv: pd.DataFrame, branches: pd.DataFrame, grid: Dict[str, Sequence],
+                       solver: Union[str, Callable]="greedy", n_jobs: int=1,
+                       revenue: Optional[Dict]=None, solver_kwargs: Optional[Dict]=None,
+                       objectives: Optional[Dict[str, str]]=None) -> pd.DataFrame:
+    # One row per combination of the grid's values (missing SWEEP_PARAMS fall back to the
+    # optimizer page defaults), in itertools.product order whatever n_jobs is. `pareto` flags the
+    # non-dominated rows under `objectives`; failed combinations carry `error` and are never Pareto.
+    # solver is a SOLVERS name or a module-level function with greedy_reallocate's signature.
+    # revenue feeds simulate_uplift: baseline_conversion, available_leads, plan_units and
+    # gross_margin_per_unit; by default uplift is covered shortfall x mean margin - transfer cost.
+    defaults = {"min_safety": 8, "max_distance": 250.0, "max_batch": 3, "transfer_cost_per_unit": 150.0}
+    unknown = [k for k in grid if k not in SWEEP_PARAMS]
+    if unknown:
+        raise ValueError(f"Unknown sweep parameter(s): {unknown}. Expected some of {SWEEP_PARAMS}")
+    if isinstance(solver, str) and solver not in SOLVERS:
+        raise ValueError(f"Unknown solver {solver!r}. Expected one of {list(SOLVERS)}")
+    axes = [list(grid.get(k, [defaults[k]])) for k in SWEEP_PARAMS]
+    combos = [dict(zip(SWEEP_PARAMS, values)) for values in itertools.product(*axes)]
+    rev = {"baseline_conversion": 0.0, "available_leads": 0,
+           "gross_margin_per_unit": float(inv["gross_margin_per_unit"].mean()) if len(inv) else 0.0}
+    rev.update(revenue or {})
+    solver_kwargs = dict(solver_kwargs or {})
+
+    t0 = time.perf_counter()
+    workers = min(_resolve_workers(n_jobs), max(len(combos), 1))
+    if workers <= 1:
+        _init_shared(inv, branches, solver, solver_kwargs, rev)
+        rows = [_evaluate(p) for p in combos]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_shared,
+                                 initargs=(inv, branches, solver, solver_kwargs, rev)) as ex:
+            # map() keeps grid order, so results are deterministic regardless of worker count
+            rows = list(ex.map(_evaluate, combos, chunksize=max(1, len(combos) // (workers * 4))))
+
+    out = pd.DataFrame(rows)
+    ok = out["error"].isna().to_numpy() if "error" in out else np.ones(len(out), dtype=bool)
+    out["pareto"] = False
+    objectives = objectives or PARETO_OBJECTIVES
+    if ok.any():
+        values = np.column_stack([out.loc[ok, k].to_numpy(dtype=float) * (1 if d == "min" else -1)
+                                  for k, d in objectives.items()])
+        out.loc[ok, "pareto"] = pareto_mask(values)
+    out.attrs["seconds"] = round(time.perf_counter() - t0, 3)
+    out.attrs["workers"] = workers
+    out.attrs["errors"] = {i: e for i, e in out["error"].items() if isinstance(e, str)} if "error" in out else {}
+    return out
+
+
+def pareto_front(results: pd.DataFrame) -> pd.DataFrame:
+    # The Pareto rows of a sweep, cheapest first
+    return results[results["pareto"]].sort_values(["transfer_cost", "residual_shortfall"]).reset_index(drop=True)
@@ -1,2 +1,32 @@
-import streamlit.web.bootstrap as bootstrap
-bootstrap.run('app/app.py', '', [], {})
\ No newline at end of file
+import os
+import sys
+import time
+import multiprocessing
+
+
+def main():
+    # --profile-startup (or EVSO_PROFILE_STARTUP=1): time every import from here on and write a
+    # startup report on the first render of the home page (see core/startup.py)
+    if "--profile-startup" in sys.argv:
+        sys.argv.remove("--profile-startup")
+        os.environ["EVSO_PROFILE_STARTUP"] = "1"
+    os.environ.setdefault("EVSO_T0", repr(time.time()))
+    profiling = bool(os.environ.get("EVSO_PROFILE_STARTUP"))
+    if profiling:
+        ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        if ROOT not in sys.path:
+            sys.path.insert(0, ROOT)
+        from core import startup
+        startup.start()
+
+    import streamlit.web.bootstrap as bootstrap
+    if profiling:
+        startup.mark("launcher: streamlit imported")
+    bootstrap.run('app/app.py', '', [], {})
+
+
+if __name__ == "__main__":
+    # In the frozen (PyInstaller) build, process-pool workers start by re-running this executable;
+    # freeze_support() turns those runs into workers instead of a second Streamlit server
+    multiprocessing.freeze_support()
+    main()